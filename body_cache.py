@@ -0,0 +1,97 @@
+"""
+Thickened Body Cache Module
+
+Handles:
+1. Persisting the thickened body of an input part (Phase 2 output) together with
+   its preview triangulation, as binary BRep.
+2. Persisting pre-processed (simplified) imports, so the pre-pass runs once per file.
+3. Keys from the input file content hash + thickness + meshing deflection / pre-pass settings.
+4. Bounded size (oldest entries removed first).
+
+Reusing the stored body lets a run skip thickening and keeps the triangulation of
+every face the grooves and clips do not touch, so Phase 6 only meshes changed faces.
+"""
+
+import os
+from typing import Optional
+
+from OCC.Core.TopoDS import TopoDS_Shape
+
+from brep_io import read_brep, write_brep
+from input_hash import payload_hash
+
+DEFAULT_BODY_CACHE_DIR = ".body_cache"
+DEFAULT_MAX_ENTRIES = 32
+
+# Bump when thickening settings change (offset mode, join type, tolerance).
+BODY_CACHE_VERSION = 1
+
+
+def make_body_key(input_hash: str, thickness: float, deflection: float, variant: str = "") -> str:
+    """
+    Cache key of a thickened body (input_hash from input_hash.file_content_hash).
+    `variant` distinguishes optional pre-processing.
+    """
+    payload = {
+        "version": BODY_CACHE_VERSION,
+        "input": input_hash,
+        "thickness": round(float(thickness), 6),
+        "deflection": round(float(deflection), 6),
+        "variant": variant,
+    }
+    return payload_hash(payload)
+
+
+def make_import_key(input_hash: str, variant: str) -> str:
+    """Cache key of a pre-processed import (e.g. SimplifyOptions.cache_variant())"""
+    payload = {
+        "version": BODY_CACHE_VERSION,
+        "input": input_hash,
+        "import": variant,
+    }
+    return payload_hash(payload)
+
+
+class ThickenedBodyCache:
+    """Directory of <key>.brep files holding meshed thickened bodies and pre-processed imports"""
+
+    def __init__(self, cache_dir: str = DEFAULT_BODY_CACHE_DIR, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.brep")
+
+    def load(self, key: str) -> Optional[TopoDS_Shape]:
+        path = self._path(key)
+        shape = read_brep(path)
+        if shape is not None:
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+        return shape
+
+    def store(self, key: str, shape: TopoDS_Shape) -> bool:
+        ok = write_brep(shape, self._path(key), with_triangles=True)
+        if ok:
+            self._evict()
+        return ok
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".brep"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,85 @@
+"""
+BRep Serialization Module
+
+Handles:
+1. Writing shapes to binary BRep (BinTools), optionally with triangulation.
+2. Reading binary BRep back into a TopoDS_Shape.
+3. In-memory round trips (bytes) for caches and process transport.
+
+Falls back to the text BRep format (BRepTools) when the binary writer is unavailable.
+"""
+
+import os
+import tempfile
+from typing import Optional
+
+from OCC.Core.TopoDS import TopoDS_Shape
+from OCC.Core.BRep import BRep_Builder
+from OCC.Core.BRepTools import breptools
+
+try:
+    from OCC.Core.BinTools import bintools
+except ImportError:  # pragma: no cover - depends on the pythonocc build
+    bintools = None
+
+
+def write_brep(shape: TopoDS_Shape, path: str, with_triangles: bool = True) -> bool:
+    """Writes a shape to `path` (binary BRep when available). Returns True on success."""
+    tmp_path = f"{path}.tmp"
+    ok = False
+    if bintools is not None:
+        try:
+            ok = bool(bintools.Write(shape, tmp_path, with_triangles, False))
+        except TypeError:
+            # Older bindings only expose Write(shape, file); triangulation is kept by default.
+            ok = bool(bintools.Write(shape, tmp_path))
+    else:
+        ok = bool(breptools.Write(shape, tmp_path, with_triangles, False))
+    if ok:
+        os.replace(tmp_path, path)
+    elif os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    return ok
+
+
+def read_brep(path: str) -> Optional[TopoDS_Shape]:
+    """Reads a shape written by write_brep. Returns None on failure."""
+    if not os.path.exists(path):
+        return None
+    shape = TopoDS_Shape()
+    if bintools is not None:
+        try:
+            ok = bintools.Read(shape, path)
+        except Exception:
+            ok = False
+        if ok is not False and not shape.IsNull():
+            return shape
+    shape = TopoDS_Shape()
+    ok = breptools.Read(shape, path, BRep_Builder())
+    return shape if ok and not shape.IsNull() else None
+
+
+def shape_to_bytes(shape: TopoDS_Shape, with_triangles: bool = False) -> bytes:
+    """Serializes a shape to binary BRep bytes"""
+    fd, path = tempfile.mkstemp(suffix=".brep")
+    os.close(fd)
+    try:
+        if not write_brep(shape, path, with_triangles):
+            raise ValueError("Could not serialize shape to BRep")
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def shape_from_bytes(data: bytes) -> Optional[TopoDS_Shape]:
+    """Rebuilds a shape from shape_to_bytes output"""
+    fd, path = tempfile.mkstemp(suffix=".brep")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return read_brep(path)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
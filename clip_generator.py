@@ -122,6 +122,10 @@ class ClipGenerator:
         derived_params = self.derive_from_groove()
         groove_gen = GrooveGenerator(derived_params)
         return groove_gen.place_shape(shape, location, normal, tangent)
+
+    def placement_trsf(self, location: gp_Pnt, normal: gp_Dir, tangent: Optional[gp_Dir] = None) -> gp_Trsf:
+        """Transformation used by place_shape"""
+        return GrooveGenerator(self.derive_from_groove()).placement_trsf(location, normal, tangent)
     
     def get_dimensions_summary(self) -> dict:
         """Returns a summary of clip dimensions for logging/validation"""
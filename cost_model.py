@@ -0,0 +1,220 @@
+"""
+Pipeline Cost Model Module
+
+Handles:
+1. Recording of pipeline runs (input features + measured runtime) to a JSONL history.
+2. Fitting a runtime estimator on recorded runs.
+3. Predicting the runtime of a queued job before it is executed.
+
+Features are taken from the STEP pre-scan (face and B-spline counts) and from
+runtime_params (groove_count, groove_shape, thickness). The fitted model replaces
+the hand-tuned heuristic only when its leave-one-out error on the recorded runs is
+lower than the heuristic's error on the same runs.
+"""
+
+import os
+import json
+import time
+from dataclasses import dataclass, asdict
+from typing import List, Optional
+
+import numpy as np
+
+from groove_parameters import GrooveType
+from step_scanner import StepSummary, try_scan_step_file
+
+RUN_HISTORY_PATH = "run_history.jsonl"
+
+# Fallback coefficients (seconds) used until enough runs are recorded.
+# Roughly: import/thicken scale with face count, booleans with tools x body complexity.
+DEFAULT_BASE_SECONDS = 2.0
+DEFAULT_SECONDS_PER_FACE = 0.02
+DEFAULT_SECONDS_PER_BSPLINE = 0.03
+DEFAULT_SECONDS_PER_TOOL = 0.5
+DEFAULT_SECONDS_PER_TOOL_FACE = 0.004
+DEFAULT_TYPE_FACTORS = {
+    GrooveType.RECTANGULAR: 1.0,
+    GrooveType.SQUARE: 1.0,
+    GrooveType.CIRCULAR: 1.3,
+    GrooveType.TRIANGLE: 1.2,
+}
+
+MIN_ESTIMATE_SECONDS = 0.1
+
+
+@dataclass
+class JobFeatures:
+    """Inputs of the runtime estimator for one pipeline job"""
+    faces: int
+    bspline_surfaces: int
+    groove_count: int
+    groove_shape: str
+    thickness: float
+
+    @classmethod
+    def from_inputs(cls, summary: Optional[StepSummary], runtime_params: dict) -> "JobFeatures":
+        shape = runtime_params["groove_shape"]
+        return cls(
+            faces=summary.face_count if summary else 0,
+            bspline_surfaces=summary.bspline_surface_count if summary else 0,
+            groove_count=int(runtime_params["groove_count"]),
+            groove_shape=shape.value if isinstance(shape, GrooveType) else str(shape),
+            thickness=float(runtime_params["thickness"]),
+        )
+
+    @classmethod
+    def from_path(cls, input_path: str, runtime_params: dict) -> "JobFeatures":
+        return cls.from_inputs(try_scan_step_file(input_path), runtime_params)
+
+    def vector(self) -> np.ndarray:
+        """
+        Design-matrix row: bias, body size, tool count, interaction, thickness and shape
+        indicators. RECTANGULAR is the reference shape (no column), so the indicators do
+        not sum to the bias column.
+        """
+        one_hot = [1.0 if self.groove_shape == t.value else 0.0 for t in list(GrooveType)[1:]]
+        return np.array([
+            1.0,
+            self.faces,
+            self.bspline_surfaces,
+            self.groove_count,
+            self.groove_count * self.faces,
+            self.thickness,
+            *one_hot,
+        ], dtype=float)
+
+
+@dataclass
+class RunRecord:
+    """A recorded pipeline run"""
+    features: JobFeatures
+    duration: float
+    success: bool
+    timestamp: float = 0.0
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, line: str) -> "RunRecord":
+        data = json.loads(line)
+        return cls(
+            features=JobFeatures(**data["features"]),
+            duration=float(data["duration"]),
+            success=bool(data["success"]),
+            timestamp=float(data.get("timestamp", 0.0)),
+        )
+
+
+def record_run(features: JobFeatures, duration: float, success: bool,
+               history_path: str = RUN_HISTORY_PATH) -> None:
+    """Appends a finished run to the history file. Never raises."""
+    record = RunRecord(features=features, duration=duration, success=success, timestamp=time.time())
+    try:
+        with open(history_path, "a", encoding="utf-8") as f:
+            f.write(record.to_json() + "\n")
+    except OSError:
+        pass
+
+
+def load_run_records(history_path: str = RUN_HISTORY_PATH) -> List[RunRecord]:
+    """Loads recorded runs, skipping malformed lines"""
+    if not os.path.exists(history_path):
+        return []
+    records = []
+    with open(history_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(RunRecord.from_json(line))
+            except (ValueError, KeyError, TypeError):
+                continue
+    return records
+
+
+class RuntimeEstimator:
+    """
+    Linear runtime model fitted by ridge regression on standardized features.
+    Falls back to hand-tuned coefficients until enough runs are available and
+    the model beats them on held-out (leave-one-out) error.
+    """
+
+    def __init__(self, ridge: float = 1.0):
+        self.ridge = ridge
+        self.coefficients: Optional[np.ndarray] = None
+        self.mean: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+        self.sample_count = 0
+        self.loo_error: Optional[float] = None        # mean absolute error (s), leave-one-out
+        self.heuristic_error: Optional[float] = None  # mean absolute error (s) of the fallback
+
+    @property
+    def is_trained(self) -> bool:
+        return self.coefficients is not None
+
+    def _standardize(self, X: np.ndarray) -> np.ndarray:
+        """Centers and scales all columns but the bias"""
+        return np.hstack([X[:, :1], (X[:, 1:] - self.mean) / self.scale])
+
+    def fit(self, records: List[RunRecord]) -> "RuntimeEstimator":
+        # Failed runs often abort early and would bias estimates downwards.
+        usable = [r for r in records if r.success and r.duration > 0]
+        self.sample_count = len(usable)
+        self.coefficients = None
+        self.loo_error = self.heuristic_error = None
+        if not usable:
+            return self
+
+        X = np.vstack([r.features.vector() for r in usable])
+        y = np.array([r.duration for r in usable], dtype=float)
+        if len(usable) < X.shape[1]:
+            return self
+
+        # Constant columns (e.g. a single groove shape so far) stay zero after centering.
+        self.mean = X[:, 1:].mean(axis=0)
+        std = X[:, 1:].std(axis=0)
+        self.scale = np.where(std > 0, std, 1.0)
+        Z = self._standardize(X)
+
+        # Normal equations with a ridge term (bias left unregularized).
+        penalty = self.ridge * np.eye(Z.shape[1])
+        penalty[0, 0] = 0.0
+        inverse = np.linalg.inv(Z.T @ Z + penalty)
+        coefficients = inverse @ Z.T @ y
+
+        # Closed-form leave-one-out residuals of a linear smoother: r_i / (1 - h_ii).
+        leverage = np.einsum("ij,jk,ik->i", Z, inverse, Z)
+        loo_residuals = (y - Z @ coefficients) / np.maximum(1.0 - leverage, 1e-9)
+        self.loo_error = float(np.mean(np.abs(loo_residuals)))
+        self.heuristic_error = float(np.mean(np.abs(
+            y - np.array([self._heuristic(r.features) for r in usable]))))
+        if self.loo_error < self.heuristic_error:
+            self.coefficients = coefficients
+        return self
+
+    @classmethod
+    def from_history(cls, history_path: str = RUN_HISTORY_PATH) -> "RuntimeEstimator":
+        return cls().fit(load_run_records(history_path))
+
+    def _heuristic(self, features: JobFeatures) -> float:
+        body = (DEFAULT_BASE_SECONDS
+                + DEFAULT_SECONDS_PER_FACE * features.faces
+                + DEFAULT_SECONDS_PER_BSPLINE * features.bspline_surfaces)
+        tools = features.groove_count * (DEFAULT_SECONDS_PER_TOOL
+                                         + DEFAULT_SECONDS_PER_TOOL_FACE * features.faces)
+        try:
+            factor = DEFAULT_TYPE_FACTORS[GrooveType(features.groove_shape)]
+        except ValueError:
+            factor = 1.0
+        return body + 2.0 * tools * factor  # grooves are cut, clips are fused
+
+    def predict(self, features: JobFeatures) -> float:
+        """Predicted runtime in seconds"""
+        if self.coefficients is None:
+            estimate = self._heuristic(features)
+        else:
+            estimate = float(self._standardize(features.vector()[None, :])[0] @ self.coefficients)
+        return max(estimate, MIN_ESTIMATE_SECONDS)
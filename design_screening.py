@@ -0,0 +1,217 @@
+"""
+Design-Space Screening Module
+
+Handles:
+1. Expanding grids of groove width/depth/height, clip height, clearance, retention
+   offset, body thickness and GrooveType into flat NumPy columns.
+2. Evaluating every combination in one batch: derived clip dimensions, closed-form
+   groove/clip volumes (volume_check's vectorized formulas), fit margins and rule checks
+   (ClipParameters.validate, wall breakthrough, thin floors, clip fit).
+3. Forwarding only the feasible subset as runtime_params for geometry runs.
+
+Violations make a combination infeasible; warnings are reported but kept.
+
+Command line:
+    python design_screening.py grid.json --output feasible.json
+where grid.json maps runtime_params keys to lists of values, e.g.
+    {"groove_width": [2, 3, 4, 5], "groove_depth": [1.0, 1.5, 2.0], "groove_shape": ["rectangular", "triangle"]}
+and the feasible sets run through the scheduler with
+    python job_scheduler.py --inputs part.stp --params feasible.json
+"""
+
+import json
+import math
+import time
+import argparse
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from runtime_input import normalize_runtime_params, runtime_params_to_json
+from volume_check import SHAPES, RECTANGULAR, TRIANGLE, shape_code, profile_volumes_between
+
+# Screened runtime_params keys (groove_shape is stored as an index into SHAPES)
+NUMERIC_KEYS = ("groove_width", "groove_depth", "groove_height", "clip_height",
+                "assembly_clearance", "retention_offset", "thickness")
+
+# Violations (infeasible)
+V_NON_POSITIVE = 1 << 0     # a dimension is <= 0 or a clearance/offset is negative
+V_CLIP_WIDTH = 1 << 1       # assembly clearance >= groove width
+V_CLIP_DEPTH = 1 << 2       # retention offset >= groove depth
+V_BREAKTHROUGH = 1 << 3     # groove depth >= body thickness
+V_GROOVE_CLOSED = 1 << 4    # TRIANGLE apex below the surface: the cut leaves a closed void
+# Warnings (kept)
+W_THIN_FLOOR = 1 << 8       # wall under the groove thinner than the retention offset / min floor
+W_CLIP_LONGER = 1 << 9      # elongated clip longer than its groove pocket
+W_CLIP_PROTRUDES = 1 << 10  # TRIANGLE clip apex above the surface
+
+RULE_NAMES = {
+    V_NON_POSITIVE: "non_positive_dimension",
+    V_CLIP_WIDTH: "clearance_exceeds_width",
+    V_CLIP_DEPTH: "offset_exceeds_depth",
+    V_BREAKTHROUGH: "groove_breaks_through",
+    V_GROOVE_CLOSED: "groove_closed",
+    W_THIN_FLOOR: "thin_floor",
+    W_CLIP_LONGER: "clip_longer_than_groove",
+    W_CLIP_PROTRUDES: "clip_protrudes",
+}
+VIOLATION_MASK = V_NON_POSITIVE | V_CLIP_WIDTH | V_CLIP_DEPTH | V_BREAKTHROUGH | V_GROOVE_CLOSED
+
+_SQRT3 = math.sqrt(3)
+
+
+def expand_grid(axes: Dict[str, Sequence], base_params: Optional[dict] = None) -> Dict[str, np.ndarray]:
+    """
+    Cartesian product of the given axes as flat columns. Keys missing from `axes`
+    take their (single) value from base_params or RUNTIME_PARAM_DEFAULTS.
+    """
+    base = normalize_runtime_params(base_params or {})
+    values = []
+    for key in NUMERIC_KEYS:
+        values.append(np.asarray(axes.get(key, [base[key]]), dtype=float))
+    values.append(np.asarray([shape_code(s) for s in axes.get("groove_shape", [base["groove_shape"]])],
+                             dtype=np.int8))
+    grids = np.meshgrid(*values, indexing="ij", copy=False)
+    columns = {key: grid.ravel() for key, grid in zip(NUMERIC_KEYS + ("groove_shape",), grids)}
+    return columns
+
+
+@dataclass
+class ScreeningResult:
+    """Per-combination outputs of screen_designs (all arrays have one entry per combination)"""
+    columns: Dict[str, np.ndarray]
+    clip_width: np.ndarray
+    clip_depth: np.ndarray
+    groove_volume: np.ndarray   # full groove tool
+    cut_volume: np.ndarray      # material removed per groove
+    fuse_volume: np.ndarray     # material added back per clip
+    floor_margin: np.ndarray    # wall left under the groove minus the required floor
+    length_margin: np.ndarray   # groove pocket length minus clip length (inf for round/square)
+    clip_top: np.ndarray        # highest local z of the clip (> 0 sticks out of the surface)
+    flags: np.ndarray           # RULE bit mask
+    seconds: float = 0.0
+    extra: dict = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(self.flags)
+
+    @property
+    def feasible(self) -> np.ndarray:
+        return (self.flags & VIOLATION_MASK) == 0
+
+    def rule_counts(self) -> Dict[str, int]:
+        return {name: int(np.count_nonzero(self.flags & bit)) for bit, name in RULE_NAMES.items()}
+
+    def row_params(self, index: int, base_params: Optional[dict] = None) -> dict:
+        """runtime_params of one combination (base_params supply the unscreened keys)"""
+        params = normalize_runtime_params(base_params or {})
+        for key in NUMERIC_KEYS:
+            params[key] = float(self.columns[key][index])
+        params["groove_shape"] = SHAPES[int(self.columns["groove_shape"][index])]
+        return params
+
+    def feasible_params(self, base_params: Optional[dict] = None, limit: Optional[int] = None,
+                        order_by: Optional[str] = None) -> List[dict]:
+        """
+        runtime_params of the feasible combinations, optionally sorted by one of the
+        result arrays (e.g. "floor_margin", descending) and truncated to `limit`.
+        """
+        indices = np.flatnonzero(self.feasible)
+        if order_by is not None:
+            indices = indices[np.argsort(-getattr(self, order_by)[indices], kind="stable")]
+        if limit is not None:
+            indices = indices[:limit]
+        return [self.row_params(int(i), base_params) for i in indices]
+
+    def summary(self) -> dict:
+        return {
+            "combinations": self.size,
+            "feasible": int(np.count_nonzero(self.feasible)),
+            "rules": self.rule_counts(),
+            "seconds": self.seconds,
+        }
+
+
+def screen_designs(columns: Dict[str, np.ndarray], min_floor: float = 0.0) -> ScreeningResult:
+    """
+    Evaluates all combinations at once. Mirrors ClipParameters.validate,
+    ClipGenerator.derive_from_groove, check_depth_against_thickness, the wall check's
+    required floor and volume_check's closed-form expectations.
+    """
+    start_time = time.perf_counter()
+    width, depth = columns["groove_width"], columns["groove_depth"]
+    length, clip_length = columns["groove_height"], columns["clip_height"]
+    clearance, offset = columns["assembly_clearance"], columns["retention_offset"]
+    thickness, shape = columns["thickness"], columns["groove_shape"]
+    elongated = (shape == RECTANGULAR) | (shape == TRIANGLE)
+
+    clip_width = width - clearance
+    clip_depth = depth - offset
+    base_z = -depth  # grooves are anchored at -depth, clips at the groove floor
+
+    groove_volume = profile_volumes_between(shape, width, depth, length, base_z, -np.inf, np.inf)
+    cut_volume = profile_volumes_between(shape, width, depth, length, base_z, base_z, 0.0)
+    pocket_length = np.where(elongated, np.minimum(clip_length, length), clip_length)
+    fuse_volume = (profile_volumes_between(shape, clip_width, clip_depth, pocket_length, base_z, base_z, 0.0)
+                   + profile_volumes_between(shape, clip_width, clip_depth, clip_length, base_z, 0.0, np.inf))
+
+    required_floor = np.maximum(offset, min_floor)
+    floor_margin = thickness - depth - required_floor
+    length_margin = np.where(elongated, length - clip_length, np.inf)
+    clip_top = np.where(shape == TRIANGLE, base_z + clip_width * _SQRT3 / 2.0, base_z + clip_depth)
+
+    flags = np.zeros(len(width), dtype=np.int32)
+    non_positive = ((width <= 0) | (depth <= 0) | (length <= 0) | (clip_length <= 0) | (thickness <= 0)
+                    | (clearance < 0) | (offset < 0))
+    flags |= np.where(non_positive, V_NON_POSITIVE, 0).astype(np.int32)
+    flags |= np.where(clearance >= width, V_CLIP_WIDTH, 0).astype(np.int32)
+    flags |= np.where(offset >= depth, V_CLIP_DEPTH, 0).astype(np.int32)
+    flags |= np.where(depth >= thickness, V_BREAKTHROUGH, 0).astype(np.int32)
+    flags |= np.where((shape == TRIANGLE) & (width * _SQRT3 / 2.0 < depth), V_GROOVE_CLOSED, 0).astype(np.int32)
+    flags |= np.where((depth < thickness) & (floor_margin < 0), W_THIN_FLOOR, 0).astype(np.int32)
+    flags |= np.where(length_margin < 0, W_CLIP_LONGER, 0).astype(np.int32)
+    flags |= np.where(clip_top > 0, W_CLIP_PROTRUDES, 0).astype(np.int32)
+
+    return ScreeningResult(columns, clip_width, clip_depth, groove_volume, cut_volume, fuse_volume,
+                           floor_margin, length_margin, clip_top, flags,
+                           seconds=time.perf_counter() - start_time)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gen-CAD Design-Space Screening")
+    parser.add_argument("grid", help="JSON file mapping runtime_params keys to lists of values")
+    parser.add_argument("--params", help="JSON file with the base runtime parameters")
+    parser.add_argument("--min-floor", type=float, default=0.0, help="Minimum wall left under a groove (mm)")
+    parser.add_argument("--output", default=None, help="Write the feasible runtime_params as a JSON list")
+    parser.add_argument("--limit", type=int, default=None, help="Keep at most this many feasible combinations")
+    parser.add_argument("--order-by", default="floor_margin", help="Result array to rank feasible combinations by")
+    args = parser.parse_args()
+
+    with open(args.grid, "r", encoding="utf-8") as f:
+        axes = json.load(f)
+    unknown = set(axes) - set(NUMERIC_KEYS) - {"groove_shape"}
+    if unknown:
+        parser.error(f"Unknown grid keys: {', '.join(sorted(unknown))}")
+    base_params = {}
+    if args.params:
+        with open(args.params, "r", encoding="utf-8") as f:
+            base_params = json.load(f)
+
+    result = screen_designs(expand_grid(axes, base_params), args.min_floor)
+    summary = result.summary()
+    print(f"[Screening] {summary['feasible']}/{summary['combinations']} feasible "
+          f"in {summary['seconds'] * 1000:.1f} ms", flush=True)
+    for name, count in summary["rules"].items():
+        if count:
+            print(f"[Screening]   {name}: {count}", flush=True)
+    if args.output:
+        feasible = result.feasible_params(base_params, args.limit, args.order_by)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([runtime_params_to_json(p) for p in feasible], f, indent=2)
+        print(f"[Screening] {len(feasible)} parameter sets written to {args.output}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Execution Settings Module
+
+Handles:
+1. One parallelism configuration (thread count + per-algorithm toggles) shared by
+   the CLI, the batch scheduler and the Streamlit app.
+2. Applying it to OCC: the default thread pool, BRepAlgoAPI booleans,
+   BRepMesh_IncrementalMesh, BRepExtrema_DistShapeShape and BRepCheck_Analyzer.
+3. Reporting the effective settings in run metrics.
+"""
+
+import os
+import argparse
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+
+def default_thread_count(workers: int = 1) -> int:
+    """CPU cores shared evenly between `workers` pipeline processes"""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+@dataclass
+class ExecutionSettings:
+    """How OCC algorithms in run_pipeline use the machine's cores"""
+    threads: int = 0  # 0 = all cores
+    parallel_booleans: bool = True
+    parallel_mesh: bool = True
+    parallel_distance: bool = True
+    parallel_check: bool = True
+
+    @classmethod
+    def serial(cls) -> "ExecutionSettings":
+        return cls(threads=1, parallel_booleans=False, parallel_mesh=False,
+                   parallel_distance=False, parallel_check=False)
+
+    @property
+    def effective_threads(self) -> int:
+        return self.threads if self.threads > 0 else default_thread_count()
+
+    def apply_global(self) -> int:
+        """
+        Sizes OCC's default thread pool and the global boolean parallel mode.
+        Returns the number of threads the pool actually uses (the pool is sized on
+        first use, so later calls in the same process keep the first size).
+        OCC is imported here so the batch scheduler can build settings without it.
+        """
+        from OCC.Core.OSD import OSD_ThreadPool
+        try:
+            from OCC.Core.BOPAlgo import BOPAlgo_Options
+        except ImportError:  # pragma: no cover - depends on the pythonocc build
+            BOPAlgo_Options = None
+
+        if BOPAlgo_Options is not None:
+            BOPAlgo_Options.SetParallelMode(self.parallel_booleans)
+        pool = OSD_ThreadPool.DefaultPool(self.effective_threads)
+        return pool.NbThreads()
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["effective_threads"] = self.effective_threads
+        return data
+
+
+def add_execution_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the shared --threads / --no-parallel-* options to a CLI parser"""
+    group = parser.add_argument_group("execution")
+    group.add_argument("--threads", type=int, default=0, help="OCC worker threads (0 = all cores)")
+    group.add_argument("--serial", action="store_true", help="Disable all parallel OCC algorithms")
+    group.add_argument("--no-parallel-booleans", action="store_true", help="Run booleans single-threaded")
+    group.add_argument("--no-parallel-mesh", action="store_true", help="Run meshing single-threaded")
+    group.add_argument("--no-parallel-distance", action="store_true", help="Run distance queries single-threaded")
+    group.add_argument("--no-parallel-check", action="store_true", help="Run BRepCheck single-threaded")
+
+
+def execution_from_args(args: argparse.Namespace, default_threads: int = 0) -> ExecutionSettings:
+    if args.serial:
+        return ExecutionSettings.serial()
+    return ExecutionSettings(
+        threads=args.threads or default_threads,
+        parallel_booleans=not args.no_parallel_booleans,
+        parallel_mesh=not args.no_parallel_mesh,
+        parallel_distance=not args.no_parallel_distance,
+        parallel_check=not args.no_parallel_check,
+    )
+
+
+def resolve(settings: Optional[ExecutionSettings]) -> ExecutionSettings:
+    return settings if settings is not None else ExecutionSettings()
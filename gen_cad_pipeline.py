@@ -4,6 +4,7 @@ Main Entry Point
 
 Phases:
 1. Import & Validation
+1b. Optional Face-Merging Simplification
 2. Uniform Inward Thickness
 3. Geometry Preservation Check
 4. Groove/Clip Generation
@@ -12,9 +13,11 @@ Phases:
 """
 
 import sys
+import time
 import argparse
 import math
-from typing import List
+from dataclasses import asdict
+from typing import Callable, List, Optional
 
 from OCC.Core.STEPControl import STEPControl_Reader, STEPControl_Writer, STEPControl_AsIs
 from OCC.Core.BRepCheck import BRepCheck_Analyzer
@@ -26,16 +29,43 @@ from OCC.Core.BRepBndLib import brepbndlib
 from OCC.Core.BRepGProp import brepgprop
 from OCC.Core.Bnd import Bnd_Box
 from OCC.Core.GProp import GProp_GProps
-from OCC.Core.BRepAlgoAPI import BRepAlgoAPI_Cut
+from OCC.Core.BRepAlgoAPI import BRepAlgoAPI_Cut, BRepAlgoAPI_Fuse
 from OCC.Core.BRepExtrema import BRepExtrema_DistShapeShape
 from OCC.Core.StlAPI import StlAPI_Writer
 from OCC.Core.BRepMesh import BRepMesh_IncrementalMesh
+from OCC.Core.IMeshTools import IMeshTools_Parameters
+from OCC.Core.TopTools import TopTools_ListOfShape
+from OCC.Core.Message import Message_ProgressRange
+from OCC.Core.gp import gp_Pnt
+from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_MakeVertex
+from OCC.Core.BRep import BRep_Tool
+from OCC.Core.BRepLProp import BRepLProp_SLProps
+from OCC.Core.ShapeAnalysis import ShapeAnalysis_Surface
 
 # Import Helper Modules
 # from advanced_offset import SmartThickener
 from groove_generator import GrooveGenerator, GrooveParameters, GrooveType, compute_placement_frames
 from clip_generator import ClipGenerator, ClipParameters
 from runtime_input import collect_all_inputs
+from step_scanner import try_scan_step_file
+from cost_model import JobFeatures, RuntimeEstimator, record_run
+from body_cache import ThickenedBodyCache, make_body_key, make_import_key
+from input_hash import file_content_hash
+from surface_simplify import SimplifyOptions, simplify_surface
+from region_thickening import RegionOptions, thicken_partitioned
+from wall_check import (BLOCKING_STATUSES, POLICY_FAIL, POLICY_SKIP, RAY_SLACK, check_depth_against_thickness,
+                        check_wall_thickness, apply_wall_policy)
+from op_capture import (CaptureSettings, OperationCapture, add_capture_arguments, capture_from_args, captured,
+                        OP_CUT, OP_FUSE, OP_DISTANCE, OP_THICKEN)
+from placement_table import PlacementTable, PlacementTableCache, make_placement_key, frames_path_for
+from memory_budget import MemoryBudget, MemoryGuard, add_memory_arguments, memory_from_args
+from pipeline_profiler import PipelineProfiler, profile_paths_for
+from volume_check import (VolumeTolerance, check_volume_delta, expected_cut_volume, expected_fuse_volume,
+                          shape_volume)
+from execution_settings import (ExecutionSettings, add_execution_arguments, execution_from_args,
+                                resolve as resolve_execution)
+from pipeline_progress import (PipelineContext, PipelineEvent, PipelineCancelled, CancelToken,
+                               EVENT_RESULT)
 
 # Reference Centroids (from green.stp / generate_precise_clips.py)
 REFERENCE_CENTROIDS = [
@@ -48,40 +78,311 @@ REFERENCE_CENTROIDS = [
     (623.97, 717.39, 819.96)  # C2
 ]
 
+# Linear deflection (mm) of the preview STL triangulation
+PREVIEW_DEFLECTION = 0.1
+
+# Fuzzy value (mm) of all groove/clip booleans
+BOOLEAN_FUZZY = 0.1
+
 def log(phase: str, message: str):
     print(f"[{phase}] {message}", flush=True)
 
-def check_validity(shape, name="Shape"):
-    analyzer = BRepCheck_Analyzer(shape)
+def check_validity(shape, name="Shape", ctx: Optional[PipelineContext] = None, parallel: bool = False):
+    analyzer = BRepCheck_Analyzer(shape, True, parallel)
+    emit = ctx.log if ctx is not None else log
     if analyzer.IsValid():
-        log("Validation", f"{name} is VALID.")
+        emit("Validation", f"{name} is VALID.")
         return True
     else:
-        log("Validation", f"{name} is INVALID.")
+        emit("Validation", f"{name} is INVALID.")
         return False
 
-def run_pipeline(input_path: str, output_path: str, runtime_params: dict):
+def mesh_shape(shape, deflection: float, theRange=None, parallel: bool = False):
+    """Triangulates a shape in place, reporting into an OCC progress range when given."""
+    if theRange is None:
+        return BRepMesh_IncrementalMesh(shape, deflection, False, 0.5, parallel)
+    mesh_params = IMeshTools_Parameters()
+    mesh_params.Deflection = deflection
+    mesh_params.Angle = 0.5
+    mesh_params.InParallel = parallel
+    return BRepMesh_IncrementalMesh(shape, mesh_params, theRange)
+
+def boolean_op(op_class, shape, tool, execution: ExecutionSettings, theRange=None, fuzzy: float = BOOLEAN_FUZZY,
+               capture: Optional[OperationCapture] = None):
+    """
+    Runs a BRepAlgoAPI cut/fuse of `tool` against `shape`.
+    Options are set before the single Build() call (the two-shape constructors
+    would already compute the result once without them).
+    Slow or failed operations are dumped for replay when `capture` is given.
+    """
+    kind = OP_CUT if op_class is BRepAlgoAPI_Cut else OP_FUSE
+    options = {"fuzzy": fuzzy, "parallel": execution.parallel_booleans}
+    return captured(capture, kind, {"shape": shape, "tool": tool}, options,
+                    lambda: _build_boolean(op_class, shape, tool, execution, theRange, fuzzy),
+                    lambda op: not op.IsDone() or op.HasErrors())
+
+def _build_boolean(op_class, shape, tool, execution: ExecutionSettings, theRange, fuzzy: float):
+    op = op_class()
+    arguments = TopTools_ListOfShape()
+    arguments.Append(shape)
+    tools = TopTools_ListOfShape()
+    tools.Append(tool)
+    op.SetArguments(arguments)
+    op.SetTools(tools)
+    op.SetFuzzyValue(fuzzy)
+    op.SetRunParallel(execution.parallel_booleans)
+    # Nothing reads Modified()/Generated(); the history maps only cost memory.
+    op.SetToFillHistory(False)
+    if theRange is None:
+        op.Build()
+    else:
+        op.Build(theRange)
+    return op
+
+def distance_query(shape1, shape2, execution: ExecutionSettings, theRange=None,
+                   capture: Optional[OperationCapture] = None):
+    """BRepExtrema_DistShapeShape computed once, multi-threaded if enabled."""
+    return captured(capture, OP_DISTANCE, {"shape1": shape1, "shape2": shape2},
+                    {"parallel": execution.parallel_distance},
+                    lambda: _perform_distance(shape1, shape2, execution, theRange),
+                    lambda tool: not tool.IsDone())
+
+def _perform_distance(shape1, shape2, execution: ExecutionSettings, theRange):
+    dist_tool = BRepExtrema_DistShapeShape()
+    dist_tool.LoadS1(shape1)
+    dist_tool.LoadS2(shape2)
+    dist_tool.SetMultiThread(execution.parallel_distance)
+    if theRange is None:
+        dist_tool.Perform()
+    else:
+        dist_tool.Perform(theRange)
+    return dist_tool
+
+def mesh_changed_faces(final_solid, base_body, deflection: float, theRange=None, parallel: bool = False):
+    """
+    Meshes only the faces of final_solid that the booleans modified or generated.
+    
+    Faces left untouched by a cut/fuse are shared with base_body (same TShape) and
+    keep the triangulation computed for it, so they are exactly the faces absent
+    from base_body's face map. This is the net effect of the boolean history and
+    stays correct across the one-tool-at-a-time fallback chains.
+    Without base_body (e.g. it was released or reloaded from disk) the faces that
+    have no triangulation yet are meshed instead.
+    Returns (changed_face_count, total_face_count).
+    """
+    from OCC.Core.TopExp import topexp
+    from OCC.Core.TopTools import TopTools_IndexedMapOfShape
+    from OCC.Core.TopoDS import TopoDS_Compound
+    from OCC.Core.BRep import BRep_Builder
+    
+    from OCC.Core.TopLoc import TopLoc_Location
+    
+    base_faces = TopTools_IndexedMapOfShape()
+    if base_body is not None:
+        topexp.MapShapes(base_body, TopAbs_FACE, base_faces)
+    final_faces = TopTools_IndexedMapOfShape()
+    topexp.MapShapes(final_solid, TopAbs_FACE, final_faces)
+    
+    changed = TopoDS_Compound()
+    builder = BRep_Builder()
+    builder.MakeCompound(changed)
+    changed_count = 0
+    for i in range(1, final_faces.Size() + 1):
+        face = final_faces.FindKey(i)
+        if base_body is not None:
+            is_changed = not base_faces.Contains(face)
+        else:
+            is_changed = BRep_Tool.Triangulation(topods.Face(face), TopLoc_Location()) is None
+        if is_changed:
+            builder.Add(changed, face)
+            changed_count += 1
+    
+    if changed_count:
+        mesh_shape(changed, deflection, theRange, parallel)
+    return changed_count, final_faces.Size()
+
+def run_pipeline(input_path: str, output_path: str, runtime_params: dict,
+                 metrics: Optional[dict] = None, cancel_token: Optional[CancelToken] = None,
+                 sink: Optional[Callable[[PipelineEvent], None]] = None,
+                 execution: Optional[ExecutionSettings] = None,
+                 capture: Optional[CaptureSettings] = None, profile: bool = False,
+                 memory: Optional[MemoryBudget] = None, input_hash: Optional[str] = None,
+                 use_cache: bool = True):
     """
     Executes the full CAD processing pipeline.
+    
+    Optional arguments:
+    - metrics: dictionary filled with per-phase timings and counts (also on failure/abort).
+    - cancel_token: checked between operations; a running OCC call is not interrupted
+      (PipelineRunner terminates the worker for a hard cancel).
+    - sink: receives PipelineEvent updates (phase changes, logs, progress, metrics).
+    - execution: thread count / parallel toggles for the OCC algorithms (default: all cores).
+    - capture: dump replay bundles of slow/failed booleans, offsets and distance queries.
+    - profile: profile the run; writes <output>.profile.pstats and <output>.profile.collapsed
+      and adds the time per OCC operation group to metrics["profile"].
+    - memory: soft RSS budget; usage is sampled at phase boundaries, before every body
+      boolean and before meshing (metrics["memory"]). Near the cap, shapes idle until a
+      later step (the pre-boolean body after the cut, the final solid while its STEP is
+      written) are spilled to disk. A single boolean or mesh can still exceed the cap.
+    - input_hash: file_content_hash of the input when the caller already computed it
+      (e.g. for the result cache key); otherwise the input is hashed once here.
+    - use_cache: read and write the thickened body, simplified import and placement
+      caches (False recomputes and stores nothing, like bypassing the result cache).
+    
+    Returns (success, message). A cancelled run returns (False, "Cancelled").
+    """
+    ctx = PipelineContext(sink=sink, cancel_token=cancel_token, log_fn=log, metrics=metrics)
+    execution = resolve_execution(execution)
+    ctx.metrics["execution"] = execution.to_dict()
+    ctx.metrics["execution"]["pool_threads"] = execution.apply_global()
+    op_capture = None
+    if capture is not None:
+        from runtime_input import runtime_params_to_json
+        op_capture = OperationCapture(capture, source={"input_path": input_path,
+                                                       "runtime_params": runtime_params_to_json(runtime_params)},
+                                      log_fn=ctx.log)
+        ctx.metrics["captures"] = op_capture.bundles
+    profiler = PipelineProfiler() if profile else None
+    guard = MemoryGuard(memory, log_fn=ctx.log) if memory is not None else None
+    start_time = time.perf_counter()
+    try:
+        if profiler is not None:
+            with profiler:
+                success, message = _run_phases(ctx, input_path, output_path, runtime_params, execution,
+                                               op_capture, guard, input_hash, use_cache)
+        else:
+            success, message = _run_phases(ctx, input_path, output_path, runtime_params, execution,
+                                           op_capture, guard, input_hash, use_cache)
+        ctx.metrics["cancelled"] = False
+    except PipelineCancelled as e:
+        ctx.log("Cancel", f"Pipeline cancelled during {e or ctx.current_phase}.")
+        ctx.metrics["cancelled"] = True
+        ctx.metrics["aborted_in"] = str(e) or ctx.current_phase
+        success, message = False, "Cancelled"
+    finally:
+        ctx.finish_phase()
+        ctx.metrics["total_seconds"] = time.perf_counter() - start_time
+        if profiler is not None:
+            _write_profile(ctx, profiler, output_path)
+        if guard is not None:
+            guard.close()
+            ctx.metrics["memory"] = guard.to_dict()
+    ctx.metrics["success"] = success
+    ctx.metrics["message"] = message
+    ctx.emit(PipelineEvent(EVENT_RESULT, ctx.current_phase, message, 1.0 if success else 0.0,
+                           data={"success": success, "message": message, "metrics": ctx.metrics}))
+    return success, message
+
+def _write_profile(ctx: PipelineContext, profiler: PipelineProfiler, output_path: str) -> None:
+    pstats_path, collapsed_path = profile_paths_for(output_path)
+    attribution = profiler.occ_attribution()
+    try:
+        profiler.write(pstats_path, collapsed_path)
+    except OSError as e:
+        ctx.log("Profile", f"Warning: Could not write profile: {e}")
+        pstats_path = collapsed_path = None
+    ctx.metrics["profile"] = dict(attribution, pstats=pstats_path, collapsed=collapsed_path)
+    groups = ", ".join(f"{group} {seconds:.2f}s" for group, seconds in attribution["groups"].items())
+    ctx.log("Profile", f"OCC time {attribution['occ_seconds']:.2f}s ({groups or 'none'})")
+    if pstats_path:
+        ctx.log("Profile", f"Written {pstats_path} and {collapsed_path}")
+
+def thicken_shape(shape, offset: float, theRange=None, tolerance: float = 1e-3,
+                  capture: Optional[OperationCapture] = None):
+    """Skin offset of a surface into a thick solid (arc joins). Returns the solid or None."""
+    from OCC.Core.BRepOffsetAPI import BRepOffsetAPI_MakeThickSolid
+    from OCC.Core.BRepOffset import BRepOffset_Skin
+    from OCC.Core.GeomAbs import GeomAbs_Arc
+    
+    def build():
+        closing_faces = TopTools_ListOfShape() 
+        builder = BRepOffsetAPI_MakeThickSolid()
+        builder.MakeThickSolidByJoin(
+            shape, closing_faces, offset, tolerance, BRepOffset_Skin, False, False, GeomAbs_Arc, False,
+            theRange if theRange is not None else Message_ProgressRange()
+        )
+        builder.Build()
+        return builder
+    
+    builder = captured(capture, OP_THICKEN, {"shape": shape}, {"offset": offset, "tolerance": tolerance},
+                       build, lambda b: not b.IsDone())
+    return builder.Shape() if builder.IsDone() else None
+
+def placement_locations(runtime_params: dict) -> list:
+    """Reference points of the Phase 4 loop: a supplied placement set or REFERENCE_CENTROIDS"""
+    locations = runtime_params.get("locations") or REFERENCE_CENTROIDS
+    return list(locations)[:runtime_params["groove_count"]]
+
+def body_variant_for(runtime_params: dict) -> str:
+    """Body cache variant of the optional Phase 1b pre-processing and region thickening ("" when disabled)"""
+    variant = ""
+    if runtime_params.get("simplify_input", False):
+        variant = SimplifyOptions(sliver_tolerance=runtime_params.get("sliver_tolerance", 0.0)).cache_variant()
+    if runtime_params.get("region_thickening", False):
+        variant += ":" + RegionOptions().cache_variant()
+    return variant
+
+def body_key_for(input_hash: str, runtime_params: dict) -> str:
+    return make_body_key(input_hash, runtime_params["thickness"], PREVIEW_DEFLECTION, body_variant_for(runtime_params))
+
+def geometry_settings_for(runtime_params: dict) -> dict:
+    """
+    Pipeline settings that change the output geometry but are not runtime_params:
+    pre-processing/region options, the mesh the wall check casts rays on, which
+    wall check statuses are skipped and the volume tolerances that reject tools.
+    Part of the result cache key.
+    """
+    return {
+        "body": body_variant_for(runtime_params),
+        "deflection": PREVIEW_DEFLECTION,
+        "wall_check": {"blocking": list(BLOCKING_STATUSES), "ray_slack": RAY_SLACK},
+        "volume_tolerance": asdict(VolumeTolerance()),
+    }
+
+def prepare_body(ctx: PipelineContext, input_path: str, input_hash: str, runtime_params: dict,
+                 execution: ExecutionSettings,
+                 capture: Optional[OperationCapture] = None,
+                 checkpoint: Optional[Callable[[str], object]] = None, use_cache: bool = True):
+    """
+    Phases 1, 1b and 2: import, optional simplification and thickening.
+    Returns (success, message, input_shape, thickened_body); the body is meshed and,
+    with use_cache, cached. `checkpoint` (MemoryGuard.checkpoint) is called before
+    the body is meshed.
     """
     thickness = runtime_params["thickness"]
+    metrics = ctx.metrics
     
     # ==========================================
     # PHASE 1: IMPORT & VALIDATION
     # ==========================================
-    log("Phase 1", f"Loading {input_path}...")
+    ctx.start_phase("Phase 1", "Import & Validation")
+    ctx.log("Phase 1", f"Loading {input_path}...")
+    summary = try_scan_step_file(input_path)
+    if summary is None:
+        ctx.log("Phase 1", "Error: Could not read file.")
+        return False, "Could not read STEP file.", None, None
+    is_supported, msg = summary.validate()
+    if not is_supported:
+        ctx.log("Phase 1", f"Error: Unsupported file - {msg}")
+        return False, f"Unsupported STEP file: {msg}", None, None
+    ctx.log("Phase 1", f"Pre-scan: {summary.originating_system or 'unknown system'}, "
+                       f"{summary.face_count} faces, {summary.bspline_surface_count} B-spline surfaces")
+    metrics["input_faces"] = summary.face_count
+    metrics["input_bspline_surfaces"] = summary.bspline_surface_count
+
     reader = STEPControl_Reader()
     status = reader.ReadFile(input_path)
     if status != 1:
-        log("Phase 1", "Error: Could not read file.")
-        return False, "Could not read STEP file."
+        ctx.log("Phase 1", "Error: Could not read file.")
+        return False, "Could not read STEP file.", None, None
         
-    reader.TransferRoots()
+    reader.TransferRoots(ctx.detached_range("Phase 1", 0.2))
+    ctx.check_cancel()
     input_shape = reader.OneShape()
     
-    if not check_validity(input_shape, "Input"):
-        log("Phase 1", "Critical Error: Input geometry corrupted.")
-        return False, "Input geometry corrupted."
+    if not check_validity(input_shape, "Input", ctx, execution.parallel_check):
+        ctx.log("Phase 1", "Critical Error: Input geometry corrupted.")
+        return False, "Input geometry corrupted.", None, None
         
     # Check if Surface or Solid
     is_surface = False
@@ -90,66 +391,101 @@ def run_pipeline(input_path: str, output_path: str, runtime_params: dict):
         is_surface = True
         
     if not is_surface:
-        log("Phase 1", "Warning: Input does not seem to contain faces.")
+        ctx.log("Phase 1", "Warning: Input does not seem to contain faces.")
+
+    body_cache = ThickenedBodyCache() if use_cache else None
+    
+    # ==========================================
+    # PHASE 1b: FACE-MERGING SIMPLIFICATION (OPTIONAL)
+    # ==========================================
+    if runtime_params.get("simplify_input", False):
+        ctx.start_phase("Phase 1b", "Face-Merging Simplification")
+        simplify_options = SimplifyOptions(sliver_tolerance=runtime_params.get("sliver_tolerance", 0.0))
+        import_key = make_import_key(input_hash, simplify_options.cache_variant())
+        simplified = body_cache.load(import_key) if body_cache is not None else None
+        if simplified is not None:
+            ctx.log("Phase 1b", "Reusing cached simplified import.")
+            input_shape = simplified
+            metrics["simplify"] = {"cached": True}
+        else:
+            input_shape, report = simplify_surface(input_shape, simplify_options)
+            ctx.check_cancel()
+            metrics["simplify"] = report
+            before, after = report["before"], report["after"]
+            if report["applied"]:
+                ctx.log("Phase 1b", f"Faces {before['faces']} -> {after['faces']}, "
+                                    f"edges {before['edges']} -> {after['edges']}")
+                if body_cache is not None:
+                    body_cache.store(import_key, input_shape)
+            else:
+                ctx.log("Phase 1b", f"Warning: Simplification skipped - {report.get('reason', 'no result')}")
 
     # ==========================================
     # PHASE 2: UNIFORM INWARD THICKNESS
     # ==========================================
-    log("Phase 2", f"Applying thickness {thickness}mm INWARD...")
+    ctx.start_phase("Phase 2", "Uniform Inward Thickness")
+    ctx.log("Phase 2", f"Applying thickness {thickness}mm INWARD...")
     
-    from OCC.Core.BRepOffsetAPI import BRepOffsetAPI_MakeThickSolid
-    from OCC.Core.BRepOffset import BRepOffset_Skin
-    from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_MakeSolid
-    from OCC.Core.GeomAbs import GeomAbs_Arc, GeomAbs_Intersection
-    from OCC.Core.TopTools import TopTools_ListOfShape
+    def thicken(shape, t, theRange):
+        result = thicken_shape(shape, t, theRange, capture=capture)
+        ctx.check_cancel()
+        return result
 
-    def thicken(shape, t):
-        closing_faces = TopTools_ListOfShape() 
-        builder = BRepOffsetAPI_MakeThickSolid()
-        builder.MakeThickSolidByJoin(
-            shape, closing_faces, t, 1e-3, BRepOffset_Skin, False, False, GeomAbs_Arc
-        )
-        builder.Build()
-        if builder.IsDone():
-            return builder.Shape()
-        return None
+    def thicken_regions(shape, t):
+        """Partitioned offset of large surfaces; None falls back to the whole-body offset"""
+        options = RegionOptions(workers=execution.effective_threads)
+        result, report = thicken_partitioned(shape, t, options, parallel_booleans=execution.parallel_booleans,
+                                             check_cancel=ctx.check_cancel)
+        metrics["region_thickening"] = report.to_dict()
+        if result is not None:
+            where = "serially" if report.workers <= 1 else f"in {report.workers} processes"
+            ctx.log("Phase 2", f"Thickened {report.faces} faces as {len(report.regions)} regions {where} "
+                               f"({report.thicken_seconds:.2f}s offset, {report.stitch_seconds:.2f}s stitch).")
+        else:
+            ctx.log("Phase 2", f"Region thickening not used: {report.fallback_reason}. Thickening whole body...")
+        return result
 
-    thickened_body = thicken(input_shape, -abs(thickness))
-    
-    if thickened_body is None:
-        log("Phase 2", "Thickening failed with negative offset. Trying positive...")
-        thickened_body = thicken(input_shape, abs(thickness))
+    # The thickened body is stored meshed, so repeat runs skip thickening and
+    # Phase 6 only has to tessellate the faces touched by grooves and clips.
+    body_key = body_key_for(input_hash, runtime_params)
+    thickened_body = body_cache.load(body_key) if body_cache is not None else None
+    metrics["body_cache_hit"] = thickened_body is not None
+    if thickened_body is not None:
+        ctx.log("Phase 2", "Reusing cached thickened body (with preview mesh).")
+    else:
+        thickened_body = None
+        if runtime_params.get("region_thickening", False):
+            thickened_body = thicken_regions(input_shape, -abs(thickness))
+        if thickened_body is None:
+            thickened_body = thicken(input_shape, -abs(thickness), ctx.detached_range("Phase 2", 0.0))
         
-    if thickened_body is None:
-        log("Phase 2", "Critical Error: Thickening failed in both directions.")
-        return False, "Thickening failed."
+        if thickened_body is None:
+            ctx.log("Phase 2", "Thickening failed with negative offset. Trying positive...")
+            thickened_body = thicken(input_shape, abs(thickness), ctx.detached_range("Phase 2", 0.4))
+            
+        if thickened_body is None:
+            ctx.log("Phase 2", "Critical Error: Thickening failed in both directions.")
+            return False, "Thickening failed.", input_shape, None
 
     props_check = GProp_GProps()
     brepgprop.VolumeProperties(thickened_body, props_check)
     if props_check.Mass() < 0:
-        log("Phase 2", "Notice: Negative Volume detected. Reversing orientation...")
+        ctx.log("Phase 2", "Notice: Negative Volume detected. Reversing orientation...")
         thickened_body.Reverse()
-        
-    # ==========================================
-    # PHASE 3: GEOMETRY PRESERVATION CHECK
-    # ==========================================
-    log("Phase 3", "Verifying outer geometry preservation...")
-    dist_tool = BRepExtrema_DistShapeShape(input_shape, thickened_body)
-    dist_tool.Perform()
-    dev = dist_tool.Value()
-    if dev > 1e-3:
-       log("Phase 3", f"Warning: Deviation {dev:.4f}mm detected.")
-
-    # ==========================================
-    # PHASE 4: GROOVE GENERATION
-    # ==========================================
-    log("Phase 4", "Generating Parametric Grooves...")
+    metrics["thickened_volume"] = abs(props_check.Mass())
     
-    # Identitfy inner faces for potential use (though centroids are often used)
-    # This logic remains for consistency
-    inner_faces = []
-    # ... (rest of inner_faces logic suppressed for brevity but preserved in real execution)
+    if not metrics["body_cache_hit"]:
+        if checkpoint is not None:
+            checkpoint("Phase 2 mesh")
+        mesh_shape(thickened_body, PREVIEW_DEFLECTION, ctx.detached_range("Phase 2", 0.8), execution.parallel_mesh)
+        ctx.check_cancel()
+        if body_cache is not None:
+            body_cache.store(body_key, thickened_body)
     
+    return True, "Success", input_shape, thickened_body
+
+def build_feature_params(runtime_params: dict):
+    """Groove and clip parameters of a run. Returns (groove_params, clip_params, valid, message)."""
     groove_params = GrooveParameters(
         width=runtime_params["groove_width"],
         depth=runtime_params["groove_depth"],
@@ -157,137 +493,390 @@ def run_pipeline(input_path: str, output_path: str, runtime_params: dict):
         length=runtime_params["groove_height"],
         type=runtime_params["groove_shape"]
     )
-    groove_generator = GrooveGenerator(groove_params)
-    
     clip_params = ClipParameters(
         groove_params=groove_params,
         height=runtime_params["clip_height"],
         assembly_clearance=runtime_params["assembly_clearance"],
         retention_offset=runtime_params["retention_offset"]
     )
-    
     is_valid, msg = clip_params.validate()
-    if not is_valid:
-        log("Phase 4", f"Critical Error: Invalid clip parameters - {msg}")
-        return False, f"Invalid clip parameters: {msg}"
-    
-    clip_generator = ClipGenerator(clip_params)
-    
-    grooves_to_cut = []
-    clips_to_fuse = []
-    
-    from OCC.Core.gp import gp_Pnt
-    from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_MakeVertex
-    from OCC.Core.BRep import BRep_Tool
-    from OCC.Core.BRepLProp import BRepLProp_SLProps
-    import OCC.Core.ShapeAnalysis as SA
-    
-    target_count = runtime_params["groove_count"]
-    locations_to_process = REFERENCE_CENTROIDS[:target_count]
+    return groove_params, clip_params, is_valid, msg
+
+def project_placements(thickened_body, locations, execution: ExecutionSettings,
+                       ctx: Optional[PipelineContext] = None, key: str = "") -> PlacementTable:
+    """
+    Projects reference locations onto the thickened body.
+    Returns a PlacementTable with the closest point, supporting face, UV and outward
+    surface normal of every location (rows that miss a face stay invalid).
+    """
+    from OCC.Core.TopExp import topexp
+    from OCC.Core.TopTools import TopTools_IndexedMapOfShape
     
-    for i, (rx, ry, rz) in enumerate(locations_to_process):
-        target_pnt = gp_Pnt(rx, ry, rz)
-        vertex_maker = BRepBuilderAPI_MakeVertex(target_pnt)
-        dist_calc = BRepExtrema_DistShapeShape(vertex_maker.Vertex(), thickened_body)
-        dist_calc.Perform()
+    table = PlacementTable.empty(len(locations), key)
+    face_map = TopTools_IndexedMapOfShape()
+    topexp.MapShapes(thickened_body, TopAbs_FACE, face_map)
+    for i, (rx, ry, rz) in enumerate(locations):
+        table.locations[i] = (rx, ry, rz)
+        if ctx is not None:
+            ctx.check_cancel()
+            ctx.progress("Phase 4", 0.3 * i / max(len(locations), 1), f"Placing feature {i + 1}/{len(locations)}")
+        vertex_maker = BRepBuilderAPI_MakeVertex(gp_Pnt(rx, ry, rz))
+        dist_calc = distance_query(vertex_maker.Vertex(), thickened_body, execution)
         
         if dist_calc.IsDone() and dist_calc.NbSolution() > 0:
             closest_pnt = dist_calc.PointOnShape2(1)
             support = dist_calc.SupportOnShape2(1)
             if support.ShapeType() == TopAbs_FACE:
                 face = topods.Face(support)
-                sas = SA.ShapeAnalysis_Surface(BRep_Tool.Surface(face))
+                sas = ShapeAnalysis_Surface(BRep_Tool.Surface(face))
                 uv = sas.ValueOfUV(closest_pnt, 0.1)
                 props = BRepLProp_SLProps(BRepAdaptor_Surface(face), uv.X(), uv.Y(), 1, 1e-6)
                 if props.IsNormalDefined():
                     normal = props.Normal()
-                    groove_shape = groove_generator.create_shape()
-                    placed_groove = groove_generator.place_shape(groove_shape, closest_pnt, normal)
-                    grooves_to_cut.append(placed_groove)
-                    clip_shape = clip_generator.create_shape()
-                    placed_clip = clip_generator.place_shape(clip_shape, closest_pnt, normal)
-                    clips_to_fuse.append(placed_clip)
-
-    # Boolean Cuts (Sub-logic encapsulated in main script for now)
-    final_solid = thickened_body
-    if grooves_to_cut:
-        from OCC.Core.BRepAlgoAPI import BRepAlgoAPI_Fuse
-        valid_cut = False
+                    table.points[i] = (closest_pnt.X(), closest_pnt.Y(), closest_pnt.Z())
+                    table.normals[i] = (normal.X(), normal.Y(), normal.Z())
+                    table.uv[i] = (uv.X(), uv.Y())
+                    table.face_index[i] = face_map.FindIndex(face)
+                    table.distance[i] = dist_calc.Value()
+    return table
+
+def placement_table_for(ctx: PipelineContext, input_hash: str, runtime_params: dict, thickened_body,
+                        execution: ExecutionSettings, progress: bool = True,
+                        use_cache: bool = True) -> PlacementTable:
+    """
+    Phase 4 projections of the run's placement set, loaded from the placement cache
+    when this body and placement set were projected before (groove settings do not matter).
+    """
+    locations = placement_locations(runtime_params)
+    key = make_placement_key(body_key_for(input_hash, runtime_params), runtime_params["thickness"], locations)
+    cache = PlacementTableCache() if use_cache else None
+    table = cache.load(key) if cache is not None else None
+    ctx.metrics["placement_cache_hit"] = table is not None
+    if table is not None:
+        ctx.log("Phase 4", f"Reusing cached projections of {len(table)} placements.")
+        return table
+    table = project_placements(thickened_body, locations, execution, ctx if progress else None, key)
+    ctx.check_cancel()
+    if cache is not None:
+        cache.store(table)
+    return table
+
+def screen_placements(ctx: PipelineContext, frames, thickened_body, groove_params: GrooveParameters,
+                      clip_params: ClipParameters, policy: str, body_mesh=None):
+    """
+    Wall thickness pre-check of all placements before any boolean runs.
+    Uses the body's stored preview triangulation (or body_mesh=(vertices, triangles)).
+    Returns (success, message, frames_to_use) after applying the wall check policy.
+    """
+    from shape_fingerprint import triangulation_arrays
+    
+    vertices, triangles = body_mesh if body_mesh is not None else triangulation_arrays(thickened_body)
+    report = check_wall_thickness(frames, vertices, triangles, groove_params.depth, clip_params.retention_offset)
+    ctx.metrics["wall_check"] = report.to_dict()
+    for check in report.flagged:
+        ctx.log("Phase 4", f"Warning: placement {check.index + 1} {check.status} - wall {check.wall_thickness:.2f}mm, "
+                           f"groove depth {groove_params.depth}mm, required floor {report.required_floor}mm")
+    ok, msg, frames = apply_wall_policy(frames, report, policy)
+    if not ok:
+        ctx.log("Phase 4", f"Critical Error: {msg}")
+        return False, msg, []
+    if report.checks and not frames:
+        ctx.log("Phase 4", f"Critical Error: No placement passed the wall check - {msg}")
+        return False, f"No placement passed the wall check: {msg}", []
+    if len(frames) < len(report.checks):
+        ctx.log("Phase 4", f"Skipping {len(report.checks) - len(frames)} placement(s) that would break through the wall.")
+    ctx.metrics["wall_check"]["skipped"] = len(report.checks) - len(frames)
+    return True, "Valid", frames
+
+def tool_centroid(tool) -> List[float]:
+    props = GProp_GProps()
+    brepgprop.VolumeProperties(tool, props)
+    c = props.CentreOfMass()
+    return [c.X(), c.Y(), c.Z()]
+
+def _try_tool_group(ctx: PipelineContext, solid, volume: float, group, op_class, operation: str,
+                    expected_per_tool: float, tolerance: VolumeTolerance, execution: ExecutionSettings,
+                    theRange, capture: Optional[OperationCapture]):
+    """
+    One boolean of `solid` with the union of a group of (index, tool) pairs.
+    Returns (result or None, volume after, VolumeDeltaCheck or None, error message).
+    """
+    try:
+        tool_body = group[0][1]
+        for _, tool in group[1:]:
+            ctx.check_cancel()
+            fuser = boolean_op(BRepAlgoAPI_Fuse, tool_body, tool, execution, capture=capture)
+            if not fuser.IsDone():
+                return None, volume, None, "tool union failed"
+            tool_body = fuser.Shape()
+        op = boolean_op(op_class, solid, tool_body, execution, theRange, capture=capture)
+        ctx.check_cancel()
+        if not op.IsDone():
+            return None, volume, None, f"{operation} failed"
+        result = op.Shape()
+        volume_after = shape_volume(result)
+        check = check_volume_delta(operation, len(group), volume, volume_after, expected_per_tool, tolerance)
+        return result, volume_after, check, "" if check.passed else check.validate()[1]
+    except PipelineCancelled: raise
+    except Exception as e:
+        return None, volume, None, f"{operation} raised {e!r}"
+
+def _apply_tool_group(ctx: PipelineContext, solid, volume: float, group, op_class, operation: str,
+                      expected_per_tool: float, tolerance: VolumeTolerance, execution: ExecutionSettings,
+                      report: dict, capture: Optional[OperationCapture], theRange=None,
+                      checkpoint: Optional[Callable[[str], object]] = None):
+    """
+    Applies a group of tools in bulk; if that fails, splits the group in halves and
+    recurses, so a bad tool among n costs O(log n) body booleans instead of n.
+    Indices of applied tools are added to report["accepted"]. Returns (solid, volume).
+    """
+    if checkpoint is not None:
+        checkpoint(f"Phase 4 {operation} of {len(group)} tool(s)")
+    result, volume_after, check, error = _try_tool_group(
+        ctx, solid, volume, group, op_class, operation, expected_per_tool, tolerance, execution, theRange, capture)
+    report["booleans"] += 1
+    if report["combined"] is None:
+        report["combined"] = check.to_dict() if check is not None else {"error": error}
+    if result is not None and check.passed:
+        report["accepted"].extend(index for index, _ in group)
+        return result, volume_after
+    
+    if len(group) == 1:
+        index, tool = group[0]
+        entry = {"index": index, "centroid": tool_centroid(tool), "reason": error}
+        # A lone tool whose volume change is merely off (e.g. on a strongly curved wall) is
+        # kept as suspect; one that fails or changes the body by far more or less than its
+        # own closed-form volume is left out.
+        if result is not None and check.plausible:
+            report["suspect"].append(entry)
+            report["accepted"].append(index)
+            ctx.log("Phase 4", f"Warning: tool {index + 1} at {_format_point(entry['centroid'])} is suspect - {error}")
+            return result, volume_after
+        report["rejected"].append(entry)
+        ctx.log("Phase 4", f"Warning: tool {index + 1} at {_format_point(entry['centroid'])} skipped - {error}")
+        return solid, volume
+    
+    if not report["fallback"]:
+        report["fallback"] = True
+        ctx.log("Phase 4", f"Warning: Combined {operation} rejected ({error}) - bisecting {len(group)} tools.")
+    mid = len(group) // 2
+    solid, volume = _apply_tool_group(ctx, solid, volume, group[:mid], op_class, operation, expected_per_tool,
+                                      tolerance, execution, report, capture, checkpoint=checkpoint)
+    return _apply_tool_group(ctx, solid, volume, group[mid:], op_class, operation, expected_per_tool,
+                             tolerance, execution, report, capture, checkpoint=checkpoint)
+
+def _format_point(point) -> str:
+    return "(" + ", ".join(f"{v:.2f}" for v in point) + ")"
+
+def apply_tools(ctx: PipelineContext, solid, tools, op_class, expected_per_tool: float,
+                tolerance: VolumeTolerance, execution: ExecutionSettings, theRange=None,
+                capture: Optional[OperationCapture] = None, indices: Optional[List[int]] = None,
+                checkpoint: Optional[Callable[[str], object]] = None):
+    """
+    Cuts/fuses all tools with a single boolean (tools fused together first) and checks
+    the body's volume change against tools x expected_per_tool.
+    
+    When the combined result fails or disagrees, the tool set is bisected: halves that
+    pass are applied in bulk and only failing halves are split further. Problem tools
+    end up isolated and are reported by index and centroid.
+    `indices` numbers the tools in logs and reports (default: their position);
+    `checkpoint` (MemoryGuard.checkpoint) is called before every body boolean.
+    Returns (solid, indices of the applied tools in ascending order, report).
+    """
+    indices = list(range(len(tools))) if indices is None else list(indices)
+    operation = OP_CUT if op_class is BRepAlgoAPI_Cut else OP_FUSE
+    report = {"fallback": False, "combined": None, "booleans": 0, "suspect": [], "rejected": [], "accepted": []}
+    solid, volume = _apply_tool_group(ctx, solid, shape_volume(solid), list(zip(indices, tools)), op_class, operation,
+                                      expected_per_tool, tolerance, execution, report, capture, theRange,
+                                      checkpoint)
+    if not (report["fallback"] or report["rejected"] or report["suspect"]):
+        check = report["combined"]
+        ctx.log("Phase 4", f"Combined {operation} verified: volume change {check['actual']:.1f}mm^3 "
+                           f"(expected {check['expected']:.1f}mm^3).")
+    else:
+        ctx.log("Phase 4", f"Fallback {operation} used {report['booleans']} body booleans for {len(tools)} tools "
+                           f"({len(report['rejected'])} skipped, {len(report['suspect'])} suspect).")
+    report["accepted"].sort()
+    return solid, list(report["accepted"]), report
+
+def _run_phases(ctx: PipelineContext, input_path: str, output_path: str, runtime_params: dict,
+                execution: ExecutionSettings, capture: Optional[OperationCapture] = None,
+                guard: Optional[MemoryGuard] = None, input_hash: Optional[str] = None,
+                use_cache: bool = True):
+    metrics = ctx.metrics
+    checkpoint = guard.checkpoint if guard is not None else (lambda label: None)
+    wall_policy = runtime_params.get("wall_check", POLICY_SKIP)
+    depth_ok, depth_msg = check_depth_against_thickness(runtime_params["thickness"], runtime_params["groove_depth"])
+    if not depth_ok:
+        # Only "fail" stops here; "skip" drops the placements the wall check finds
+        # breaking through, "warn" keeps them.
+        if wall_policy == POLICY_FAIL:
+            ctx.log("Phase 1", f"Error: {depth_msg}")
+            return False, depth_msg
+        ctx.log("Phase 1", f"Warning: {depth_msg}")
+    
+    # Hashed once per run: the body, import and placement caches all key on it.
+    if input_hash is None:
         try:
-            tool_body = grooves_to_cut[0]
-            for i in range(1, len(grooves_to_cut)):
-                fuser = BRepAlgoAPI_Fuse(tool_body, grooves_to_cut[i])
-                fuser.SetFuzzyValue(0.1)
-                fuser.Build()
-                if fuser.IsDone(): tool_body = fuser.Shape()
-            cutter = BRepAlgoAPI_Cut(thickened_body, tool_body)
-            cutter.SetFuzzyValue(0.1)
-            cutter.Build()
-            if cutter.IsDone() and GProp_GProps().Mass() != 0: # Simple check
-                 final_solid = cutter.Shape()
-                 valid_cut = True
-        except: pass
+            input_hash = file_content_hash(input_path)
+        except OSError:
+            ctx.log("Phase 1", "Error: Could not read file.")
+            return False, "Could not read STEP file."
+    metrics["input_hash"] = input_hash
+
+    success, message, input_shape, thickened_body = prepare_body(ctx, input_path, input_hash, runtime_params,
+                                                                 execution, capture, checkpoint, use_cache)
+    if not success:
+        return False, message
+    checkpoint("Phase 2")
         
-        if not valid_cut:
-            temp_solid = thickened_body
-            for tool in grooves_to_cut:
-                cutter = BRepAlgoAPI_Cut(temp_solid, tool)
-                cutter.SetFuzzyValue(0.1)
-                cutter.Build()
-                if cutter.IsDone(): temp_solid = cutter.Shape()
-            final_solid = temp_solid
+    # ==========================================
+    # PHASE 3: GEOMETRY PRESERVATION CHECK
+    # ==========================================
+    ctx.start_phase("Phase 3", "Geometry Preservation Check")
+    ctx.log("Phase 3", "Verifying outer geometry preservation...")
+    dist_tool = distance_query(input_shape, thickened_body, execution, ctx.detached_range("Phase 3"), capture=capture)
+    ctx.check_cancel()
+    dev = dist_tool.Value()
+    metrics["outer_deviation"] = dev
+    if dev > 1e-3:
+       ctx.log("Phase 3", f"Warning: Deviation {dev:.4f}mm detected.")
+    # Phase 3 is the last user of the imported shape
+    dist_tool = input_shape = None
+    checkpoint("Phase 3")
 
+    # ==========================================
+    # PHASE 4: GROOVE GENERATION
+    # ==========================================
+    ctx.start_phase("Phase 4", "Groove/Clip Generation")
+    ctx.log("Phase 4", "Generating Parametric Grooves...")
+    
+    groove_params, clip_params, is_valid, msg = build_feature_params(runtime_params)
+    if not is_valid:
+        ctx.log("Phase 4", f"Critical Error: Invalid clip parameters - {msg}")
+        return False, f"Invalid clip parameters: {msg}"
+    
+    groove_generator = GrooveGenerator(groove_params)
+    clip_generator = ClipGenerator(clip_params)
+    
+    grooves_to_cut = []
+    clips_to_fuse = []
+    
+    placement_table = placement_table_for(ctx, input_hash, runtime_params, thickened_body, execution,
+                                          use_cache=use_cache)
+    metrics["placement_table"] = placement_table.to_dict()
+    frames_path = frames_path_for(output_path)
+    try:
+        placement_table.save(frames_path)
+        metrics["placement_table"]["path"] = frames_path
+    except OSError as e:
+        ctx.log("Phase 4", f"Warning: Could not export placement table: {e}")
+    placements = placement_table.frames()
+    success, message, placements = screen_placements(ctx, placements, thickened_body, groove_params,
+                                                     clip_params, wall_policy)
+    if not success:
+        return False, message
+    for closest_pnt, normal in placements:
+        groove_shape = groove_generator.create_shape()
+        placed_groove = groove_generator.place_shape(groove_shape, closest_pnt, normal)
+        grooves_to_cut.append(placed_groove)
+    metrics["placements"] = len(grooves_to_cut)
+    checkpoint("Phase 4 placement")
+
+    # Boolean Cuts / Fuses: all tools at once, verified against closed-form volumes
+    tolerance = VolumeTolerance()
+    final_solid = thickened_body
+    volume_checks = {}
+    cut_indices = []
+    if grooves_to_cut:
+        final_solid, cut_indices, volume_checks["cut"] = apply_tools(
+            ctx, final_solid, grooves_to_cut, BRepAlgoAPI_Cut, expected_cut_volume(groove_params), tolerance,
+            execution, ctx.detached_range("Phase 4", 0.3), capture, checkpoint=checkpoint)
+        metrics["cut_fallback"] = volume_checks["cut"]["fallback"]
+    grooves_to_cut = None
+
+    # Once the cut result exists, the pre-boolean body is only needed again in Phase 6
+    # (to find the faces that need meshing); under a memory budget it may be spilled
+    # to disk until then.
+    retained_body = guard.retain("thickened_body", thickened_body) if guard is not None else None
+    if retained_body is not None:
+        thickened_body = None
+    checkpoint("Phase 4 cut")
+
+    # Clips are placed only now, so they are not held in memory during the cut, and
+    # only where the groove was cut (a clip on uncut material would fail the fuse).
+    for index in cut_indices:
+        closest_pnt, normal = placements[index]
+        clip_shape = clip_generator.create_shape()
+        placed_clip = clip_generator.place_shape(clip_shape, closest_pnt, normal)
+        clips_to_fuse.append(placed_clip)
+    if len(cut_indices) < len(placements):
+        ctx.log("Phase 4", f"Skipping {len(placements) - len(cut_indices)} clip(s) whose groove was not cut.")
     if clips_to_fuse:
-        from OCC.Core.BRepAlgoAPI import BRepAlgoAPI_Fuse
-        valid_fuse = False
-        try:
-            clip_body = clips_to_fuse[0]
-            for i in range(1, len(clips_to_fuse)):
-                fuser = BRepAlgoAPI_Fuse(clip_body, clips_to_fuse[i])
-                fuser.SetFuzzyValue(0.1)
-                fuser.Build()
-                if fuser.IsDone(): clip_body = fuser.Shape()
-            fuser = BRepAlgoAPI_Fuse(final_solid, clip_body)
-            fuser.SetFuzzyValue(0.1)
-            fuser.Build()
-            if fuser.IsDone():
-                final_solid = fuser.Shape()
-                valid_fuse = True
-        except: pass
-        if not valid_fuse:
-            temp_solid = final_solid
-            for clip in clips_to_fuse:
-                fuser = BRepAlgoAPI_Fuse(temp_solid, clip)
-                fuser.SetFuzzyValue(0.1)
-                fuser.Build()
-                if fuser.IsDone(): temp_solid = fuser.Shape()
-            final_solid = temp_solid
+        final_solid, _, volume_checks["fuse"] = apply_tools(
+            ctx, final_solid, clips_to_fuse, BRepAlgoAPI_Fuse, expected_fuse_volume(clip_generator), tolerance,
+            execution, ctx.detached_range("Phase 4", 0.6), capture, indices=cut_indices, checkpoint=checkpoint)
+        metrics["fuse_fallback"] = volume_checks["fuse"]["fallback"]
+    metrics["volume_check"] = volume_checks
+    clips_to_fuse = None
+    checkpoint("Phase 4 fuse")
 
     # ==========================================
     # PHASE 5: FINAL VALIDATION
     # ==========================================
-    log("Phase 5", "Validating Final Solid...")
-    check_validity(final_solid, "Final Output")
+    ctx.start_phase("Phase 5", "Final Validation")
+    ctx.log("Phase 5", "Validating Final Solid...")
+    metrics["final_valid"] = check_validity(final_solid, "Final Output", ctx, execution.parallel_check)
+    checkpoint("Phase 5")
     
     # ==========================================
     # PHASE 6: EXPORT
     # ==========================================
-    log("Phase 6", f"Exporting to {output_path}...")
+    ctx.start_phase("Phase 6", "Export")
+    ctx.log("Phase 6", f"Exporting to {output_path}...")
     
     # Export STEP
     writer = STEPControl_Writer()
-    writer.Transfer(final_solid, STEPControl_AsIs)
+    writer.Transfer(final_solid, STEPControl_AsIs, True, ctx.detached_range("Phase 6", 0.0))
+    ctx.check_cancel()
+    # After the transfer only the STEP model is needed until meshing, so the final
+    # solid may be spilled while the file is written.
+    retained_solid = guard.retain("final_solid", final_solid) if guard is not None else None
+    if retained_solid is not None:
+        final_solid = None
+    checkpoint("Phase 6 STEP transfer")
     status = writer.Write(output_path)
+    # Free the transferred STEP model before meshing
+    writer = None
+    if retained_solid is not None:
+        final_solid = retained_solid.get()
+        retained_solid.release()
+    checkpoint("Phase 6 STEP")
     
     # Export STL for preview
     try:
         stl_path = output_path.replace(".stp", ".stl").replace(".step", ".stl")
-        log("Phase 6", f"Generating preview STL: {stl_path}")
-        BRepMesh_IncrementalMesh(final_solid, 0.1)
+        ctx.log("Phase 6", f"Generating preview STL: {stl_path}")
+        if retained_body is not None:
+            # Shapes read back from disk share no faces with each other, so face identity
+            # only holds while neither went through a spill.
+            spilled = (retained_body.spilled or retained_body.reloaded
+                       or (retained_solid is not None and retained_solid.reloaded))
+            thickened_body = None if spilled else retained_body.get()
+            retained_body.release()
+        checkpoint("Phase 6 mesh")
+        changed_faces, total_faces = mesh_changed_faces(
+            final_solid, thickened_body, PREVIEW_DEFLECTION, ctx.detached_range("Phase 6", 0.5), execution.parallel_mesh)
+        ctx.check_cancel()
+        metrics["remeshed_faces"] = changed_faces
+        metrics["total_faces"] = total_faces
+        ctx.log("Phase 6", f"Re-meshed {changed_faces}/{total_faces} faces (others reuse the body mesh).")
         stl_writer = StlAPI_Writer()
         stl_writer.Write(final_solid, stl_path)
+    except PipelineCancelled:
+        raise
     except Exception as e:
-        log("Phase 6", f"Warning: Could not generate STL preview: {e}")
+        ctx.log("Phase 6", f"Warning: Could not generate STL preview: {e}")
     
     if status == 1:
         return True, "Success"
@@ -298,11 +887,56 @@ def main():
     parser = argparse.ArgumentParser(description="Gen-CAD Step Processing Pipeline")
     parser.add_argument("--input", default="Part_style.stp", help="Input STEP file")
     parser.add_argument("--output", default="Part_style_thickened_with_grooves_and_clips.stp", help="Output STEP file")
+    parser.add_argument("--no-cache", action="store_true", help="Always run the pipeline, bypassing the result, body and placement caches")
+    parser.add_argument("--simplify", action="store_true", help="Merge same-domain faces/edges before thickening")
+    parser.add_argument("--sliver-tolerance", type=float, default=0.0, help="Heal sliver faces thinner than this (mm, with --simplify)")
+    parser.add_argument("--region-thickening", action="store_true", help="Thicken large surfaces as smooth-bounded face regions in parallel worker processes (serially with --threads 1)")
+    parser.add_argument("--wall-check", choices=["skip", "warn", "fail"], default="skip", help="Placements whose groove would break through the wall: skip them, only warn, or fail the run")
+    parser.add_argument("--placements", default=None, help="Placement set JSON (e.g. from synthetic_parts.py) replacing the reference centroids")
+    parser.add_argument("--profile", action="store_true", help="Profile the run (bypasses the result cache); writes .profile.pstats and .profile.collapsed next to the output")
+    parser.add_argument("--preview", action="store_true", help="Only write an approximate preview STL (no booleans, no STEP)")
+    add_execution_arguments(parser)
+    add_capture_arguments(parser)
+    add_memory_arguments(parser)
     args = parser.parse_args()
+    execution = execution_from_args(args)
+    capture = capture_from_args(args)
+    memory = memory_from_args(args)
     
     runtime_params = collect_all_inputs()
+    runtime_params["simplify_input"] = args.simplify
+    runtime_params["sliver_tolerance"] = args.sliver_tolerance
+    runtime_params["region_thickening"] = args.region_thickening
+    runtime_params["wall_check"] = args.wall_check
+    if args.placements:
+        from synthetic_parts import load_placements
+        runtime_params.update(load_placements(args.placements))
+    
+    if args.preview:
+        from preview_mesh import run_preview
+        from result_cache import stl_path_for
+        stl_path = stl_path_for(args.output).replace(".stl", "_preview.stl")
+        success, message, _ = run_preview(args.input, runtime_params, stl_path, execution=execution,
+                                          use_cache=not args.no_cache)
+        log("Final", f"Preview written to {stl_path}" if success else f"Preview failed: {message}")
+        return
     
-    success, message = run_pipeline(args.input, args.output, runtime_params)
+    features = JobFeatures.from_path(args.input, runtime_params)
+    log("Final", f"Estimated runtime: {RuntimeEstimator.from_history().predict(features):.1f}s")
+    
+    start_time = time.perf_counter()
+    if args.no_cache or args.profile:
+        success, message = run_pipeline(args.input, args.output, runtime_params, execution=execution,
+                                        capture=capture, profile=args.profile, memory=memory,
+                                        use_cache=not args.no_cache)
+        cache_hit = False
+    else:
+        from result_cache import cached_run_pipeline
+        success, message, metrics = cached_run_pipeline(args.input, args.output, runtime_params,
+                                                        execution=execution, capture=capture, memory=memory)
+        cache_hit = metrics["cache_hit"]
+    if not cache_hit:
+        record_run(features, time.perf_counter() - start_time, success)
     if success:
         log("Final", "Pipeline completed successfully.")
     else:
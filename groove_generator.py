@@ -7,8 +7,6 @@ Handles:
 """
 
 import math
-from dataclasses import dataclass
-from enum import Enum
 from typing import List, Tuple, Optional
 
 from OCC.Core.gp import gp_Pnt, gp_Vec, gp_Dir, gp_Ax2, gp_Trsf, gp_Quaternion, gp_Ax1
@@ -24,20 +22,8 @@ from OCC.Core.BRepFilletAPI import BRepFilletAPI_MakeFillet
 from OCC.Core.TopExp import TopExp_Explorer
 from OCC.Core.TopoDS import topods
 
-class GrooveType(Enum):
-    RECTANGULAR = "rectangular"
-    CIRCULAR = "circular"
-    SQUARE = "square"
-    TRIANGLE = "triangle"
+from groove_parameters import GrooveParameters, GrooveType  # re-exported
 
-@dataclass
-class GrooveParameters:
-    width: float = 2.0
-    depth: float = 1.0
-    height: float = 10.0  # Extrusion height (formerly 'length')
-    length: float = 10.0  # Kept for backward compatibility
-    type: GrooveType = GrooveType.RECTANGULAR
-    fillet_radius: float = 0.0  # Optional bottom fillet for U-shape
 
 class GrooveGenerator:
     def __init__(self, params: GrooveParameters):
@@ -150,7 +136,11 @@ class GrooveGenerator:
         Groove Depth is -Z.
         If we align Z to Normal, the groove shape (0 to -d) will go INTO the material. Correct.
         """
-        
+        transformer = BRepBuilderAPI_Transform(shape, self.placement_trsf(location, normal, tangent))
+        return transformer.Shape()
+
+    def placement_trsf(self, location: gp_Pnt, normal: gp_Dir, tangent: Optional[gp_Dir] = None) -> gp_Trsf:
+        """Transformation used by place_shape (also applied to preview meshes)."""
         # 1. Rotation
         # Align Local Z (0,0,1) with Surface Normal
         trsf_rot = gp_Trsf()
@@ -166,10 +156,7 @@ class GrooveGenerator:
         trsf_mov = gp_Trsf()
         trsf_mov.SetTranslation(gp_Vec(location.XYZ()))
         
-        full_trsf = trsf_mov.Multiplied(trsf_rot)
-        
-        transformer = BRepBuilderAPI_Transform(shape, full_trsf)
-        return transformer.Shape()
+        return trsf_mov.Multiplied(trsf_rot)
 
 def compute_placement_frames(face: TopoDS_Shape, num_points: int = 5, offset_from_edge: float = 5.0) -> List[Tuple[gp_Pnt, gp_Dir]]:
     """
@@ -0,0 +1,26 @@
+"""
+Groove Parameter Types Module
+
+Handles:
+1. The GrooveType enum and GrooveParameters dataclass shared by the generators,
+   runtime input, volume checks, screening and the cost model.
+2. Keeping those types importable without OCC (groove_generator re-exports them).
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+
+class GrooveType(Enum):
+    RECTANGULAR = "rectangular"
+    CIRCULAR = "circular"
+    SQUARE = "square"
+    TRIANGLE = "triangle"
+
+@dataclass
+class GrooveParameters:
+    width: float = 2.0
+    depth: float = 1.0
+    height: float = 10.0  # Extrusion height (formerly 'length')
+    length: float = 10.0  # Kept for backward compatibility
+    type: GrooveType = GrooveType.RECTANGULAR
+    fillet_radius: float = 0.0  # Optional bottom fillet for U-shape
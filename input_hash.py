@@ -0,0 +1,26 @@
+"""
+Input Content Hash Module
+
+Handles:
+1. SHA-256 of an input file's content, computed once per run and passed to every
+   cache key that depends on the input (result, thickened body, import, placement).
+2. Hashing of canonical JSON key payloads, shared by the cache modules.
+"""
+
+import json
+import hashlib
+
+
+def file_content_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def payload_hash(payload: dict) -> str:
+    """SHA-256 of a JSON payload with sorted keys (key order does not matter)"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
@@ -0,0 +1,257 @@
+"""
+Pipeline Job Scheduler Module
+
+Handles:
+1. Queuing of pipeline jobs with a predicted runtime (see cost_model).
+2. Shortest-job-first ordering and packing of jobs onto a pool of workers.
+3. Warning about or refusing jobs predicted to exceed a time budget.
+
+Also provides a batch command line:
+    python job_scheduler.py --inputs a.stp b.stp --params params.json --workers 4
+"""
+
+import os
+import json
+import time
+import argparse
+import heapq
+import multiprocessing
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from cost_model import JobFeatures, RuntimeEstimator, record_run, RUN_HISTORY_PATH
+from runtime_input import normalize_runtime_params
+from execution_settings import ExecutionSettings, add_execution_arguments, execution_from_args, default_thread_count
+from memory_budget import MemoryBudget, add_memory_arguments, memory_from_args
+
+BUDGET_WARN = "warn"
+BUDGET_REFUSE = "refuse"
+
+
+@dataclass
+class PipelineJob:
+    """A queued run_pipeline invocation"""
+    input_path: str
+    output_path: str
+    runtime_params: dict
+    features: Optional[JobFeatures] = None
+    estimate: float = 0.0
+    job_id: int = 0
+    warnings: List[str] = field(default_factory=list)
+
+
+@dataclass
+class JobResult:
+    """Outcome of an executed job"""
+    job: PipelineJob
+    success: bool
+    message: str
+    duration: float
+    worker: int = -1
+    cache_hit: bool = False
+
+
+def _execute_job(input_path: str, output_path: str, runtime_params: dict,
+                 use_cache: bool = True,
+                 execution: Optional[ExecutionSettings] = None,
+                 memory: Optional[MemoryBudget] = None) -> Tuple[bool, str, float, bool, int]:
+    """Worker entry point (top-level so it can be pickled); also returns the worker's pid"""
+    from gen_cad_pipeline import run_pipeline
+    from result_cache import cached_run_pipeline
+
+    start_time = time.perf_counter()
+    cache_hit = False
+    try:
+        if use_cache:
+            success, message, metrics = cached_run_pipeline(input_path, output_path, runtime_params,
+                                                            execution=execution, memory=memory)
+            cache_hit = metrics["cache_hit"]
+        else:
+            success, message = run_pipeline(input_path, output_path, runtime_params, execution=execution,
+                                            memory=memory, use_cache=False)
+    except Exception as e:
+        success, message = False, f"Critical Error: {e}"
+    return success, message, time.perf_counter() - start_time, cache_hit, os.getpid()
+
+
+class JobScheduler:
+    """
+    Orders queued jobs shortest-first by predicted runtime and packs them onto workers.
+    """
+
+    def __init__(self, estimator: Optional[RuntimeEstimator] = None, workers: int = 1,
+                 time_budget: Optional[float] = None, budget_policy: str = BUDGET_WARN,
+                 history_path: str = RUN_HISTORY_PATH, use_cache: bool = True,
+                 execution: Optional[ExecutionSettings] = None, memory: Optional[MemoryBudget] = None):
+        if budget_policy not in (BUDGET_WARN, BUDGET_REFUSE):
+            raise ValueError(f"Unknown budget policy '{budget_policy}'")
+        self.estimator = estimator or RuntimeEstimator.from_history(history_path)
+        self.workers = max(1, int(workers))
+        self.time_budget = time_budget
+        self.budget_policy = budget_policy
+        self.history_path = history_path
+        self.use_cache = use_cache
+        # Workers share the cores unless the caller sized the OCC thread pool explicitly.
+        self.execution = execution or ExecutionSettings(threads=default_thread_count(self.workers))
+        self.memory = memory
+        self._queue: List[PipelineJob] = []
+        self._next_id = 0
+
+    def submit(self, job: PipelineJob) -> Tuple[bool, str]:
+        """Estimates and queues a job. Returns (accepted, message)."""
+        if job.features is None:
+            job.features = JobFeatures.from_path(job.input_path, job.runtime_params)
+        job.estimate = self.estimator.predict(job.features)
+        job.job_id = self._next_id
+        self._next_id += 1
+
+        if self.time_budget is not None and job.estimate > self.time_budget:
+            msg = (f"Predicted runtime {job.estimate:.1f}s exceeds budget "
+                   f"{self.time_budget:.1f}s")
+            if self.budget_policy == BUDGET_REFUSE:
+                return False, msg
+            job.warnings.append(msg)
+            self._queue.append(job)
+            return True, f"Queued with warning: {msg}"
+
+        self._queue.append(job)
+        return True, f"Queued (estimate {job.estimate:.1f}s)"
+
+    @property
+    def queued(self) -> List[PipelineJob]:
+        return list(self._queue)
+
+    def ordered_jobs(self) -> List[PipelineJob]:
+        """Shortest predicted job first; ties keep submission order"""
+        return sorted(self._queue, key=lambda j: (j.estimate, j.job_id))
+
+    def plan(self) -> Dict[int, List[PipelineJob]]:
+        """
+        Assigns jobs (shortest-first) to the worker that becomes free earliest.
+        This mirrors what a process pool does when fed in the same order.
+        """
+        assignments: Dict[int, List[PipelineJob]] = {w: [] for w in range(self.workers)}
+        free_at = [(0.0, w) for w in range(self.workers)]
+        heapq.heapify(free_at)
+        for job in self.ordered_jobs():
+            ready, worker = heapq.heappop(free_at)
+            assignments[worker].append(job)
+            heapq.heappush(free_at, (ready + job.estimate, worker))
+        return assignments
+
+    def predicted_makespan(self) -> float:
+        plan = self.plan()
+        return max((sum(j.estimate for j in jobs) for jobs in plan.values()), default=0.0)
+
+    def run(self) -> List[JobResult]:
+        """Executes all queued jobs and records their runtimes to the history."""
+        ordered = self.ordered_jobs()
+        self._queue = []
+        results = []
+
+        if self.workers == 1:
+            for job in ordered:
+                success, message, duration, cache_hit, _ = _execute_job(
+                    job.input_path, job.output_path, job.runtime_params, self.use_cache, self.execution, self.memory)
+                self._record(job, duration, success, cache_hit)
+                results.append(JobResult(job, success, message, duration, worker=0, cache_hit=cache_hit))
+            return results
+
+        # spawn: OCC state must not be inherited through fork
+        worker_ids: Dict[int, int] = {}  # pid -> worker index, in order of first result
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {
+                pool.submit(_execute_job, job.input_path, job.output_path, job.runtime_params,
+                            self.use_cache, self.execution, self.memory): job
+                for job in ordered
+            }
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    success, message, duration, cache_hit, pid = future.result()
+                    worker = worker_ids.setdefault(pid, len(worker_ids))
+                except Exception as e:
+                    success, message, duration, cache_hit, worker = False, f"Worker Error: {e}", 0.0, False, -1
+                self._record(job, duration, success, cache_hit)
+                results.append(JobResult(job, success, message, duration, worker=worker, cache_hit=cache_hit))
+        return results
+
+    def _record(self, job: PipelineJob, duration: float, success: bool, cache_hit: bool) -> None:
+        # Cache hits say nothing about pipeline cost; keep them out of the training data.
+        if not cache_hit:
+            record_run(job.features, duration, success, self.history_path)
+
+
+def batch_output_path(input_path: str, output_dir: str, variant: Optional[int] = None) -> str:
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    suffix = "" if variant is None else f"_d{variant:04d}"
+    return os.path.join(output_dir, f"{stem}_processed{suffix}.stp")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gen-CAD Batch Scheduler")
+    parser.add_argument("--inputs", nargs="+", required=True, help="Input STEP files")
+    parser.add_argument("--params", help="JSON file with runtime parameters (missing keys use defaults), or a "
+                             "list of parameter sets such as design_screening.py --output writes")
+    parser.add_argument("--output-dir", default=".", help="Directory for generated files")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--time-budget", type=float, default=None, help="Per-job runtime budget (s)")
+    parser.add_argument("--refuse-over-budget", action="store_true", help="Refuse jobs predicted over budget instead of warning")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the result, body and placement caches")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the schedule")
+    add_execution_arguments(parser)
+    add_memory_arguments(parser)
+    args = parser.parse_args()
+
+    params = {}
+    if args.params:
+        with open(args.params, "r", encoding="utf-8") as f:
+            params = json.load(f)
+    # A list runs every input once per parameter set (e.g. a screened design space)
+    variants = [normalize_runtime_params(p) for p in params] if isinstance(params, list) \
+        else [normalize_runtime_params(params)]
+
+    scheduler = JobScheduler(
+        workers=args.workers,
+        time_budget=args.time_budget,
+        budget_policy=BUDGET_REFUSE if args.refuse_over_budget else BUDGET_WARN,
+        use_cache=not args.no_cache,
+        execution=execution_from_args(args, default_threads=default_thread_count(args.workers)),
+        memory=memory_from_args(args),
+    )
+    estimator = scheduler.estimator
+    if estimator.is_trained:
+        model = f"trained on {estimator.sample_count} runs (LOO error {estimator.loo_error:.1f}s)"
+    elif estimator.loo_error is not None:
+        model = (f"heuristic (fitted LOO error {estimator.loo_error:.1f}s does not beat "
+                 f"{estimator.heuristic_error:.1f}s)")
+    else:
+        model = "heuristic"
+    print(f"[Scheduler] Cost model: {model}", flush=True)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for input_path in args.inputs:
+        for index, runtime_params in enumerate(variants):
+            output_path = batch_output_path(input_path, args.output_dir, index if len(variants) > 1 else None)
+            job = PipelineJob(input_path, output_path, dict(runtime_params))
+            accepted, msg = scheduler.submit(job)
+            label = os.path.basename(output_path) if len(variants) > 1 else input_path
+            print(f"[Scheduler] {label}: {msg}" if accepted else f"[Scheduler] {label}: REFUSED - {msg}", flush=True)
+
+    for worker, jobs in scheduler.plan().items():
+        names = ", ".join(f"{os.path.basename(j.input_path)} ({j.estimate:.1f}s)" for j in jobs)
+        print(f"[Scheduler] Worker {worker}: {names or '-'}", flush=True)
+    print(f"[Scheduler] Predicted makespan: {scheduler.predicted_makespan():.1f}s", flush=True)
+
+    if args.dry_run:
+        return
+
+    for result in scheduler.run():
+        status = ("OK (cached)" if result.cache_hit else "OK") if result.success else f"FAILED ({result.message})"
+        print(f"[Scheduler] {result.job.input_path}: {status} in {result.duration:.2f}s "
+              f"(predicted {result.job.estimate:.1f}s)", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Memory Budget Module
+
+Handles:
+1. Sampling the process RSS at checkpoints (phase boundaries, before every body
+   boolean and before meshing) and tracking the peak.
+2. Retaining shapes that are idle until a later step (RetainedShape) and spilling
+   them to binary BRep on disk when RSS nears the configured cap, reloading on demand.
+3. Reporting samples, peaks and spills in run metrics.
+
+The cap is a soft budget, not a bound: the peak inside a single boolean or mesh is
+not limited, spilling a shape frees only the sub-shapes no live shape shares with
+it, and the allocator does not always return freed memory to the OS at once.
+
+RSS sources, best first: psutil (if installed), /proc/self/statm (Linux), and the
+peak RSS from getrusage (never lower than the current value, so spills come early
+rather than late). OCC is only imported when a shape is spilled, so schedulers can
+build budgets without it.
+"""
+
+import gc
+import os
+import sys
+import time
+import argparse
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:  # optional dependency
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+DEFAULT_SPILL_DIR = ".spill"
+MB = 1024 * 1024
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (None if it cannot be read)"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+
+@dataclass
+class MemoryBudget:
+    """Soft RSS cap of one pipeline process"""
+    max_rss_mb: float = 0.0    # 0 = only record usage, never spill
+    spill_ratio: float = 0.8   # spill retained shapes above this fraction of the cap
+    spill_dir: str = DEFAULT_SPILL_DIR
+
+    @property
+    def spill_threshold(self) -> Optional[int]:
+        if self.max_rss_mb <= 0:
+            return None
+        return int(self.max_rss_mb * self.spill_ratio * MB)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class RetainedShape:
+    """A shape kept for a later phase; the guard may move it to disk in between"""
+
+    def __init__(self, guard: "MemoryGuard", name: str, shape):
+        self.guard = guard
+        self.name = name
+        self._shape = shape
+        self._path: Optional[str] = None
+        self.reloaded = False
+
+    @property
+    def spilled(self) -> bool:
+        return self._shape is None and self._path is not None
+
+    def get(self):
+        """The shape, read back from disk if it was spilled (a new TShape graph)"""
+        if self._shape is None and self._path is not None:
+            from brep_io import read_brep
+            self._shape = read_brep(self._path)
+            self.reloaded = True
+            self.guard.log(f"Reloaded spilled '{self.name}'.")
+        return self._shape
+
+    def spill(self) -> int:
+        """Writes the shape (with triangulation) to disk and drops it. Returns bytes written."""
+        from brep_io import write_brep
+
+        if self._shape is None:
+            return 0
+        os.makedirs(self.guard.budget.spill_dir, exist_ok=True)
+        path = os.path.join(self.guard.budget.spill_dir, f"{os.getpid()}_{id(self)}_{self.name}.brep")
+        if not write_brep(self._shape, path, with_triangles=True):
+            return 0
+        self._path = path
+        self._shape = None
+        return os.path.getsize(path)
+
+    def release(self) -> None:
+        self._shape = None
+        if self._path is not None and os.path.exists(self._path):
+            os.remove(self._path)
+        self._path = None
+        self.guard._retained.pop(self.name, None)
+
+
+class MemoryGuard:
+    """Per-run RSS bookkeeping and spilling under a MemoryBudget"""
+
+    def __init__(self, budget: MemoryBudget, log_fn: Optional[Callable[[str, str], None]] = None):
+        self.budget = budget
+        self.log_fn = log_fn
+        self._retained: Dict[str, RetainedShape] = {}
+        self.samples: List[dict] = []
+        self.spills: List[dict] = []
+        self.peak_rss = 0
+
+    def retain(self, name: str, shape) -> RetainedShape:
+        """Hands a shape to the guard; the caller should drop its own references"""
+        retained = RetainedShape(self, name, shape)
+        self._retained[name] = retained
+        return retained
+
+    def checkpoint(self, label: str) -> Optional[int]:
+        """Samples RSS; spills retained shapes (oldest first) while above the threshold"""
+        rss = current_rss()
+        if rss is None:
+            return None
+        self.peak_rss = max(self.peak_rss, rss)
+        self.samples.append({"label": label, "rss_mb": rss / MB})
+        threshold = self.budget.spill_threshold
+        if threshold is None or rss <= threshold:
+            return rss
+        for retained in list(self._retained.values()):
+            if retained.spilled:
+                continue
+            start_time = time.perf_counter()
+            written = retained.spill()
+            if not written:
+                continue
+            gc.collect()
+            after = current_rss()
+            self.spills.append({"label": label, "shape": retained.name, "bytes": written,
+                                "seconds": time.perf_counter() - start_time,
+                                "rss_mb_before": rss / MB, "rss_mb_after": after / MB if after else None})
+            self.log(f"RSS {rss / MB:.0f}MB over {threshold / MB:.0f}MB at {label} - "
+                     f"spilled '{retained.name}' ({written / MB:.1f}MB).")
+            if after is not None and after <= threshold:
+                return after
+            rss = after if after is not None else rss
+        return rss
+
+    def log(self, message: str) -> None:
+        if self.log_fn is not None:
+            self.log_fn("Memory", message)
+
+    def close(self) -> None:
+        for retained in list(self._retained.values()):
+            retained.release()
+
+    def to_dict(self) -> dict:
+        return {
+            "budget": self.budget.to_dict(),
+            "peak_rss_mb": self.peak_rss / MB if self.peak_rss else None,
+            "samples": self.samples,
+            "spills": self.spills,
+        }
+
+
+def add_memory_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the shared --max-rss-mb / --spill-dir options to a CLI parser"""
+    group = parser.add_argument_group("memory")
+    group.add_argument("--max-rss-mb", type=float, default=None,
+                       help="Soft RSS cap per pipeline process; idle shapes are spilled to disk near it "
+                            "(a single boolean or mesh can still exceed it)")
+    group.add_argument("--spill-dir", default=DEFAULT_SPILL_DIR, help="Directory for spilled shapes")
+
+
+def memory_from_args(args: argparse.Namespace) -> Optional[MemoryBudget]:
+    if args.max_rss_mb is None:
+        return None
+    return MemoryBudget(max_rss_mb=args.max_rss_mb, spill_dir=args.spill_dir)
@@ -0,0 +1,252 @@
+"""
+Slow-Operation Capture Module
+
+Handles:
+1. Timing the expensive OCC operations of run_pipeline (booleans, thickening,
+   distance queries).
+2. Dumping a replay bundle when one exceeds a time threshold or fails: operands as
+   binary BRep, fuzzy value / options, timing and error.
+3. Replaying a single bundled operation, optionally under cProfile.
+
+Bundle layout (<capture_dir>/<timestamp>_<kind>_<n>/):
+    manifest.json        kind, options, duration, failure, source input
+    <operand>.brep       one file per operand (e.g. shape.brep, tool.brep)
+
+Replay:
+    python op_capture.py list
+    python op_capture.py replay .op_captures/20250101-120000_cut_3 --sort cumulative
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import cProfile
+import pstats
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from OCC.Core.TopoDS import TopoDS_Shape
+
+from brep_io import read_brep, write_brep
+from pipeline_progress import PipelineCancelled
+
+DEFAULT_CAPTURE_DIR = ".op_captures"
+MANIFEST_NAME = "manifest.json"
+PROFILE_NAME = "replay.pstats"
+
+OP_CUT = "cut"
+OP_FUSE = "fuse"
+OP_DISTANCE = "distance"
+OP_THICKEN = "thicken"
+
+
+@dataclass
+class CaptureSettings:
+    """When to dump replay bundles"""
+    threshold_seconds: float = 30.0  # slower operations are captured
+    on_failure: bool = True          # failed / not-done operations are captured
+    capture_dir: str = DEFAULT_CAPTURE_DIR
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class OperationCapture:
+    """
+    Wraps operations of one pipeline run and writes bundles for slow or failed ones.
+    Capturing never changes the result of the wrapped operation.
+    """
+
+    def __init__(self, settings: CaptureSettings, source: Optional[dict] = None,
+                 log_fn: Optional[Callable[[str, str], None]] = None):
+        self.settings = settings
+        self.source = source or {}
+        self.log_fn = log_fn
+        self.bundles: List[str] = []
+        self._count = 0
+
+    def run(self, kind: str, operands: Dict[str, TopoDS_Shape], options: dict,
+            operation: Callable[[], Any], failed: Callable[[Any], bool]) -> Any:
+        """Runs operation(); dumps a bundle if it raises, fails or is slower than the threshold"""
+        self._count += 1
+        start_time = time.perf_counter()
+        try:
+            result = operation()
+        except PipelineCancelled:
+            raise
+        except Exception as e:
+            self._dump(kind, operands, options, time.perf_counter() - start_time, "exception", repr(e))
+            raise
+        duration = time.perf_counter() - start_time
+        try:
+            is_failed = failed(result)
+        except Exception:
+            is_failed = True
+        if is_failed and self.settings.on_failure:
+            self._dump(kind, operands, options, duration, "failed", "")
+        elif duration >= self.settings.threshold_seconds:
+            self._dump(kind, operands, options, duration, "slow", "")
+        return result
+
+    def _dump(self, kind: str, operands: Dict[str, TopoDS_Shape], options: dict,
+              duration: float, reason: str, error: str) -> Optional[str]:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        bundle = os.path.join(self.settings.capture_dir, f"{stamp}_{kind}_{self._count}")
+        manifest = {
+            "kind": kind,
+            "reason": reason,
+            "error": error,
+            "duration": duration,
+            "options": options,
+            "operands": sorted(operands),
+            "source": self.source,
+            "created": time.time(),
+        }
+        try:
+            os.makedirs(bundle, exist_ok=True)
+            for name, shape in operands.items():
+                if not write_brep(shape, os.path.join(bundle, f"{name}.brep"), with_triangles=False):
+                    manifest["error"] = (manifest["error"] + f"; could not write operand {name}").lstrip("; ")
+            with open(os.path.join(bundle, MANIFEST_NAME), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, default=str)
+        except OSError as e:
+            self._log(f"Could not write replay bundle {bundle}: {e}")
+            return None
+        self.bundles.append(bundle)
+        self._log(f"{kind} {reason} after {duration:.2f}s - replay bundle written to {bundle}")
+        return bundle
+
+    def _log(self, message: str) -> None:
+        if self.log_fn is not None:
+            self.log_fn("Capture", message)
+
+
+def captured(capture: Optional[OperationCapture], kind: str, operands: Dict[str, TopoDS_Shape],
+             options: dict, operation: Callable[[], Any], failed: Callable[[Any], bool]) -> Any:
+    """capture.run(...) when capturing is enabled, otherwise just operation()"""
+    if capture is None:
+        return operation()
+    return capture.run(kind, operands, options, operation, failed)
+
+
+def load_bundle(bundle: str):
+    """Returns (manifest, {operand name: shape})"""
+    with open(os.path.join(bundle, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    operands = {}
+    for name in manifest["operands"]:
+        shape = read_brep(os.path.join(bundle, f"{name}.brep"))
+        if shape is None:
+            raise ValueError(f"Operand '{name}' of {bundle} could not be read")
+        operands[name] = shape
+    return manifest, operands
+
+
+def replay_operation(manifest: dict, operands: Dict[str, TopoDS_Shape]):
+    """Re-runs a bundled operation with its recorded options. Returns (done, result object)."""
+    from gen_cad_pipeline import boolean_op, distance_query, thicken_shape
+    from execution_settings import ExecutionSettings
+    from OCC.Core.BRepAlgoAPI import BRepAlgoAPI_Cut, BRepAlgoAPI_Fuse
+
+    kind = manifest["kind"]
+    options = manifest["options"]
+    if kind in (OP_CUT, OP_FUSE):
+        execution = ExecutionSettings(parallel_booleans=options.get("parallel", True))
+        op_class = BRepAlgoAPI_Cut if kind == OP_CUT else BRepAlgoAPI_Fuse
+        op = boolean_op(op_class, operands["shape"], operands["tool"], execution, fuzzy=options["fuzzy"])
+        return op.IsDone(), op
+    if kind == OP_DISTANCE:
+        execution = ExecutionSettings(parallel_distance=options.get("parallel", True))
+        tool = distance_query(operands["shape1"], operands["shape2"], execution)
+        return tool.IsDone(), tool
+    if kind == OP_THICKEN:
+        result = thicken_shape(operands["shape"], options["offset"], tolerance=options["tolerance"])
+        return result is not None, result
+    raise ValueError(f"Unknown operation kind '{kind}'")
+
+
+def replay_bundle(bundle: str, profile: bool = True, sort: str = "cumulative", top: int = 30) -> dict:
+    """
+    Replays one bundle and reports its duration; with profile=True the run is
+    recorded with cProfile, saved to <bundle>/replay.pstats and summarized on stdout.
+    """
+    manifest, operands = load_bundle(bundle)
+    profiler = cProfile.Profile() if profile else None
+    start_time = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        done, _ = replay_operation(manifest, operands)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+    duration = time.perf_counter() - start_time
+
+    report = {"kind": manifest["kind"], "done": done, "duration": duration,
+              "captured_duration": manifest["duration"], "reason": manifest["reason"]}
+    if profiler is not None:
+        report["profile"] = os.path.join(bundle, PROFILE_NAME)
+        profiler.dump_stats(report["profile"])
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats(sort).print_stats(top)
+    return report
+
+
+def list_bundles(capture_dir: str = DEFAULT_CAPTURE_DIR) -> List[dict]:
+    bundles = []
+    if not os.path.isdir(capture_dir):
+        return bundles
+    for name in sorted(os.listdir(capture_dir)):
+        path = os.path.join(capture_dir, name, MANIFEST_NAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            continue
+        manifest["path"] = os.path.join(capture_dir, name)
+        bundles.append(manifest)
+    return bundles
+
+
+def add_capture_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the shared --capture-slow / --capture-dir options to a CLI parser"""
+    group = parser.add_argument_group("operation capture")
+    group.add_argument("--capture-slow", type=float, default=None, metavar="SECONDS",
+                       help="Dump replay bundles of operations slower than this (and of failed ones)")
+    group.add_argument("--capture-dir", default=DEFAULT_CAPTURE_DIR, help="Directory for replay bundles")
+
+
+def capture_from_args(args: argparse.Namespace) -> Optional[CaptureSettings]:
+    if args.capture_slow is None:
+        return None
+    return CaptureSettings(threshold_seconds=args.capture_slow, capture_dir=args.capture_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gen-CAD Operation Replay")
+    sub = parser.add_subparsers(dest="command", required=True)
+    list_parser = sub.add_parser("list", help="List captured bundles")
+    list_parser.add_argument("--capture-dir", default=DEFAULT_CAPTURE_DIR)
+    replay_parser = sub.add_parser("replay", help="Re-run one bundled operation")
+    replay_parser.add_argument("bundle", help="Bundle directory")
+    replay_parser.add_argument("--no-profile", action="store_true", help="Only time the operation")
+    replay_parser.add_argument("--sort", default="cumulative", help="pstats sort key")
+    replay_parser.add_argument("--top", type=int, default=30, help="Number of profile rows to print")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for manifest in list_bundles(args.capture_dir):
+            print(f"{manifest['path']}: {manifest['kind']} {manifest['reason']} "
+                  f"({manifest['duration']:.2f}s) {manifest['error']}".rstrip())
+        return
+
+    report = replay_bundle(args.bundle, profile=not args.no_profile, sort=args.sort, top=args.top)
+    print(f"[Replay] {report['kind']}: {'done' if report['done'] else 'FAILED'} in {report['duration']:.2f}s "
+          f"(captured: {report['captured_duration']:.2f}s, {report['reason']})", flush=True)
+    if "profile" in report:
+        print(f"[Replay] Profile written to {report['profile']}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Pipeline Profiling Module
+
+Handles:
+1. Deterministic profiling of run_pipeline with full call stacks, including the
+   C-level calls into pythonocc (constructors and methods of the OCC wrappers).
+2. Attributing time to OCC calls, grouped by operation (offset, distance, boolean,
+   mesh, check, import, export).
+3. Writing a pstats file (readable with pstats / snakeviz) and a flamegraph-compatible
+   collapsed-stack file (flamegraph.pl, speedscope) next to the output.
+
+cProfile only keeps caller/callee pairs, so the profiler records stacks itself
+through sys.setprofile and hands pstats the same statistics cProfile would.
+Profiling slows down Python-heavy code; time inside OCC calls is measured as is.
+"""
+
+import os
+import re
+import sys
+import time
+import pstats
+from typing import Dict, List, Optional, Tuple
+
+PSTATS_SUFFIX = ".profile.pstats"
+COLLAPSED_SUFFIX = ".profile.collapsed"
+
+# OCC package -> operation group of the attribution table
+OCC_GROUPS = {
+    "BRepOffsetAPI": "offset",
+    "BRepOffset": "offset",
+    "BRepExtrema": "distance",
+    "BRepAlgoAPI": "boolean",
+    "BOPAlgo": "boolean",
+    "BRepMesh": "mesh",
+    "IMeshTools": "mesh",
+    "BRepCheck": "check",
+    "STEPControl": "import/export",
+    "StlAPI": "import/export",
+    "BinTools": "import/export",
+    "BRepTools": "import/export",
+    "ShapeUpgrade": "simplify",
+    "ShapeFix": "simplify",
+}
+OTHER_OCC_GROUP = "other OCC"
+
+_OCC_MODULE_RE = re.compile(r"OCC[./\\]Core[./\\]_?(\w+)")
+
+FuncKey = Tuple[str, int, str]
+
+
+def profile_paths_for(output_path: str) -> Tuple[str, str]:
+    """(pstats path, collapsed-stack path) written next to a STEP output"""
+    stem = os.path.splitext(output_path)[0]
+    return stem + PSTATS_SUFFIX, stem + COLLAPSED_SUFFIX
+
+
+def _c_function_key(func) -> FuncKey:
+    """Same naming as cProfile for built-in functions and methods"""
+    owner = getattr(func, "__self__", None)
+    module = getattr(func, "__module__", None)
+    name = getattr(func, "__qualname__", getattr(func, "__name__", repr(func)))
+    if module:
+        return "~", 0, f"<built-in method {module}.{name}>"
+    if owner is not None and not isinstance(owner, type(sys)):
+        return "~", 0, f"<method '{name}' of '{type(owner).__name__}' objects>"
+    return "~", 0, f"<built-in method {name}>"
+
+
+def occ_module(key: FuncKey) -> Optional[str]:
+    """OCC package of a profiled function (e.g. 'BRepAlgoAPI'), None for non-OCC code"""
+    match = _OCC_MODULE_RE.search(key[0] if key[0] != "~" else key[2])
+    return match.group(1) if match else None
+
+
+def _label(key: FuncKey) -> str:
+    filename, _, name = key
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{name}"
+
+
+class PipelineProfiler:
+    """
+    sys.setprofile-based profiler that keeps the full stack of every call.
+
+        profiler = PipelineProfiler()
+        with profiler:
+            run()
+        profiler.write("out.profile.pstats", "out.profile.collapsed")
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        # key -> [primitive calls, calls, self time, cumulative time, {caller: [cc, nc, tt, ct]}]
+        self._stats: Dict[FuncKey, list] = {}
+        self._collapsed: Dict[Tuple[FuncKey, ...], float] = {}
+        # Active calls: [key, frame or None, start, child time, path, recursive]
+        self._stack: List[list] = []
+        self._active: Dict[FuncKey, int] = {}
+        self.stats: dict = {}
+
+    def __enter__(self) -> "PipelineProfiler":
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.disable()
+
+    def enable(self) -> None:
+        sys.setprofile(self._dispatch)
+
+    def disable(self) -> None:
+        sys.setprofile(None)
+        now = self.clock()
+        while self._stack:
+            self._pop(now)
+
+    def _dispatch(self, frame, event, arg) -> None:
+        now = self.clock()
+        if event == "call":
+            code = frame.f_code
+            self._push((code.co_filename, code.co_firstlineno, code.co_name), frame, now)
+        elif event == "c_call":
+            self._push(_c_function_key(arg), None, now)
+        elif event == "return":
+            # Close C calls left open by exceptions, then the frame itself
+            if any(entry[1] is frame for entry in self._stack):
+                while self._stack and self._stack[-1][1] is not frame:
+                    self._pop(now)
+                self._pop(now)
+        elif event in ("c_return", "c_exception"):
+            if self._stack and self._stack[-1][1] is None:
+                self._pop(now)
+
+    def _push(self, key: FuncKey, frame, now: float) -> None:
+        parent_path = self._stack[-1][4] if self._stack else ()
+        recursive = self._active.get(key, 0) > 0
+        self._active[key] = self._active.get(key, 0) + 1
+        self._stack.append([key, frame, now, 0.0, parent_path + (key,), recursive])
+
+    def _pop(self, now: float) -> None:
+        key, _, start, child_time, path, recursive = self._stack.pop()
+        self._active[key] -= 1
+        elapsed = now - start
+        own = max(0.0, elapsed - child_time)
+        if self._stack:
+            self._stack[-1][3] += elapsed
+
+        entry = self._stats.setdefault(key, [0, 0, 0.0, 0.0, {}])
+        entry[1] += 1
+        entry[2] += own
+        if not recursive:
+            entry[0] += 1
+            entry[3] += elapsed
+        if len(path) > 1:
+            edge = entry[4].setdefault(path[-2], [0, 0, 0.0, 0.0])
+            edge[0] += 0 if recursive else 1
+            edge[1] += 1
+            edge[2] += own
+            edge[3] += 0.0 if recursive else elapsed
+        self._collapsed[path] = self._collapsed.get(path, 0.0) + own
+
+    def create_stats(self) -> None:
+        """pstats.Stats(profiler) protocol"""
+        self.stats = {key: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers.items()})
+                      for key, (cc, nc, tt, ct, callers) in self._stats.items()}
+
+    def occ_attribution(self, top: int = 15) -> dict:
+        """
+        Self time spent in OCC calls: per operation group and the slowest individual calls.
+        Wrapper frames and the C calls beneath them both belong to OCC, so self time
+        adds up without double counting.
+        """
+        groups: Dict[str, float] = {}
+        calls = []
+        for key, (_, nc, tt, ct, _) in self._stats.items():
+            module = occ_module(key)
+            if module is None:
+                continue
+            group = OCC_GROUPS.get(module, OTHER_OCC_GROUP)
+            groups[group] = groups.get(group, 0.0) + tt
+            calls.append({"call": _label(key), "module": module, "group": group,
+                          "calls": nc, "self_seconds": tt, "cumulative_seconds": ct})
+        calls.sort(key=lambda c: c["self_seconds"], reverse=True)
+        return {
+            "occ_seconds": sum(groups.values()),
+            "groups": dict(sorted(groups.items(), key=lambda item: item[1], reverse=True)),
+            "top_calls": calls[:top],
+        }
+
+    def write_collapsed(self, path: str) -> None:
+        """One 'frame;frame;frame microseconds' line per distinct stack"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, seconds in sorted(self._collapsed.items(), key=lambda item: item[1], reverse=True):
+                micros = int(round(seconds * 1e6))
+                if micros > 0:
+                    f.write(";".join(_label(key).replace(";", ",") for key in stack) + f" {micros}\n")
+
+    def write(self, pstats_path: str, collapsed_path: str) -> None:
+        pstats.Stats(self).dump_stats(pstats_path)
+        self.write_collapsed(collapsed_path)
@@ -0,0 +1,157 @@
+"""
+Pipeline Progress & Cancellation Module
+
+Handles:
+1. Phase/progress/log events emitted by run_pipeline.
+2. Cooperative cancellation tokens checked between OCC operations.
+3. Detached Message_ProgressRange objects for OCC algorithms; progress is reported
+   when an algorithm starts, never from inside it.
+4. Collection of per-phase metrics, so an aborted run still reports what it did.
+
+pythonocc does not wrap Message_ProgressIndicator with directors, so Python cannot
+receive OCC progress callbacks or break an algorithm that is running. A cancelled
+token stops the pipeline at its next check; a hard cancel of a long boolean or mesh
+is PipelineRunner terminating the worker process after its grace period.
+"""
+
+import copy
+import time
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from OCC.Core.Message import Message_ProgressRange
+
+# Share of the overall progress bar given to each phase.
+PHASE_WEIGHTS = {
+    "Phase 1": 0.08,
+    "Phase 1b": 0.04,
+    "Phase 2": 0.28,
+    "Phase 3": 0.05,
+    "Phase 4": 0.40,
+    "Phase 5": 0.05,
+    "Phase 6": 0.10,
+}
+
+EVENT_LOG = "log"
+EVENT_PHASE = "phase"
+EVENT_PROGRESS = "progress"
+EVENT_METRICS = "metrics"
+EVENT_RESULT = "result"
+
+
+class PipelineCancelled(Exception):
+    """Raised inside the pipeline when its cancel token has been triggered"""
+
+
+@dataclass
+class PipelineEvent:
+    """A single update from a running pipeline (picklable, for worker queues)"""
+    kind: str
+    phase: str = ""
+    message: str = ""
+    fraction: float = 0.0  # overall progress 0..1
+    data: Optional[Dict[str, Any]] = None
+
+
+class CancelToken:
+    """
+    Cancellation flag shared with a running pipeline.
+    Pass a multiprocessing.Event to share it with a worker process.
+    """
+
+    def __init__(self, event=None):
+        self._event = event if event is not None else threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+def _phase_offsets() -> Dict[str, float]:
+    offsets = {}
+    total = 0.0
+    for phase, weight in PHASE_WEIGHTS.items():
+        offsets[phase] = total
+        total += weight
+    return offsets
+
+
+_PHASE_OFFSETS = _phase_offsets()
+
+
+class PipelineContext:
+    """
+    Carries the event sink, cancel token and metrics through one pipeline run.
+    """
+
+    def __init__(self, sink: Optional[Callable[[PipelineEvent], None]] = None,
+                 cancel_token: Optional[CancelToken] = None,
+                 log_fn: Optional[Callable[[str, str], None]] = None,
+                 metrics: Optional[dict] = None):
+        self.sink = sink
+        self.cancel_token = cancel_token
+        self.log_fn = log_fn
+        self.metrics = metrics if metrics is not None else {}
+        self.metrics.setdefault("phase_seconds", {})
+        self.current_phase = ""
+        self._phase_start = None
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.cancel_token is not None and self.cancel_token.is_cancelled
+
+    def emit(self, event: PipelineEvent) -> None:
+        if self.sink is not None:
+            try:
+                self.sink(event)
+            except Exception:
+                pass
+
+    def log(self, phase: str, message: str) -> None:
+        if self.log_fn is not None:
+            self.log_fn(phase, message)
+        self.emit(PipelineEvent(EVENT_LOG, phase, message, self.overall(phase, 0.0)))
+
+    def overall(self, phase: str, fraction: float) -> float:
+        """Converts progress within a phase into overall progress"""
+        offset = _PHASE_OFFSETS.get(phase, 0.0)
+        weight = PHASE_WEIGHTS.get(phase, 0.0)
+        return min(1.0, offset + weight * max(0.0, min(1.0, fraction)))
+
+    def progress(self, phase: str, fraction: float, message: str = "") -> None:
+        self.emit(PipelineEvent(EVENT_PROGRESS, phase, message, self.overall(phase, fraction)))
+
+    def check_cancel(self, where: str = "") -> None:
+        if self.is_cancelled:
+            raise PipelineCancelled(where or self.current_phase)
+
+    def start_phase(self, phase: str, title: str) -> None:
+        """Closes the running phase, checks for cancellation and announces the next one"""
+        self.finish_phase()
+        self.check_cancel(phase)
+        self.current_phase = phase
+        self._phase_start = time.perf_counter()
+        self.emit(PipelineEvent(EVENT_PHASE, phase, title, self.overall(phase, 0.0)))
+
+    def finish_phase(self) -> None:
+        """Records the running phase's duration and publishes a metrics snapshot"""
+        if self._phase_start is None:
+            return
+        phase = self.current_phase
+        self.metrics["phase_seconds"][phase] = time.perf_counter() - self._phase_start
+        self._phase_start = None
+        self.emit(PipelineEvent(EVENT_METRICS, phase, "", self.overall(phase, 1.0),
+                                data=copy.deepcopy(self.metrics)))
+
+    def detached_range(self, phase: str, start: float = 0.0) -> Message_ProgressRange:
+        """
+        Reports that an OCC algorithm starts at `start` of a phase and returns a detached
+        Message_ProgressRange to pass to it. Nothing observes the range (see module
+        docstring): the bar stays at `start` until the next operation reports.
+        """
+        self.progress(phase, start)
+        return Message_ProgressRange()
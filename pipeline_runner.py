@@ -0,0 +1,212 @@
+"""
+Cancellable Pipeline Runner Module
+
+Handles:
+1. Running run_pipeline in a worker process that streams PipelineEvent updates.
+2. Generator (iter_pipeline) and async generator (aiter_pipeline) front-ends.
+3. Cancellation: the cancel token is set first (cooperative stop between OCC
+   operations); if the worker does not stop within a grace period, e.g. because it
+   is inside a long boolean, it is terminated.
+4. Returning partial metrics when a run is aborted.
+
+The worker is not daemonic, so the pipeline can start its own process pools in it
+(region thickening). Cleanup does not rely on daemon teardown: closing a generator
+or cancelling cancels the run, and a worker that does not stop is terminated; the
+pool workers of a terminated run exit after their current task, when they find the
+pool's queues closed.
+
+Closing the generator (or cancelling the async task) cancels the run, so an
+abandoned UI session no longer keeps a CPU busy until the job finishes.
+"""
+
+import time
+import queue
+import asyncio
+import multiprocessing
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterator, Optional
+
+from pipeline_progress import (CancelToken, PipelineEvent, EVENT_METRICS, EVENT_RESULT)
+
+DEFAULT_CANCEL_GRACE = 2.0
+POLL_INTERVAL = 0.1
+
+
+@dataclass
+class PipelineOutcome:
+    """Final state of a runner"""
+    success: bool = False
+    message: str = ""
+    cancelled: bool = False
+    metrics: dict = field(default_factory=dict)
+
+
+def _pipeline_worker(input_path: str, output_path: str, runtime_params: dict, events, cancel_event, extra: dict):
+    """Worker process entry point"""
+    from gen_cad_pipeline import run_pipeline
+
+    token = CancelToken(cancel_event)
+    metrics = {}
+    try:
+        run_pipeline(input_path, output_path, runtime_params, metrics=metrics,
+                     cancel_token=token, sink=events.put, **extra)
+    except Exception as e:
+        events.put(PipelineEvent(EVENT_RESULT, "", f"Critical Error: {e}", 0.0,
+                                 data={"success": False, "message": f"Critical Error: {e}", "metrics": metrics}))
+
+
+class PipelineRunner:
+    """
+    Runs one pipeline job in a separate process.
+
+        runner = PipelineRunner(input_path, output_path, runtime_params)
+        runner.start()
+        for event in runner.events():
+            ...
+        outcome = runner.outcome
+    """
+
+    def __init__(self, input_path: str, output_path: str, runtime_params: dict,
+                 cancel_grace: float = DEFAULT_CANCEL_GRACE, **pipeline_kwargs):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.runtime_params = runtime_params
+        self.cancel_grace = cancel_grace
+        self.pipeline_kwargs = pipeline_kwargs
+        # spawn: OCC state must not be inherited through fork
+        self._mp = multiprocessing.get_context("spawn")
+        self._events = self._mp.Queue()
+        self._cancel_event = self._mp.Event()
+        self._process = None
+        self._cancel_requested = False
+        self.outcome: Optional[PipelineOutcome] = None
+        self.partial_metrics: dict = {}
+
+    @property
+    def finished(self) -> bool:
+        return self.outcome is not None
+
+    def start(self) -> "PipelineRunner":
+        self._process = self._mp.Process(
+            target=_pipeline_worker,
+            args=(self.input_path, self.output_path, self.runtime_params,
+                  self._events, self._cancel_event, self.pipeline_kwargs),
+            # Not daemonic: daemonic processes may not start pools (see module docstring)
+            daemon=False,
+        )
+        self._process.start()
+        return self
+
+    def _handle(self, event: PipelineEvent) -> None:
+        if event.kind == EVENT_METRICS and event.data:
+            self.partial_metrics = event.data
+        elif event.kind == EVENT_RESULT:
+            data = event.data or {}
+            metrics = data.get("metrics") or self.partial_metrics
+            self.outcome = PipelineOutcome(
+                success=bool(data.get("success")),
+                message=data.get("message", event.message),
+                cancelled=bool(metrics.get("cancelled", False)) or self._cancel_requested,
+                metrics=metrics,
+            )
+
+    def poll(self, timeout: float = POLL_INTERVAL) -> Optional[PipelineEvent]:
+        """Returns the next event, or None if nothing arrived within timeout"""
+        if self.finished:
+            return None
+        try:
+            event = self._events.get(timeout=timeout)
+        except queue.Empty:
+            if self._process is not None and not self._process.is_alive():
+                self._finish_without_result()
+            return None
+        self._handle(event)
+        return event
+
+    def events(self, timeout: float = POLL_INTERVAL) -> Iterator[PipelineEvent]:
+        """Yields events until the run ends (result event or worker exit)"""
+        while not self.finished:
+            event = self.poll(timeout)
+            if event is not None:
+                yield event
+
+    def cancel(self, grace: Optional[float] = None) -> PipelineOutcome:
+        """
+        Requests cancellation and waits up to `grace` seconds for the worker to stop
+        cooperatively before terminating it. Returns the (partial) outcome.
+        """
+        if self.finished:
+            return self.outcome
+        self._cancel_requested = True
+        self._cancel_event.set()
+        deadline = time.monotonic() + (self.cancel_grace if grace is None else grace)
+        while not self.finished and time.monotonic() < deadline:
+            self.poll(POLL_INTERVAL)
+        if not self.finished:
+            self._process.terminate()
+            self._process.join(1.0)
+            self._finish_without_result()
+        return self.outcome
+
+    def _finish_without_result(self) -> None:
+        # Drain whatever the worker managed to send before it stopped.
+        while True:
+            try:
+                self._handle(self._events.get_nowait())
+            except queue.Empty:
+                break
+            if self.finished:
+                return
+        metrics = dict(self.partial_metrics)
+        metrics["cancelled"] = self._cancel_requested
+        message = "Cancelled" if self._cancel_requested else "Worker exited unexpectedly"
+        self.outcome = PipelineOutcome(False, message, self._cancel_requested, metrics)
+
+
+def _result_event(outcome: PipelineOutcome) -> PipelineEvent:
+    return PipelineEvent(EVENT_RESULT, "", outcome.message, 1.0 if outcome.success else 0.0,
+                         data={"success": outcome.success, "message": outcome.message,
+                               "cancelled": outcome.cancelled, "metrics": outcome.metrics})
+
+
+def iter_pipeline(input_path: str, output_path: str, runtime_params: dict,
+                  cancel_token: Optional[CancelToken] = None, **pipeline_kwargs) -> Iterator[PipelineEvent]:
+    """
+    Runs the pipeline in a worker process and yields its events.
+    The final event has kind "result" and carries success, message and metrics.
+    Closing the generator early, or setting cancel_token, cancels the run.
+    """
+    runner = PipelineRunner(input_path, output_path, runtime_params, **pipeline_kwargs).start()
+    try:
+        while not runner.finished:
+            if cancel_token is not None and cancel_token.is_cancelled:
+                runner.cancel()
+                break
+            event = runner.poll()
+            if event is not None and event.kind != EVENT_RESULT:
+                yield event
+        yield _result_event(runner.outcome)
+    finally:
+        if not runner.finished:
+            runner.cancel()
+
+
+async def aiter_pipeline(input_path: str, output_path: str, runtime_params: dict,
+                         cancel_token: Optional[CancelToken] = None, **pipeline_kwargs) -> AsyncIterator[PipelineEvent]:
+    """
+    Async variant of iter_pipeline. Cancelling the consuming task cancels the run.
+    """
+    runner = PipelineRunner(input_path, output_path, runtime_params, **pipeline_kwargs).start()
+    loop = asyncio.get_running_loop()
+    try:
+        while not runner.finished:
+            if cancel_token is not None and cancel_token.is_cancelled:
+                await loop.run_in_executor(None, runner.cancel)
+                break
+            event = await loop.run_in_executor(None, runner.poll)
+            if event is not None and event.kind != EVENT_RESULT:
+                yield event
+        yield _result_event(runner.outcome)
+    finally:
+        if not runner.finished:
+            runner.cancel()
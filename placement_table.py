@@ -0,0 +1,163 @@
+"""
+Placement Projection Table Module
+
+Handles:
+1. Array-backed table of the Phase 4 projections: per reference location the
+   projected point, supporting face (index into the body's face map), UV, outward
+   normal and distance.
+2. Keys from the thickened body's cache key (input content hash + thickening
+   settings), the thickness and a hash of the placement set. Groove/clip shape and
+   size are not part of the key, so changing them reuses the same projections.
+3. Persisting tables as compressed .npz files (bounded cache, oldest removed first)
+   and exporting the table of a run next to its output (<stem>.frames.npz).
+
+Rows whose location did not land on a face keep NaN geometry and face index 0, so
+a table always has one row per reference location. OCC is only imported to build
+frames, so the result cache can handle exported tables without it.
+"""
+
+import os
+import hashlib
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from input_hash import payload_hash
+
+DEFAULT_PLACEMENT_CACHE_DIR = ".placement_cache"
+DEFAULT_MAX_ENTRIES = 256
+FRAMES_SUFFIX = ".frames.npz"
+
+# Bump when the projection changes (UV tolerance, normal evaluation, face map order).
+PLACEMENT_TABLE_VERSION = 1
+
+_ARRAYS = ("locations", "points", "normals", "uv", "face_index", "distance")
+
+
+def placement_set_hash(locations: Sequence[Tuple[float, float, float]]) -> str:
+    """Order-sensitive hash of a placement set (coordinates rounded to 1e-6 mm)"""
+    coords = np.round(np.asarray(locations, dtype=np.float64).reshape(-1, 3), 6)
+    return hashlib.sha256(coords.tobytes()).hexdigest()
+
+
+def make_placement_key(body_key: str, thickness: float, locations: Sequence[Tuple[float, float, float]]) -> str:
+    """Cache key of a projection table (body_key from gen_cad_pipeline.body_key_for)"""
+    payload = {
+        "version": PLACEMENT_TABLE_VERSION,
+        "body": body_key,
+        "thickness": round(float(thickness), 6),
+        "placements": placement_set_hash(locations),
+    }
+    return payload_hash(payload)
+
+
+def frames_path_for(output_path: str) -> str:
+    return os.path.splitext(output_path)[0] + FRAMES_SUFFIX
+
+
+@dataclass
+class PlacementTable:
+    """One row per reference location (see module docstring for missing projections)"""
+    locations: np.ndarray   # (N, 3) float64, reference points
+    points: np.ndarray      # (N, 3) float64, closest point on the body
+    normals: np.ndarray     # (N, 3) float64, unit outward normal at the point
+    uv: np.ndarray          # (N, 2) float64, surface parameters on the supporting face
+    face_index: np.ndarray  # (N,) int32, 1-based index in the body's face map, 0 = none
+    distance: np.ndarray    # (N,) float64, reference point to projected point
+    key: str = ""
+
+    @classmethod
+    def empty(cls, count: int, key: str = "") -> "PlacementTable":
+        return cls(np.full((count, 3), np.nan), np.full((count, 3), np.nan), np.full((count, 3), np.nan),
+                   np.full((count, 2), np.nan), np.zeros(count, dtype=np.int32), np.full(count, np.nan), key)
+
+    def __len__(self) -> int:
+        return len(self.face_index)
+
+    @property
+    def valid(self) -> np.ndarray:
+        return self.face_index > 0
+
+    def frames(self) -> list:
+        """(gp_Pnt, gp_Dir) frames of the rows that landed on a face, in location order"""
+        from OCC.Core.gp import gp_Pnt, gp_Dir
+        
+        return [(gp_Pnt(*self.points[i]), gp_Dir(*self.normals[i])) for i in np.flatnonzero(self.valid)]
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write under a temporary name first so a concurrent reader never sees a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp_path, version=np.int32(PLACEMENT_TABLE_VERSION), key=np.str_(self.key),
+                            **{name: getattr(self, name) for name in _ARRAYS})
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["PlacementTable"]:
+        """Reads a saved table; None if missing, unreadable or of another version"""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["version"]) != PLACEMENT_TABLE_VERSION:
+                    return None
+                return cls(**{name: data[name] for name in _ARRAYS}, key=str(data["key"]))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def to_dict(self) -> dict:
+        return {
+            "key": self.key,
+            "rows": len(self),
+            "frames": int(np.count_nonzero(self.valid)),
+            "faces": int(len(np.unique(self.face_index[self.valid]))),
+        }
+
+
+class PlacementTableCache:
+    """Directory of <key>.npz projection tables"""
+
+    def __init__(self, cache_dir: str = DEFAULT_PLACEMENT_CACHE_DIR, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def load(self, key: str) -> Optional[PlacementTable]:
+        path = self._path(key)
+        table = PlacementTable.load(path)
+        if table is None or table.key != key:
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return table
+
+    def store(self, table: PlacementTable) -> bool:
+        try:
+            table.save(self._path(table.key))
+        except OSError:
+            return False
+        self._evict()
+        return True
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".npz"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,217 @@
+"""
+Approximate Preview Module
+
+Handles:
+1. Pre-tessellated groove/clip meshes (meshed once at the origin per parameter set).
+2. Placing them at the pipeline's placement frames with NumPy transforms.
+3. Combining them with the cached thickened-body mesh into one labelled mesh / STL.
+
+No cut or fuse is performed: grooves are shown as their tool volumes overlapping
+the body, so the preview shows where features land and how big they are, not a
+watertight solid. The exact pipeline (run_pipeline) is still needed for the output.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from OCC.Core.gp import gp_Trsf
+
+from groove_generator import GrooveGenerator
+from clip_generator import ClipGenerator
+from shape_fingerprint import triangulation_arrays
+from body_cache import ThickenedBodyCache
+from input_hash import file_content_hash
+from execution_settings import ExecutionSettings, resolve as resolve_execution
+from pipeline_progress import PipelineContext, PipelineEvent, CancelToken, PipelineCancelled
+
+# Triangle labels of a PreviewMesh
+LABEL_BODY = 0
+LABEL_GROOVE = 1
+LABEL_CLIP = 2
+
+# Feature meshes are small, so a finer deflection than the body stays cheap.
+FEATURE_DEFLECTION = 0.05
+
+# Body meshes kept in memory between previews of the same part (most recent last).
+MAX_BODY_MESHES = 4
+
+_body_meshes: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+_feature_meshes: Dict[tuple, Tuple[np.ndarray, np.ndarray]] = {}
+
+
+@dataclass
+class PreviewMesh:
+    """Combined triangle mesh of body, grooves and clips"""
+    vertices: np.ndarray   # (N, 3) float64
+    triangles: np.ndarray  # (M, 3) int64
+    labels: np.ndarray     # (M,) uint8, LABEL_* per triangle
+
+    @property
+    def triangle_count(self) -> int:
+        return len(self.triangles)
+
+    def count(self, label: int) -> int:
+        return int(np.count_nonzero(self.labels == label))
+
+    def write_stl(self, path: str) -> None:
+        """Writes a binary STL (the label is stored in each triangle's attribute field)"""
+        corners = self.vertices[self.triangles].astype(np.float32)
+        normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+        record = np.dtype([("normal", "<f4", (3,)), ("corners", "<f4", (3, 3)), ("attr", "<u2")])
+        data = np.empty(len(corners), dtype=record)
+        data["normal"] = normals
+        data["corners"] = corners
+        data["attr"] = self.labels
+        with open(path, "wb") as f:
+            f.write(b"Gen-CAD approximate preview".ljust(80, b"\0"))
+            f.write(np.array(len(data), dtype="<u4").tobytes())
+            f.write(data.tobytes())
+
+    def to_dict(self) -> dict:
+        return {
+            "vertices": len(self.vertices),
+            "triangles": self.triangle_count,
+            "body_triangles": self.count(LABEL_BODY),
+            "groove_triangles": self.count(LABEL_GROOVE),
+            "clip_triangles": self.count(LABEL_CLIP),
+        }
+
+
+def trsf_to_matrix(trsf: gp_Trsf) -> Tuple[np.ndarray, np.ndarray]:
+    """(rotation (3,3), translation (3,)) of a gp_Trsf, for x' = R @ x + t"""
+    matrix = np.array([[trsf.Value(r, c) for c in range(1, 5)] for r in range(1, 4)])
+    return matrix[:, :3], matrix[:, 3]
+
+
+def transform_points(points: np.ndarray, trsf: gp_Trsf) -> np.ndarray:
+    rotation, translation = trsf_to_matrix(trsf)
+    return points @ rotation.T + translation
+
+
+def _feature_key(role: str, generator) -> tuple:
+    params = generator.params
+    if isinstance(generator, ClipGenerator):
+        derived = generator.derive_from_groove()
+        return (role, derived.type.value, derived.width, derived.depth, derived.length,
+                params.retention_offset, FEATURE_DEFLECTION)
+    return (role, params.type.value, params.width, params.depth, params.length, FEATURE_DEFLECTION)
+
+
+def feature_mesh(role: str, generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Triangulation of a generator's shape at the origin (cached per parameter set)"""
+    from gen_cad_pipeline import mesh_shape
+
+    key = _feature_key(role, generator)
+    if key not in _feature_meshes:
+        shape = generator.create_shape()
+        mesh_shape(shape, FEATURE_DEFLECTION)
+        _feature_meshes[key] = triangulation_arrays(shape)
+    return _feature_meshes[key]
+
+
+def body_mesh(body_key: str, body) -> Tuple[np.ndarray, np.ndarray]:
+    """Triangulation stored with a cached thickened body (kept in memory per body key)"""
+    if body_key in _body_meshes:
+        _body_meshes[body_key] = _body_meshes.pop(body_key)
+        return _body_meshes[body_key]
+    arrays = triangulation_arrays(body)
+    _body_meshes[body_key] = arrays
+    while len(_body_meshes) > MAX_BODY_MESHES:
+        _body_meshes.pop(next(iter(_body_meshes)))
+    return arrays
+
+
+def combine_meshes(parts: List[Tuple[np.ndarray, np.ndarray, int]]) -> PreviewMesh:
+    """Concatenates (vertices, triangles, label) parts into one PreviewMesh"""
+    vertex_blocks, triangle_blocks, label_blocks = [], [], []
+    offset = 0
+    for vertices, triangles, label in parts:
+        vertex_blocks.append(vertices)
+        triangle_blocks.append(triangles + offset)
+        label_blocks.append(np.full(len(triangles), label, dtype=np.uint8))
+        offset += len(vertices)
+    if not vertex_blocks:
+        return PreviewMesh(np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64), np.zeros(0, dtype=np.uint8))
+    return PreviewMesh(np.vstack(vertex_blocks), np.vstack(triangle_blocks), np.concatenate(label_blocks))
+
+
+def build_preview_mesh(body_vertices: np.ndarray, body_triangles: np.ndarray, frames,
+                       groove_generator: GrooveGenerator, clip_generator: ClipGenerator) -> PreviewMesh:
+    """Places the groove/clip meshes at every (point, normal) frame and adds the body mesh"""
+    groove_vertices, groove_triangles = feature_mesh("groove", groove_generator)
+    clip_vertices, clip_triangles = feature_mesh("clip", clip_generator)
+
+    parts = [(body_vertices, body_triangles, LABEL_BODY)]
+    for location, normal in frames:
+        parts.append((transform_points(groove_vertices, groove_generator.placement_trsf(location, normal)),
+                      groove_triangles, LABEL_GROOVE))
+        parts.append((transform_points(clip_vertices, clip_generator.placement_trsf(location, normal)),
+                      clip_triangles, LABEL_CLIP))
+    return combine_meshes(parts)
+
+
+def run_preview(input_path: str, runtime_params: dict, stl_path: Optional[str] = None,
+                metrics: Optional[dict] = None, execution: Optional[ExecutionSettings] = None,
+                cancel_token: Optional[CancelToken] = None,
+                sink: Optional[Callable[[PipelineEvent], None]] = None, use_cache: bool = True):
+    """
+    Approximate counterpart of run_pipeline: same body, frames and feature sizes, no booleans.
+    The first preview of a part thickens it (and caches the body); later ones reuse it.
+    use_cache=False thickens and projects without reading or writing the caches.
+    Returns (success, message, PreviewMesh or None). Writes an STL when stl_path is given.
+    """
+    from gen_cad_pipeline import (log, body_key_for, build_feature_params, placement_table_for,
+                                  prepare_body, screen_placements)
+
+    ctx = PipelineContext(sink=sink, cancel_token=cancel_token, log_fn=log, metrics=metrics)
+    execution = resolve_execution(execution)
+    start_time = time.perf_counter()
+    try:
+        groove_params, clip_params, is_valid, msg = build_feature_params(runtime_params)
+        if not is_valid:
+            return False, f"Invalid clip parameters: {msg}", None
+
+        try:
+            input_hash = file_content_hash(input_path)
+        except OSError:
+            return False, "Could not read STEP file.", None
+        body_key = body_key_for(input_hash, runtime_params)
+        body = ThickenedBodyCache().load(body_key) if use_cache else None
+        ctx.metrics["body_cache_hit"] = body is not None
+        if body is None:
+            ctx.log("Preview", "No cached body for these settings - thickening once." if use_cache
+                               else "Caching disabled - thickening.")
+            success, message, _, body = prepare_body(ctx, input_path, input_hash, runtime_params, execution,
+                                                     use_cache=use_cache)
+            if not success:
+                return False, message, None
+
+        ctx.start_phase("Preview", "Approximate Preview")
+        body_vertices, body_triangles = body_mesh(body_key, body)
+        frames = placement_table_for(ctx, input_hash, runtime_params, body, execution, progress=False,
+                                     use_cache=use_cache).frames()
+        success, message, frames = screen_placements(ctx, frames, body, groove_params, clip_params,
+                                                     runtime_params.get("wall_check", "skip"),
+                                                     body_mesh=(body_vertices, body_triangles))
+        if not success:
+            return False, message, None
+        preview = build_preview_mesh(body_vertices, body_triangles, frames,
+                                     GrooveGenerator(groove_params), ClipGenerator(clip_params))
+        ctx.metrics["placements"] = len(frames)
+        ctx.metrics["preview"] = preview.to_dict()
+        if stl_path:
+            preview.write_stl(stl_path)
+        ctx.log("Preview", f"{len(frames)} placements, {preview.triangle_count} triangles "
+                           f"in {time.perf_counter() - start_time:.2f}s (no booleans).")
+        return True, "Success (preview)", preview
+    except PipelineCancelled:
+        return False, "Cancelled", None
+    finally:
+        ctx.finish_phase()
+        ctx.metrics["total_seconds"] = time.perf_counter() - start_time
@@ -0,0 +1,315 @@
+"""
+Region-Partitioned Thickening Module
+
+Handles:
+1. Partitioning a large surface into connected face regions whose boundaries only
+   run along smooth (tangent-continuous) edges.
+2. Offsetting every region into a thick solid in its own worker process (shells
+   and solids travel as shape_transport handles).
+3. Fusing the region solids back into one body, with a whole-body fallback when
+   the pieces do not stitch into a single valid solid.
+
+Faces joined by a sharp edge always stay in the same region: MakeThickSolidByJoin
+builds the arc joins of sharp edges, which a cut there would lose. Along a smooth
+edge the offsets of both neighbours meet exactly, so the lateral walls of adjacent
+region solids coincide and disappear in the fuse.
+"""
+
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from OCC.Core.BRep import BRep_Builder, BRep_Tool
+from OCC.Core.BRepAlgoAPI import BRepAlgoAPI_Fuse
+from OCC.Core.BRepCheck import BRepCheck_Analyzer
+from OCC.Core.BRepLib import breplib
+from OCC.Core.GeomAbs import GeomAbs_C0
+from OCC.Core.ShapeUpgrade import ShapeUpgrade_UnifySameDomain
+from OCC.Core.TopAbs import TopAbs_EDGE, TopAbs_FACE, TopAbs_SOLID
+from OCC.Core.TopExp import TopExp_Explorer, topexp
+from OCC.Core.TopoDS import TopoDS_Shape, TopoDS_Shell, topods
+from OCC.Core.TopTools import (TopTools_IndexedDataMapOfShapeListOfShape, TopTools_IndexedMapOfShape,
+                               TopTools_ListIteratorOfListOfShape, TopTools_ListOfShape)
+
+from shape_transport import ShapeHandle, ShapeStore, load_shape, publish_shape
+from volume_check import shape_volume
+
+# Edges whose faces meet within this angle (rad) count as smooth cut candidates.
+SMOOTH_ANGLE = 1e-2
+
+# Fuzzy value of the stitching fuse: coincident lateral walls of neighbouring
+# regions differ by the offset tolerance only.
+STITCH_FUZZY = 1e-3
+
+
+@dataclass
+class RegionOptions:
+    """When and how finely a surface is partitioned"""
+    target_faces: int = 64   # faces per region (regions grow to at least this size)
+    min_faces: int = 256     # smaller surfaces are thickened whole
+    max_regions: int = 16
+    workers: int = 0         # worker processes, 0 = one per core
+    volume_tolerance: float = 0.01  # relative, fused volume vs. sum of region volumes
+
+    def cache_variant(self) -> str:
+        """Stable identifier used in cache keys (the worker count does not change the body)"""
+        return (f"regions:t{self.target_faces}m{self.min_faces}r{self.max_regions}"
+                f":vt{self.volume_tolerance:g}")
+
+
+@dataclass
+class RegionReport:
+    """Outcome of one partitioned thickening attempt"""
+    faces: int = 0
+    regions: List[int] = field(default_factory=list)  # face count per region
+    applied: bool = False
+    workers: int = 1  # processes the regions were offset in (1 = serially in this process)
+    fallback_reason: str = ""
+    thicken_seconds: float = 0.0
+    stitch_seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _list_items(shapes: TopTools_ListOfShape) -> list:
+    items = []
+    it = TopTools_ListIteratorOfListOfShape(shapes)
+    while it.More():
+        items.append(it.Value())
+        it.Next()
+    return items
+
+
+def face_adjacency(shape: TopoDS_Shape) -> Tuple[list, List[Tuple[int, int, bool]]]:
+    """
+    Returns (faces, [(face a, face b, smooth)]) with 0-based face indices.
+    Edge regularity is encoded first, so imported surfaces without continuity
+    flags get their smooth edges detected.
+    """
+    breplib.EncodeRegularity(shape, SMOOTH_ANGLE)
+    face_map = TopTools_IndexedMapOfShape()
+    topexp.MapShapes(shape, TopAbs_FACE, face_map)
+    edge_faces = TopTools_IndexedDataMapOfShapeListOfShape()
+    topexp.MapShapesAndAncestors(shape, TopAbs_EDGE, TopAbs_FACE, edge_faces)
+
+    faces = [topods.Face(face_map.FindKey(i)) for i in range(1, face_map.Size() + 1)]
+    pairs = []
+    for i in range(1, edge_faces.Size() + 1):
+        edge = topods.Edge(edge_faces.FindKey(i))
+        neighbours = _list_items(edge_faces.FindFromIndex(i))
+        if len(neighbours) != 2:
+            continue  # free (boundary) or non-manifold edge
+        face_a, face_b = topods.Face(neighbours[0]), topods.Face(neighbours[1])
+        a, b = face_map.FindIndex(face_a) - 1, face_map.FindIndex(face_b) - 1
+        if a == b:
+            continue  # seam edge
+        smooth = BRep_Tool.Continuity(edge, face_a, face_b) != GeomAbs_C0
+        pairs.append((a, b, smooth))
+    return faces, pairs
+
+
+def partition_faces(face_count: int, pairs: List[Tuple[int, int, bool]],
+                    target_faces: int, max_regions: int) -> List[List[int]]:
+    """
+    Groups face indices into connected regions cut only along smooth edges.
+    Faces joined by sharp edges form atomic clusters; clusters are grown
+    breadth-first across smooth edges until a region holds target_faces faces.
+    """
+    parent = list(range(face_count))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b, smooth in pairs:
+        if not smooth:
+            parent[find(a)] = find(b)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(face_count):
+        clusters.setdefault(find(i), []).append(i)
+    neighbours: Dict[int, set] = {root: set() for root in clusters}
+    for a, b, smooth in pairs:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            neighbours[ra].add(rb)
+            neighbours[rb].add(ra)
+
+    # Aim for at most max_regions regions (leftover fragments may add a few)
+    target = max(target_faces, -(-face_count // max(1, max_regions)))
+    regions, assigned = [], set()
+    for seed in sorted(clusters, key=lambda r: min(clusters[r])):
+        if seed in assigned:
+            continue
+        region, queue = [], [seed]
+        assigned.add(seed)
+        while queue and len(region) < target:
+            root = queue.pop(0)
+            region.extend(clusters[root])
+            for other in sorted(neighbours[root]):
+                if other not in assigned:
+                    assigned.add(other)
+                    queue.append(other)
+        # Clusters queued but not taken go back to the pool
+        for root in queue:
+            assigned.discard(root)
+        regions.append(sorted(region))
+    return regions
+
+
+def region_shell(faces: list, indices: List[int]) -> TopoDS_Shell:
+    """Shell of the given faces (they keep the shared edges and orientation of the input)"""
+    builder = BRep_Builder()
+    shell = TopoDS_Shell()
+    builder.MakeShell(shell)
+    for i in indices:
+        builder.Add(shell, faces[i])
+    return shell
+
+
+def _thicken_region(handle: ShapeHandle, offset: float, tolerance: float) -> Optional[ShapeHandle]:
+    """Worker: offsets one shared region shell and publishes the solid"""
+    from gen_cad_pipeline import thicken_shape
+
+    shell = load_shape(handle)
+    if shell is None:
+        return None
+    solid = thicken_shape(shell, offset, tolerance=tolerance)
+    return publish_shape(solid) if solid is not None else None
+
+
+def _solid_count(shape: TopoDS_Shape) -> int:
+    count = 0
+    exp = TopExp_Explorer(shape, TopAbs_SOLID)
+    while exp.More():
+        count += 1
+        exp.Next()
+    return count
+
+
+def stitch_regions(solids: List[TopoDS_Shape], parallel: bool = True) -> Optional[TopoDS_Shape]:
+    """Fuses the region solids in one boolean and merges the split faces. None on failure."""
+    if len(solids) == 1:
+        return solids[0]
+    arguments, tools = TopTools_ListOfShape(), TopTools_ListOfShape()
+    arguments.Append(solids[0])
+    for solid in solids[1:]:
+        tools.Append(solid)
+    fuse = BRepAlgoAPI_Fuse()
+    fuse.SetArguments(arguments)
+    fuse.SetTools(tools)
+    fuse.SetFuzzyValue(STITCH_FUZZY)
+    fuse.SetRunParallel(parallel)
+    fuse.SetToFillHistory(False)
+    fuse.Build()
+    if not fuse.IsDone():
+        return None
+    unifier = ShapeUpgrade_UnifySameDomain(fuse.Shape(), True, True, False)
+    unifier.Build()
+    return unifier.Shape()
+
+
+def region_workers(options: RegionOptions, region_count: int) -> int:
+    """
+    Worker processes used for `region_count` regions. 1 (serial, in this process) when
+    a single worker is configured or this process is daemonic, since daemonic
+    processes may not start a pool.
+    """
+    if multiprocessing.current_process().daemon:
+        return 1
+    workers = options.workers if options.workers > 0 else multiprocessing.cpu_count()
+    return max(1, min(workers, region_count))
+
+
+def _run_regions(shells: List[TopoDS_Shape], offset: float, tolerance: float, workers: int,
+                 check_cancel: Callable[[], None]) -> List[Optional[TopoDS_Shape]]:
+    from gen_cad_pipeline import thicken_shape
+
+    if workers <= 1:
+        results = []
+        for shell in shells:
+            results.append(thicken_shape(shell, offset, tolerance=tolerance))
+            check_cancel()
+        return results
+    # spawn: OCC state must not be inherited through fork
+    with ShapeStore() as store, ProcessPoolExecutor(max_workers=workers,
+                                                    mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(_thicken_region, store.put(shell), offset, tolerance) for shell in shells]
+        results = []
+        try:
+            for future in futures:
+                handle = future.result()
+                if handle is None:
+                    results.append(None)
+                else:
+                    store.adopt(handle)
+                    results.append(store.get(handle))
+                    store.release(handle)
+                check_cancel()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        return results
+
+
+def thicken_partitioned(shape: TopoDS_Shape, offset: float, options: Optional[RegionOptions] = None,
+                        tolerance: float = 1e-3, parallel_booleans: bool = True,
+                        check_cancel: Optional[Callable[[], None]] = None
+                        ) -> Tuple[Optional[TopoDS_Shape], RegionReport]:
+    """
+    Thickens `shape` region by region. Returns (solid, report); solid is None when
+    the surface is too small to partition or the stitched result is not a single
+    valid solid - report.fallback_reason then says why, and the caller thickens
+    the whole body instead.
+    """
+    options = options or RegionOptions()
+    check_cancel = check_cancel or (lambda: None)
+    report = RegionReport()
+
+    faces, pairs = face_adjacency(shape)
+    report.faces = len(faces)
+    if len(faces) < options.min_faces:
+        report.fallback_reason = f"{len(faces)} faces, below the partitioning threshold of {options.min_faces}"
+        return None, report
+    regions = partition_faces(len(faces), pairs, options.target_faces, options.max_regions)
+    report.regions = [len(r) for r in regions]
+    if len(regions) < 2:
+        report.fallback_reason = "No smooth edges to partition along"
+        return None, report
+
+    start_time = time.perf_counter()
+    shells = [region_shell(faces, region) for region in regions]
+    report.workers = region_workers(options, len(shells))
+    results = _run_regions(shells, offset, tolerance, report.workers, check_cancel)
+    report.thicken_seconds = time.perf_counter() - start_time
+
+    solids = []
+    for index, solid in enumerate(results):
+        if solid is None:
+            report.fallback_reason = f"Offset of region {index + 1} ({report.regions[index]} faces) failed"
+            return None, report
+        solids.append(solid)
+
+    start_time = time.perf_counter()
+    result = stitch_regions(solids, parallel_booleans)
+    report.stitch_seconds = time.perf_counter() - start_time
+    check_cancel()
+    if result is None or result.IsNull():
+        report.fallback_reason = "Fusing the region solids failed"
+        return None, report
+    if _solid_count(result) != 1 or not BRepCheck_Analyzer(result).IsValid():
+        report.fallback_reason = "Region solids did not stitch into one valid solid"
+        return None, report
+    expected = sum(shape_volume(s) for s in solids)
+    if abs(shape_volume(result) - expected) > options.volume_tolerance * expected:
+        report.fallback_reason = "Stitched volume differs from the sum of the regions"
+        return None, report
+
+    report.applied = True
+    return result, report
@@ -0,0 +1,225 @@
+"""
+Pipeline Result Cache Module
+
+Handles:
+1. Persistent storage of pipeline outputs (STEP, STL preview, placement table, metrics).
+2. Cache keys from the input file content hash, normalized runtime_params and the
+   pipeline settings those do not cover (gen_cad_pipeline.geometry_settings_for).
+3. Least-recently-used eviction under a disk-size cap.
+
+Each entry is a directory <cache_dir>/<key>/ written atomically (temp dir + rename).
+Recency is tracked through the modification time of the entry's metrics file,
+so several worker processes can share a cache without a lock file.
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+from typing import Callable, Optional, Tuple
+
+from input_hash import file_content_hash, payload_hash
+from runtime_input import runtime_params_to_json
+from placement_table import frames_path_for
+
+DEFAULT_CACHE_DIR = ".result_cache"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GB
+
+STEP_NAME = "output.stp"
+STL_NAME = "output.stl"
+FRAMES_NAME = "output.frames.npz"
+METRICS_NAME = "metrics.json"
+
+# Bump when pipeline changes alter the geometry produced for identical inputs.
+CACHE_VERSION = 2
+
+
+def stl_path_for(output_path: str) -> str:
+    """Preview STL path written next to a STEP output (same rule as run_pipeline)"""
+    return output_path.replace(".stp", ".stl").replace(".step", ".stl")
+
+
+def make_cache_key(input_hash: str, runtime_params: dict, settings: Optional[dict] = None) -> str:
+    """
+    Cache key from the input's content hash (input_hash.file_content_hash), normalized
+    parameters (GrooveType stored by value) and geometry settings outside runtime_params.
+    """
+    payload = {
+        "version": CACHE_VERSION,
+        "input": input_hash,
+        "params": runtime_params_to_json(runtime_params),
+        "settings": settings or {},
+    }
+    return payload_hash(payload)
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ResultCache:
+    """Content-addressed store of pipeline results with LRU eviction"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def lookup(self, key: str, output_path: str) -> Optional[dict]:
+        """
+        On a hit, copies the cached STEP/STL/placement table next to output_path,
+        marks the entry as recently used and returns the stored metrics.
+        """
+        entry = self._entry_dir(key)
+        metrics_path = os.path.join(entry, METRICS_NAME)
+        step_path = os.path.join(entry, STEP_NAME)
+        if not (os.path.exists(metrics_path) and os.path.exists(step_path)):
+            return None
+
+        try:
+            with open(metrics_path, "r", encoding="utf-8") as f:
+                metrics = json.load(f)
+            out_dir = os.path.dirname(os.path.abspath(output_path))
+            os.makedirs(out_dir, exist_ok=True)
+            shutil.copyfile(step_path, output_path)
+            cached_stl = os.path.join(entry, STL_NAME)
+            if os.path.exists(cached_stl):
+                shutil.copyfile(cached_stl, stl_path_for(output_path))
+            cached_frames = os.path.join(entry, FRAMES_NAME)
+            if os.path.exists(cached_frames):
+                shutil.copyfile(cached_frames, frames_path_for(output_path))
+            os.utime(metrics_path, None)
+        except (OSError, ValueError):
+            return None
+
+        return metrics
+
+    def store(self, key: str, output_path: str, metrics: dict) -> bool:
+        """Copies a finished run's outputs into the cache, then enforces the size cap."""
+        if not os.path.exists(output_path):
+            return False
+
+        entry = self._entry_dir(key)
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp_", dir=self.cache_dir)
+        try:
+            shutil.copyfile(output_path, os.path.join(tmp_dir, STEP_NAME))
+            stl_path = stl_path_for(output_path)
+            if os.path.exists(stl_path):
+                shutil.copyfile(stl_path, os.path.join(tmp_dir, STL_NAME))
+            frames_path = frames_path_for(output_path)
+            if os.path.exists(frames_path):
+                shutil.copyfile(frames_path, os.path.join(tmp_dir, FRAMES_NAME))
+            with open(os.path.join(tmp_dir, METRICS_NAME), "w", encoding="utf-8") as f:
+                json.dump(metrics, f, indent=2, default=str)
+
+            if os.path.exists(entry):
+                shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp_dir, entry)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+
+        self.evict()
+        return True
+
+    def evict(self) -> int:
+        """Removes least-recently-used entries until the cache fits max_bytes. Returns bytes freed."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            path = self._entry_dir(name)
+            if name.startswith(".tmp_") or not os.path.isdir(path):
+                continue
+            metrics_path = os.path.join(path, METRICS_NAME)
+            try:
+                last_used = os.path.getmtime(metrics_path)
+            except OSError:
+                last_used = 0.0
+            size = _dir_size(path)
+            entries.append((last_used, size, path))
+            total += size
+
+        freed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            freed += size
+        return freed
+
+    def total_size(self) -> int:
+        return _dir_size(self.cache_dir)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+
+def result_metrics(key: str, input_path: str, runtime_params: dict, duration: float,
+                   pipeline_metrics: Optional[dict] = None) -> dict:
+    """Metrics stored alongside a cached result"""
+    return {
+        "cache_key": key,
+        "cache_hit": False,
+        "duration": duration,
+        "created": time.time(),
+        "input_path": input_path,
+        "runtime_params": runtime_params_to_json(runtime_params),
+        "pipeline": pipeline_metrics or {},
+    }
+
+
+def cached_run_pipeline(input_path: str, output_path: str, runtime_params: dict,
+                        cache: Optional[ResultCache] = None,
+                        execution=None, capture=None, memory=None,
+                        run_fn: Optional[Callable[[str, str, dict, str], Tuple[bool, str, dict]]] = None,
+                        input_hash: Optional[str] = None) -> Tuple[bool, str, dict]:
+    """
+    run_pipeline with a result cache in front of it.
+    Returns (success, message, metrics); metrics["cache_hit"] tells whether the pipeline ran.
+    `execution` (ExecutionSettings), `capture` (CaptureSettings) and `memory`
+    (MemoryBudget) do not change the geometry, so they are not part of the key.
+    `run_fn(input_path, output_path, runtime_params, input_hash) -> (success, message,
+    pipeline_metrics)` replaces the in-process run on a miss (e.g. a worker process
+    streaming progress); the execution/capture/memory arguments are then up to it.
+    `input_hash` is the caller's file_content_hash of the input, if it has one; the
+    input is hashed once per run and the hash is handed to the pipeline's own caches.
+    """
+    from gen_cad_pipeline import run_pipeline, log, geometry_settings_for
+
+    cache = cache or ResultCache()
+    start_time = time.perf_counter()
+    input_hash = input_hash or file_content_hash(input_path)
+    key = make_cache_key(input_hash, runtime_params, geometry_settings_for(runtime_params))
+
+    metrics = cache.lookup(key, output_path)
+    if metrics is not None:
+        metrics["cache_hit"] = True
+        metrics["lookup_seconds"] = time.perf_counter() - start_time
+        log("Cache", f"Hit {key[:12]} - reused stored result ({metrics['lookup_seconds'] * 1000:.1f} ms)")
+        return True, "Success (cached)", metrics
+
+    if run_fn is not None:
+        success, message, pipeline_metrics = run_fn(input_path, output_path, runtime_params, input_hash)
+    else:
+        pipeline_metrics = {}
+        success, message = run_pipeline(input_path, output_path, runtime_params, metrics=pipeline_metrics,
+                                        execution=execution, capture=capture, memory=memory,
+                                        input_hash=input_hash)
+    metrics = result_metrics(key, input_path, runtime_params, time.perf_counter() - start_time, pipeline_metrics)
+    if success:
+        cache.store(key, output_path, metrics)
+    return success, message, metrics
@@ -6,7 +6,8 @@ Validates all inputs and provides clear error messages.
 """
 
 from typing import Tuple
-from groove_generator import GrooveType
+from groove_parameters import GrooveType
+from wall_check import POLICY_ALIASES, WALL_CHECK_POLICIES, check_depth_against_thickness
 
 
 def get_groove_shape() -> GrooveType:
@@ -224,6 +225,9 @@ def collect_all_inputs() -> dict:
     calculated_clip_depth = groove_depth - retention_offset
     
     print(f"Calculated Clip Dimensions: {clip_height}mm × {calculated_clip_width}mm × {calculated_clip_depth}mm (H×W×D)")
+    depth_ok, depth_msg = check_depth_against_thickness(thickness, groove_depth)
+    if not depth_ok:
+        print(f"⚠ Warning: {depth_msg} - grooves would break through the wall.")
     print("="*60)
     
     confirm = input("\nProceed with these parameters? (y/n): ").strip().lower()
@@ -244,6 +248,67 @@ def collect_all_inputs() -> dict:
     }
 
 
+RUNTIME_PARAM_DEFAULTS = {
+    "thickness": 2.65,
+    "groove_count": 5,
+    "groove_shape": GrooveType.RECTANGULAR,
+    "groove_height": 10.0,
+    "groove_width": 5.0,
+    "groove_depth": 2.5,
+    "clip_height": 20.0,
+    "assembly_clearance": 0.2,
+    "retention_offset": 0.1,
+    "simplify_input": False,
+    "sliver_tolerance": 0.0,
+    "region_thickening": False,
+    "wall_check": "skip",
+    "locations": None  # placement reference points, None = the part's REFERENCE_CENTROIDS
+}
+
+
+def normalize_runtime_params(params: dict) -> dict:
+    """
+    Builds a complete runtime_params dictionary from a partial one
+    (e.g. loaded from JSON). Missing keys fall back to defaults,
+    numbers are coerced and groove_shape is converted to GrooveType.
+    """
+    normalized = dict(RUNTIME_PARAM_DEFAULTS)
+    normalized.update({k: v for k, v in params.items() if k in RUNTIME_PARAM_DEFAULTS})
+    
+    shape = normalized["groove_shape"]
+    if not isinstance(shape, GrooveType):
+        normalized["groove_shape"] = GrooveType(str(shape).strip().lower())
+    
+    normalized["groove_count"] = int(normalized["groove_count"])
+    for key in ("thickness", "groove_height", "groove_width", "groove_depth",
+                "clip_height", "assembly_clearance", "retention_offset", "sliver_tolerance"):
+        normalized[key] = float(normalized[key])
+    
+    for key in ("simplify_input", "region_thickening"):
+        flag = normalized[key]
+        if isinstance(flag, str):
+            flag = flag.strip().lower() in ("1", "true", "yes", "y")
+        normalized[key] = bool(flag)
+    
+    policy = str(normalized["wall_check"]).strip().lower()
+    policy = POLICY_ALIASES.get(policy, policy)
+    if policy not in WALL_CHECK_POLICIES:
+        raise ValueError(f"Unknown wall_check policy '{policy}' (expected one of {', '.join(WALL_CHECK_POLICIES)})")
+    normalized["wall_check"] = policy
+    
+    if normalized["locations"] is not None:
+        normalized["locations"] = [tuple(float(c) for c in loc) for loc in normalized["locations"]]
+    
+    return normalized
+
+
+def runtime_params_to_json(params: dict) -> dict:
+    """Converts runtime_params into a JSON-serializable dictionary"""
+    normalized = normalize_runtime_params(params)
+    normalized["groove_shape"] = normalized["groove_shape"].value
+    return normalized
+
+
 if __name__ == "__main__":
     # Test the input collection
     params = collect_all_inputs()
@@ -0,0 +1,396 @@
+"""
+Geometric Fingerprint Module
+
+Handles:
+1. Computation of a compact shape signature: volume, area, centroid, principal
+   inertia, bounding box, topology counts and a sampled surface point cloud.
+2. Tolerance-based diff of two signatures in NumPy (no exact shape-to-shape distance queries).
+3. A stable hash of a signature for use as a cache key.
+
+The point cloud is sized from a target spacing (within a sample-count range), and
+the diff fails a signature whose cloud is too coarse to resolve max_cloud_spacing,
+so sampling noise cannot hide geometry changes on large parts. OCC is only
+imported to measure and mesh shapes; signatures, sampling and the diff are NumPy.
+
+Command line:
+    python shape_fingerprint.py new.stp Part_style_thickened_with_grooves_and_clips.stp
+"""
+
+import sys
+import json
+import math
+import hashlib
+import argparse
+from dataclasses import dataclass, field, asdict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from OCC.Core.TopoDS import TopoDS_Shape
+
+# Counted entity types (names of the TopAbs_* shape types, lower case plural)
+TOPOLOGY_TYPES = ("solids", "shells", "faces", "edges", "vertices")
+
+DEFAULT_SAMPLE_COUNT = 2048  # minimum cloud size
+MAX_SAMPLE_COUNT = 16384  # the diff compares clouds by brute force
+DEFAULT_SAMPLE_SPACING = 1.0  # mm, target spacing of the cloud between those bounds
+DEFAULT_MESH_DEFLECTION = 0.1
+SAMPLE_SEED = 1234
+
+
+@dataclass
+class ShapeFingerprint:
+    """Compact geometric signature of a shape"""
+    volume: float
+    area: float
+    centroid: List[float]
+    principal_inertia: List[float]  # ascending eigenvalues of the inertia matrix
+    bbox: List[float]  # xmin, ymin, zmin, xmax, ymax, zmax
+    topology: Dict[str, int]
+    points: np.ndarray = field(repr=False, default_factory=lambda: np.zeros((0, 3), dtype=np.float32))
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["points"] = self.points.tolist()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ShapeFingerprint":
+        data = dict(data)
+        data["points"] = np.asarray(data.get("points", []), dtype=np.float32).reshape(-1, 3)
+        return cls(**data)
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "ShapeFingerprint":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def digest(self, decimals: int = 3) -> str:
+        """
+        Stable hash of the scalar part of the signature, rounded to `decimals`,
+        suitable as a cache key for a shape.
+        """
+        scalars = [self.volume, self.area, *self.centroid, *self.principal_inertia, *self.bbox]
+        payload = {
+            "scalars": [round(v, decimals) for v in scalars],
+            "topology": dict(sorted(self.topology.items())),
+        }
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+
+@dataclass
+class FingerprintTolerances:
+    """Tolerances used by diff_fingerprints"""
+    rel_volume: float = 1e-3
+    rel_area: float = 1e-3
+    rel_inertia: float = 1e-2
+    abs_centroid: float = 0.05  # mm
+    abs_bbox: float = 0.05  # mm
+    exact_topology: bool = False
+    rel_topology: float = 0.05  # allowed relative change per entity count when not exact
+    abs_cloud_mean: float = 0.05  # mm, added to the expected nearest-sample distance
+    abs_cloud_max: float = 0.5  # mm, added to twice the sampling spacing
+    max_cloud_spacing: float = 2.0  # mm, coarser clouds fail the "cloud.spacing" check
+
+
+@dataclass
+class FingerprintCheck:
+    name: str
+    expected: float
+    actual: float
+    delta: float
+    tolerance: float
+    passed: bool
+
+
+@dataclass
+class FingerprintDiff:
+    checks: List[FingerprintCheck] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return all(c.passed for c in self.checks)
+
+    @property
+    def failures(self) -> List[FingerprintCheck]:
+        return [c for c in self.checks if not c.passed]
+
+    def summary(self) -> str:
+        lines = []
+        for c in self.checks:
+            status = "OK  " if c.passed else "FAIL"
+            lines.append(f"{status} {c.name:<22} expected={c.expected:.6g} actual={c.actual:.6g} "
+                         f"delta={c.delta:.3g} tol={c.tolerance:.3g}")
+        return "\n".join(lines)
+
+
+def topology_counts(shape: "TopoDS_Shape") -> Dict[str, int]:
+    """Number of distinct solids, shells, faces, edges and vertices"""
+    from OCC.Core.TopAbs import TopAbs_SOLID, TopAbs_SHELL, TopAbs_FACE, TopAbs_EDGE, TopAbs_VERTEX
+    from OCC.Core.TopExp import topexp
+    from OCC.Core.TopTools import TopTools_IndexedMapOfShape
+
+    shape_types = (TopAbs_SOLID, TopAbs_SHELL, TopAbs_FACE, TopAbs_EDGE, TopAbs_VERTEX)
+    counts = {}
+    for name, shape_type in zip(TOPOLOGY_TYPES, shape_types):
+        shape_map = TopTools_IndexedMapOfShape()
+        topexp.MapShapes(shape, shape_type, shape_map)
+        counts[name] = shape_map.Size()
+    return counts
+
+
+def _principal_inertia(props) -> List[float]:
+    """Ascending eigenvalues of a GProp_GProps inertia matrix"""
+    mat = props.MatrixOfInertia()
+    inertia = np.array([[mat.Value(r, c) for c in range(1, 4)] for r in range(1, 4)])
+    return sorted(float(v) for v in np.linalg.eigvalsh(inertia))
+
+
+def triangulation_arrays(shape: "TopoDS_Shape") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Collects the existing face triangulations of a meshed shape.
+    Returns (vertices (N,3) float64, triangles (M,3) int64) with consistent outward winding.
+    """
+    from OCC.Core.BRep import BRep_Tool
+    from OCC.Core.TopAbs import TopAbs_FACE, TopAbs_REVERSED
+    from OCC.Core.TopExp import TopExp_Explorer
+    from OCC.Core.TopLoc import TopLoc_Location
+    from OCC.Core.TopoDS import topods
+
+    vertex_blocks = []
+    triangle_blocks = []
+    offset = 0
+    exp = TopExp_Explorer(shape, TopAbs_FACE)
+    while exp.More():
+        face = topods.Face(exp.Current())
+        exp.Next()
+        loc = TopLoc_Location()
+        tri = BRep_Tool.Triangulation(face, loc)
+        if tri is None:
+            continue
+        trsf = loc.Transformation()
+        nodes = np.empty((tri.NbNodes(), 3), dtype=float)
+        for i in range(1, tri.NbNodes() + 1):
+            p = tri.Node(i).Transformed(trsf)
+            nodes[i - 1] = (p.X(), p.Y(), p.Z())
+        tris = np.empty((tri.NbTriangles(), 3), dtype=np.int64)
+        for i in range(1, tri.NbTriangles() + 1):
+            tris[i - 1] = tri.Triangle(i).Get()
+        tris -= 1
+        if face.Orientation() == TopAbs_REVERSED:
+            tris = tris[:, [0, 2, 1]]
+        vertex_blocks.append(nodes)
+        triangle_blocks.append(tris + offset)
+        offset += len(nodes)
+
+    if not vertex_blocks:
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)
+    return np.vstack(vertex_blocks), np.vstack(triangle_blocks)
+
+
+def sample_surface_points(vertices: np.ndarray, triangles: np.ndarray, count: int,
+                          seed: int = SAMPLE_SEED) -> np.ndarray:
+    """Area-weighted uniform sampling of points on a triangle mesh (vectorized)"""
+    if len(triangles) == 0 or count <= 0:
+        return np.zeros((0, 3), dtype=np.float32)
+    a = vertices[triangles[:, 0]]
+    b = vertices[triangles[:, 1]]
+    c = vertices[triangles[:, 2]]
+    areas = 0.5 * np.linalg.norm(np.cross(b - a, c - a), axis=1)
+    total = areas.sum()
+    if total <= 0:
+        return np.zeros((0, 3), dtype=np.float32)
+
+    rng = np.random.default_rng(seed)
+    chosen = rng.choice(len(triangles), size=count, p=areas / total)
+    r1 = np.sqrt(rng.random(count))
+    r2 = rng.random(count)
+    w_a = 1.0 - r1
+    w_b = r1 * (1.0 - r2)
+    w_c = r1 * r2
+    points = w_a[:, None] * a[chosen] + w_b[:, None] * b[chosen] + w_c[:, None] * c[chosen]
+    return points.astype(np.float32)
+
+
+def cloud_sample_count(area: float, spacing: float = DEFAULT_SAMPLE_SPACING,
+                       minimum: int = DEFAULT_SAMPLE_COUNT, maximum: int = MAX_SAMPLE_COUNT) -> int:
+    """Samples needed for the given spacing on a surface of `area`, within [minimum, maximum]"""
+    if spacing <= 0 or area <= 0:
+        return minimum
+    return int(min(max(math.ceil(area / spacing ** 2), minimum), max(minimum, maximum)))
+
+
+def compute_fingerprint(shape: "TopoDS_Shape", sample_count: Optional[int] = None,
+                        deflection: float = DEFAULT_MESH_DEFLECTION, mesh: bool = True) -> ShapeFingerprint:
+    """
+    Computes the signature of a shape. Meshes the shape unless mesh=False (existing triangulation is used).
+    sample_count=None sizes the point cloud with cloud_sample_count.
+    """
+    from OCC.Core.BRepBndLib import brepbndlib
+    from OCC.Core.BRepGProp import brepgprop
+    from OCC.Core.BRepMesh import BRepMesh_IncrementalMesh
+    from OCC.Core.Bnd import Bnd_Box
+    from OCC.Core.GProp import GProp_GProps
+
+    vol_props = GProp_GProps()
+    brepgprop.VolumeProperties(shape, vol_props)
+    area_props = GProp_GProps()
+    brepgprop.SurfaceProperties(shape, area_props)
+
+    center = vol_props.CentreOfMass()
+    bbox = Bnd_Box()
+    brepbndlib.Add(shape, bbox)
+    bbox_values = list(bbox.Get()) if not bbox.IsVoid() else [0.0] * 6
+
+    if mesh:
+        BRepMesh_IncrementalMesh(shape, deflection)
+    vertices, triangles = triangulation_arrays(shape)
+    area = float(area_props.Mass())
+    if sample_count is None:
+        sample_count = cloud_sample_count(area)
+
+    return ShapeFingerprint(
+        volume=float(vol_props.Mass()),
+        area=area,
+        centroid=[center.X(), center.Y(), center.Z()],
+        principal_inertia=_principal_inertia(vol_props),
+        bbox=bbox_values,
+        topology=topology_counts(shape),
+        points=sample_surface_points(vertices, triangles, sample_count),
+    )
+
+
+def nearest_distances(source: np.ndarray, target: np.ndarray, chunk: int = 256) -> np.ndarray:
+    """Distance from every source point to its nearest target point (chunked brute force)"""
+    if len(source) == 0 or len(target) == 0:
+        return np.zeros(0)
+    target = target.astype(np.float64)
+    target_sq = (target ** 2).sum(axis=1)
+    out = np.empty(len(source))
+    for start in range(0, len(source), chunk):
+        block = source[start:start + chunk].astype(np.float64)
+        d2 = (block ** 2).sum(axis=1)[:, None] - 2.0 * block @ target.T + target_sq[None, :]
+        out[start:start + chunk] = np.sqrt(np.maximum(d2.min(axis=1), 0.0))
+    return out
+
+
+def _relative_check(name: str, expected: float, actual: float, rel_tol: float) -> FingerprintCheck:
+    delta = abs(actual - expected)
+    tol = rel_tol * max(abs(expected), 1e-9)
+    return FingerprintCheck(name, expected, actual, delta, tol, delta <= tol)
+
+
+def _absolute_check(name: str, expected: float, actual: float, abs_tol: float) -> FingerprintCheck:
+    delta = abs(actual - expected)
+    return FingerprintCheck(name, expected, actual, delta, abs_tol, delta <= abs_tol)
+
+
+def diff_fingerprints(expected: ShapeFingerprint, actual: ShapeFingerprint,
+                      tol: Optional[FingerprintTolerances] = None) -> FingerprintDiff:
+    """Compares two signatures; every quantity becomes one check"""
+    tol = tol or FingerprintTolerances()
+    diff = FingerprintDiff()
+
+    diff.checks.append(_relative_check("volume", expected.volume, actual.volume, tol.rel_volume))
+    diff.checks.append(_relative_check("area", expected.area, actual.area, tol.rel_area))
+    inertia_scale = max(max(abs(v) for v in expected.principal_inertia), 1e-9)
+    for i, (e, a) in enumerate(zip(expected.principal_inertia, actual.principal_inertia)):
+        delta = abs(a - e)
+        limit = tol.rel_inertia * inertia_scale
+        diff.checks.append(FingerprintCheck(f"inertia[{i}]", e, a, delta, limit, delta <= limit))
+    for axis, e, a in zip("xyz", expected.centroid, actual.centroid):
+        diff.checks.append(_absolute_check(f"centroid.{axis}", e, a, tol.abs_centroid))
+    for name, e, a in zip(("xmin", "ymin", "zmin", "xmax", "ymax", "zmax"), expected.bbox, actual.bbox):
+        diff.checks.append(_absolute_check(f"bbox.{name}", e, a, tol.abs_bbox))
+
+    for name in TOPOLOGY_TYPES:
+        e = expected.topology.get(name, 0)
+        a = actual.topology.get(name, 0)
+        limit = 0.0 if tol.exact_topology else math.ceil(tol.rel_topology * e)
+        diff.checks.append(FingerprintCheck(f"topology.{name}", e, a, abs(a - e), limit, abs(a - e) <= limit))
+
+    if len(expected.points) and len(actual.points):
+        diff.checks.extend(cloud_checks(expected.points, actual.points, expected.area, tol))
+    return diff
+
+
+def cloud_spacing(area: float, count: int) -> float:
+    """Mean spacing of `count` uniform samples on a surface of `area`"""
+    return math.sqrt(max(area, 0.0) / count) if count else math.inf
+
+
+def cloud_checks(expected_points: np.ndarray, actual_points: np.ndarray, area: float,
+                 tol: FingerprintTolerances) -> List[FingerprintCheck]:
+    """
+    Symmetric nearest-neighbour comparison of two sampled clouds of a surface of `area`.
+    Independent uniform samples of the same surface are on average half a spacing from
+    their nearest neighbour (3/4 allowed for boundary effects), and rarely more than two.
+    """
+    spacing = cloud_spacing(area, min(len(expected_points), len(actual_points)))
+    forward = nearest_distances(actual_points, expected_points)
+    backward = nearest_distances(expected_points, actual_points)
+    mean_dist = 0.5 * (forward.mean() + backward.mean())
+    max_dist = max(forward.max(), backward.max())
+    mean_limit = tol.abs_cloud_mean + 0.75 * spacing
+    max_limit = tol.abs_cloud_max + 2.0 * spacing
+    return [
+        FingerprintCheck("cloud.spacing", tol.max_cloud_spacing, spacing, spacing, tol.max_cloud_spacing,
+                         spacing <= tol.max_cloud_spacing),
+        FingerprintCheck("cloud.mean", 0.0, mean_dist, mean_dist, mean_limit, mean_dist <= mean_limit),
+        FingerprintCheck("cloud.max", 0.0, max_dist, max_dist, max_limit, max_dist <= max_limit),
+    ]
+
+
+def load_step_shape(path: str) -> Optional["TopoDS_Shape"]:
+    from OCC.Core.STEPControl import STEPControl_Reader
+
+    reader = STEPControl_Reader()
+    if reader.ReadFile(path) != 1:
+        return None
+    reader.TransferRoots()
+    return reader.OneShape()
+
+
+def fingerprint_file(path: str, sample_count: Optional[int] = None) -> ShapeFingerprint:
+    """Fingerprint of a STEP file, or of a previously saved .json signature"""
+    if path.lower().endswith(".json"):
+        return ShapeFingerprint.load(path)
+    shape = load_step_shape(path)
+    if shape is None:
+        raise ValueError(f"Could not read STEP file: {path}")
+    return compute_fingerprint(shape, sample_count=sample_count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geometric fingerprint and regression diff")
+    parser.add_argument("actual", help="STEP file (or saved .json fingerprint) to check")
+    parser.add_argument("expected", nargs="?", help="Golden STEP file or .json fingerprint")
+    parser.add_argument("--save", help="Write the fingerprint of `actual` to this .json file")
+    parser.add_argument("--samples", type=int, default=None,
+                        help=f"Surface sample count (default: {DEFAULT_SAMPLE_SPACING:g} mm spacing, "
+                             f"{DEFAULT_SAMPLE_COUNT}-{MAX_SAMPLE_COUNT} samples)")
+    parser.add_argument("--exact-topology", action="store_true", help="Require identical topology counts")
+    args = parser.parse_args()
+
+    actual = fingerprint_file(args.actual, args.samples)
+    print(f"[Fingerprint] {args.actual}: volume={actual.volume:.3f} area={actual.area:.3f} "
+          f"topology={actual.topology} digest={actual.digest()[:16]}")
+    if args.save:
+        actual.save(args.save)
+
+    if args.expected:
+        expected = fingerprint_file(args.expected, args.samples)
+        diff = diff_fingerprints(expected, actual, FingerprintTolerances(exact_topology=args.exact_topology))
+        print(diff.summary())
+        print(f"[Fingerprint] {'PASS' if diff.passed else 'FAIL'}")
+        sys.exit(0 if diff.passed else 1)
+
+
+if __name__ == "__main__":
+    main()
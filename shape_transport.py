@@ -0,0 +1,200 @@
+"""
+Shared-Memory Shape Transport Module
+
+Handles:
+1. Serializing shapes once to binary BRep in multiprocessing.shared_memory segments
+   and handing out small picklable ShapeHandles instead of the shapes themselves.
+2. Reference-counted ownership in the parent (ShapeStore): a segment is unlinked
+   when its last reference is released, and identical content shares one segment.
+3. Rebuilding shapes in worker processes (load_shape), cached per content hash so a
+   body already loaded in a worker is not rebuilt for the next task.
+4. Publishing worker results the same way (publish_shape) for the parent to adopt.
+
+Workers must be started by the process owning the store (any multiprocessing
+context): they then share its resource tracker, which unlinks leftover segments
+if the owner dies.
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional
+
+from OCC.Core.TopoDS import TopoDS_Shape
+
+from brep_io import shape_from_bytes, shape_to_bytes
+
+# Shapes kept rebuilt per worker process (most recently used last)
+MAX_WORKER_SHAPES = 4
+
+
+@dataclass(frozen=True)
+class ShapeHandle:
+    """Picklable reference to a serialized shape in a shared memory segment"""
+    name: str          # segment name
+    size: int          # payload bytes (segments may be rounded up to a page)
+    content_hash: str  # sha256 of the payload
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_segment(data: bytes) -> SharedMemory:
+    segment = SharedMemory(create=True, size=max(1, len(data)))
+    segment.buf[:len(data)] = data
+    return segment
+
+
+def _read_segment(handle: ShapeHandle) -> bytes:
+    segment = SharedMemory(name=handle.name)
+    try:
+        return bytes(segment.buf[:handle.size])
+    finally:
+        segment.close()
+
+
+class ShapeStore:
+    """
+    Parent-side owner of shared shape segments.
+
+        with ShapeStore() as store:
+            handle = store.put(body)
+            pool.submit(worker, handle, ...)
+
+    Every put/acquire/adopt must be balanced by a release; close() unlinks
+    whatever is left.
+    """
+
+    def __init__(self):
+        self._segments: Dict[str, SharedMemory] = {}  # content hash -> segment
+        self._handles: Dict[str, ShapeHandle] = {}
+        self._refcounts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def put(self, shape: TopoDS_Shape, with_triangles: bool = False) -> ShapeHandle:
+        return self.put_bytes(shape_to_bytes(shape, with_triangles))
+
+    def put_bytes(self, data: bytes) -> ShapeHandle:
+        digest = content_hash(data)
+        with self._lock:
+            if digest in self._handles:
+                self._refcounts[digest] += 1
+                return self._handles[digest]
+            segment = _write_segment(data)
+            handle = ShapeHandle(segment.name, len(data), digest)
+            self._register(handle, segment)
+            return handle
+
+    def adopt(self, handle: ShapeHandle) -> ShapeHandle:
+        """Takes ownership of a segment written by publish_shape in a worker"""
+        segment = SharedMemory(name=handle.name)
+        with self._lock:
+            if handle.content_hash in self._handles:
+                # Same content already stored: keep the existing segment
+                segment.close()
+                segment.unlink()
+                self._refcounts[handle.content_hash] += 1
+                return self._handles[handle.content_hash]
+            self._register(handle, segment)
+            return handle
+
+    def _register(self, handle: ShapeHandle, segment: SharedMemory) -> None:
+        self._segments[handle.content_hash] = segment
+        self._handles[handle.content_hash] = handle
+        self._refcounts[handle.content_hash] = 1
+
+    def acquire(self, handle: ShapeHandle) -> ShapeHandle:
+        with self._lock:
+            if handle.content_hash not in self._refcounts:
+                raise KeyError(f"Shape {handle.content_hash[:12]} is not in this store")
+            self._refcounts[handle.content_hash] += 1
+        return handle
+
+    def release(self, handle: ShapeHandle) -> None:
+        """Drops one reference; the segment is unlinked with the last one"""
+        with self._lock:
+            digest = handle.content_hash
+            if digest not in self._refcounts:
+                return
+            self._refcounts[digest] -= 1
+            if self._refcounts[digest] > 0:
+                return
+            del self._refcounts[digest], self._handles[digest]
+            segment = self._segments.pop(digest)
+        segment.close()
+        segment.unlink()
+
+    def get(self, handle: ShapeHandle) -> Optional[TopoDS_Shape]:
+        """Rebuilds a stored shape in the owning process"""
+        with self._lock:
+            segment = self._segments[handle.content_hash]
+            data = bytes(segment.buf[:handle.size])
+        return shape_from_bytes(data)
+
+    def refcount(self, handle: ShapeHandle) -> int:
+        return self._refcounts.get(handle.content_hash, 0)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(h.size for h in self._handles.values())
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def close(self) -> None:
+        with self._lock:
+            segments = list(self._segments.values())
+            self._segments.clear()
+            self._handles.clear()
+            self._refcounts.clear()
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+    def __enter__(self) -> "ShapeStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+# Worker-side state (per process)
+_worker_shapes: "OrderedDict[str, TopoDS_Shape]" = OrderedDict()
+# Windows frees a segment with its last open handle, so published segments stay
+# open in the worker until it exits.
+_published: List[SharedMemory] = []
+
+
+def load_shape(handle: ShapeHandle) -> Optional[TopoDS_Shape]:
+    """Rebuilds the shape behind a handle, reusing one already rebuilt in this process"""
+    shape = _worker_shapes.get(handle.content_hash)
+    if shape is not None:
+        _worker_shapes.move_to_end(handle.content_hash)
+        return shape
+    shape = shape_from_bytes(_read_segment(handle))
+    if shape is None:
+        return None
+    _worker_shapes[handle.content_hash] = shape
+    while len(_worker_shapes) > MAX_WORKER_SHAPES:
+        _worker_shapes.popitem(last=False)
+    return shape
+
+
+def publish_shape(shape: TopoDS_Shape, with_triangles: bool = False) -> ShapeHandle:
+    """Worker side: writes a result shape to a new segment; the parent must ShapeStore.adopt it"""
+    data = shape_to_bytes(shape, with_triangles)
+    segment = _write_segment(data)
+    handle = ShapeHandle(segment.name, len(data), content_hash(data))
+    if os.name == "nt":
+        _published.append(segment)
+    else:
+        segment.close()
+    return handle
+
+
+def clear_worker_cache() -> None:
+    _worker_shapes.clear()
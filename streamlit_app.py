@@ -7,12 +7,48 @@ import streamlit.components.v1 as components
 from datetime import datetime
 
 # Import core pipeline logic
-from gen_cad_pipeline import run_pipeline, GrooveType
+from gen_cad_pipeline import GrooveType
+from step_scanner import try_scan_step_file
+from cost_model import JobFeatures, RuntimeEstimator, record_run
+from result_cache import ResultCache, cached_run_pipeline
+from pipeline_runner import iter_pipeline
+from pipeline_progress import EVENT_LOG, EVENT_RESULT
+from preview_mesh import run_preview
+from execution_settings import ExecutionSettings, default_thread_count
 
 def get_step_files(directory):
     """Returns a list of .stp and .step files in the directory."""
     return [f for f in os.listdir(directory) if f.lower().endswith(('.stp', '.step'))]
 
+@st.cache_data(show_spinner=False)
+def scan_step_details(path, mtime):
+    """Pre-scans a STEP file (cached per path/modification time)."""
+    summary = try_scan_step_file(path)
+    if summary is None:
+        return None
+    is_valid, msg = summary.validate()
+    return {"valid": is_valid, "message": msg, "details": summary.to_dict()}
+
+def render_step_details(path):
+    """Shows header and topology counts of the selected STEP file in the sidebar."""
+    if not path or not os.path.exists(path):
+        return None
+    scan = scan_step_details(path, os.path.getmtime(path))
+    if scan is None:
+        st.sidebar.warning("Could not read file details.")
+        return None
+    details = scan["details"]
+    with st.sidebar.expander("📄 File Details", expanded=False):
+        st.write(f"**Products:** {', '.join(details['product_names']) or '-'}")
+        st.write(f"**Originating System:** {details['originating_system'] or '-'}")
+        st.write(f"**Schema:** {', '.join(details['schemas']) or '-'}")
+        st.write(f"**Date:** {details['timestamp'] or '-'}")
+        st.write(f"**Size:** {details['file_size'] / 1024:.1f} KB")
+        st.write(f"**Faces:** {details['faces']} | **B-Spline Surfaces:** {details['bspline_surfaces']} | **Shells:** {details['shells']}")
+    if not scan["valid"]:
+        st.sidebar.error(f"Unsupported file: {scan['message']}")
+    return scan
+
 def render_stl(stl_path):
     """Renders an STL file using a Three.js viewer in an iframe."""
     if not os.path.exists(stl_path):
@@ -123,9 +159,29 @@ def main():
     else:
         input_path = selected_file
 
+    input_scan = render_step_details(input_path)
+
     output_dir = st.sidebar.text_input("Output Directory", value=os.getcwd())
     output_filename = st.sidebar.text_input("Output Filename", value="Generated_Part.stp")
     output_path = os.path.join(output_dir, output_filename)
+    use_cache = st.sidebar.checkbox("Reuse cached results", value=True, help="Return stored outputs for identical file + parameters and reuse thickened bodies and projections.")
+    profile_run = st.sidebar.checkbox("Profile run", value=False, help="Attributes time to OCC calls and writes .profile.pstats / .profile.collapsed next to the output. Bypasses the cache.")
+
+    with st.sidebar.expander("🧵 Execution", expanded=False):
+        cores = default_thread_count()
+        if cores > 1:
+            threads = st.slider("OCC Threads", 1, cores, cores, help="Worker threads of the OCC thread pool.")
+        else:
+            # A slider needs min < max; a single core leaves nothing to choose.
+            threads = st.number_input("OCC Threads", min_value=1, max_value=1, value=1, disabled=True,
+                                      help="Only one core is available.")
+        execution = ExecutionSettings(
+            threads=threads,
+            parallel_booleans=st.checkbox("Parallel booleans", value=True),
+            parallel_mesh=st.checkbox("Parallel meshing", value=True),
+            parallel_distance=st.checkbox("Parallel distance queries", value=True),
+            parallel_check=st.checkbox("Parallel validity checks", value=True),
+        )
 
     # Main Panel: Parameters
     st.header("⚙️ Design Parameters")
@@ -150,37 +206,115 @@ def main():
         st.subheader("Clearances")
         assembly_clearance = st.number_input("Assembly Clearance (mm)", value=0.2, step=0.05, help="Reduction in clip width for fit. Default: 0.2")
         retention_offset = st.number_input("Retention Offset (mm)", value=0.1, step=0.05, help="Reduction in clip depth for retention. Default: 0.1")
+        
+        st.subheader("Pre-Processing")
+        simplify_input = st.checkbox("Merge same-domain faces before thickening", value=False, help="Reduces face/edge count of split CATIA patches.")
+        sliver_tolerance = st.number_input("Sliver Face Tolerance (mm)", value=0.0, min_value=0.0, step=0.01, help="Heal faces thinner than this. 0 disables.", disabled=not simplify_input)
+        region_thickening = st.checkbox("Thicken large surfaces in regions", value=False, help="Splits surfaces with many faces along smooth edges and offsets the regions in parallel processes (serially when OCC Threads is 1). Falls back to the whole-body offset.")
+        
+        st.subheader("Checks")
+        wall_check = st.selectbox("Wall Thickness Check", ["skip", "warn", "fail"], index=0, help="Placements where the groove would break through the wall: skip them, only warn, or stop the run.")
+
+    runtime_params = {
+        "thickness": thickness,
+        "groove_count": groove_count,
+        "groove_shape": GrooveType(groove_shape),
+        "groove_height": groove_height,
+        "groove_width": groove_width,
+        "groove_depth": groove_depth,
+        "clip_height": clip_height,
+        "assembly_clearance": assembly_clearance,
+        "retention_offset": retention_offset,
+        "simplify_input": simplify_input,
+        "sliver_tolerance": sliver_tolerance,
+        "region_thickening": region_thickening,
+        "wall_check": wall_check
+    }
 
     # Validation and Processing
-    if st.button("🚀 Generate Model", use_container_width=True):
-        if not input_path or input_path == "No files found":
-            st.error("Please select or upload a valid STEP file.")
-            return
-
-        runtime_params = {
-            "thickness": thickness,
-            "groove_count": groove_count,
-            "groove_shape": GrooveType(groove_shape),
-            "groove_height": groove_height,
-            "groove_width": groove_width,
-            "groove_depth": groove_depth,
-            "clip_height": clip_height,
-            "assembly_clearance": assembly_clearance,
-            "retention_offset": retention_offset
-        }
+    preview_col, generate_col = st.columns(2)
+    preview_clicked = preview_col.button("👁 Quick Preview", use_container_width=True, help="Places grooves/clips on the cached body mesh without booleans.")
+    generate_clicked = generate_col.button("🚀 Generate Model", use_container_width=True)
+    if (preview_clicked or generate_clicked) and (not input_path or input_path == "No files found"):
+        st.error("Please select or upload a valid STEP file.")
+        return
+    if (preview_clicked or generate_clicked) and input_scan is not None and not input_scan["valid"]:
+        st.error(f"Unsupported input file: {input_scan['message']}")
+        return
+
+    if preview_clicked:
+        preview_path = output_path.replace(".stp", "_preview.stl").replace(".step", "_preview.stl")
+        with st.spinner("Building approximate preview..."):
+            start_time = time.time()
+            preview_metrics = {}
+            success, message, preview = run_preview(input_path, runtime_params, preview_path,
+                                                    metrics=preview_metrics, execution=execution,
+                                                    use_cache=use_cache)
+        for check in preview_metrics.get("wall_check", {}).get("placements", []):
+            if check["status"] != "ok":
+                wall = f"{check['wall_thickness']:.2f} mm" if check["wall_thickness"] is not None else "n/a"
+                st.warning(f"Placement {check['index'] + 1}: {check['status']} (local wall {wall})")
+        if success:
+            st.success(f"✔️ Preview ready in {time.time() - start_time:.2f} seconds (approximate - grooves shown as tool volumes).")
+            st.subheader("🌐 3D Preview (Approximate)")
+            render_stl(preview_path)
+        else:
+            st.error(f"❌ Preview Failed: {message}")
+
+    if generate_clicked:
+
+        features = JobFeatures.from_path(input_path, runtime_params)
+        estimate = RuntimeEstimator.from_history().predict(features)
+        st.caption(f"Estimated runtime: {estimate:.1f} s")
         
+        progress_bar = st.progress(0.0, text="Starting...")
         log_container = st.empty()
-        status_container = st.empty()
+        st.button("⏹ Cancel Run", help="Stops the running job; partial metrics are kept.")
         
         with st.spinner("Processing CAD Geometry..."):
-            # Redirect stdout to capture logs (Simplified version for Streamlit)
             start_time = time.time()
             try:
-                success, message = run_pipeline(input_path, output_path, runtime_params)
+                # Runs in a worker process. Pressing Cancel (or leaving the page) reruns
+                # this script, which closes the generator and stops the worker.
+                def run_in_worker(input_path, output_path, runtime_params, input_hash=None):
+                    log_lines = []
+                    result = None
+                    fraction = 0.0
+                    events = iter_pipeline(input_path, output_path, runtime_params, execution=execution,
+                                           profile=profile_run, input_hash=input_hash, use_cache=use_cache)
+                    try:
+                        for event in events:
+                            if event.kind == EVENT_RESULT:
+                                result = event.data
+                                break
+                            if event.kind == EVENT_LOG:
+                                log_lines.append(f"[{event.phase}] {event.message}")
+                                log_container.code("\n".join(log_lines[-12:]))
+                            fraction = event.fraction
+                            progress_bar.progress(fraction, text=event.message or event.phase)
+                    finally:
+                        events.close()
+                    progress_bar.progress(1.0 if result["success"] else fraction, text=result["message"])
+                    return result["success"], result["message"], result["metrics"]
+
+                if use_cache and not profile_run:
+                    success, message, metrics = cached_run_pipeline(input_path, output_path, runtime_params,
+                                                                    cache=ResultCache(), run_fn=run_in_worker)
+                    cache_hit = metrics.get("cache_hit", False)
+                    pipeline_metrics = metrics.get("pipeline", {})
+                else:
+                    success, message, pipeline_metrics = run_in_worker(input_path, output_path, runtime_params)
+                    cache_hit = False
+                profile_data = pipeline_metrics.get("profile")
                 
                 duration = time.time() - start_time
+                if not cache_hit:
+                    record_run(features, duration, success)
                 if success:
-                    st.success(f"✔️ Model generated successfully in {duration:.2f} seconds!")
+                    if cache_hit:
+                        st.success(f"✔️ Reused cached result in {duration:.2f} seconds!")
+                    else:
+                        st.success(f"✔️ Model generated successfully in {duration:.2f} seconds!")
                     st.info(f"Saved to: {output_path}")
                     
                     # Provide download link if file exists
@@ -199,6 +333,12 @@ def main():
                         render_stl(stl_path)
                 else:
                     st.error(f"❌ Pipeline Failed: {message}")
+                
+                if profile_data:
+                    st.subheader("⏱ Profile")
+                    st.caption(f"OCC calls: {profile_data['occ_seconds']:.2f} s. Profile files: {profile_data['pstats']}, {profile_data['collapsed']}")
+                    st.table([{"Operation": group, "Seconds": round(seconds, 3)} for group, seconds in profile_data["groups"].items()])
+                    st.table([{"Call": c["call"], "Calls": c["calls"], "Self (s)": round(c["self_seconds"], 3)} for c in profile_data["top_calls"]])
             except Exception as e:
                 st.error(f"⚠️ Critical Error: {str(e)}")
 
@@ -0,0 +1,81 @@
+"""
+Surface Simplification Module
+
+Handles:
+1. Merging of same-domain (e.g. coplanar) faces and edges before thickening.
+2. Optional healing of tiny sliver faces.
+3. Before/after topology reporting.
+
+CATIA exports are often split into many small patches; fewer faces and edges make
+MakeThickSolidByJoin, the booleans and BRepCheck_Analyzer faster and more robust.
+"""
+
+from dataclasses import dataclass
+from typing import Tuple
+
+from OCC.Core.TopoDS import TopoDS_Shape
+from OCC.Core.BRepCheck import BRepCheck_Analyzer
+from OCC.Core.ShapeUpgrade import ShapeUpgrade_UnifySameDomain
+from OCC.Core.ShapeFix import ShapeFix_FixSmallFace, ShapeFix_Shape
+
+from shape_fingerprint import topology_counts
+
+
+@dataclass
+class SimplifyOptions:
+    """Settings of the pre-thickening simplification pass"""
+    unify_faces: bool = True
+    unify_edges: bool = True
+    concat_bsplines: bool = True
+    linear_tolerance: float = 1e-4  # mm
+    angular_tolerance: float = 1e-3  # rad
+    sliver_tolerance: float = 0.0  # mm, 0 disables sliver healing
+
+    def cache_variant(self) -> str:
+        """Stable identifier used in cache keys"""
+        return (f"simplify:f{int(self.unify_faces)}e{int(self.unify_edges)}b{int(self.concat_bsplines)}"
+                f":lt{self.linear_tolerance:g}:at{self.angular_tolerance:g}:st{self.sliver_tolerance:g}")
+
+
+def heal_slivers(shape: TopoDS_Shape, tolerance: float) -> TopoDS_Shape:
+    """Removes/merges faces thinner than `tolerance`, then fixes the result"""
+    fixer = ShapeFix_FixSmallFace()
+    fixer.Init(shape)
+    fixer.SetPrecision(tolerance)
+    fixer.SetMaxTolerance(tolerance)
+    fixer.Perform()
+    healed = fixer.FixShape()
+
+    shape_fix = ShapeFix_Shape(healed)
+    shape_fix.SetPrecision(tolerance)
+    shape_fix.Perform()
+    return shape_fix.Shape()
+
+
+def simplify_surface(shape: TopoDS_Shape, options: SimplifyOptions = None) -> Tuple[TopoDS_Shape, dict]:
+    """
+    Runs the simplification pass. Returns (shape, report).
+    If the simplified shape is invalid the original shape is returned and
+    report["applied"] is False.
+    """
+    options = options or SimplifyOptions()
+    before = topology_counts(shape)
+    report = {"before": before, "after": before, "applied": False}
+
+    unifier = ShapeUpgrade_UnifySameDomain(shape, options.unify_edges, options.unify_faces,
+                                           options.concat_bsplines)
+    unifier.SetLinearTolerance(options.linear_tolerance)
+    unifier.SetAngularTolerance(options.angular_tolerance)
+    unifier.Build()
+    result = unifier.Shape()
+
+    if options.sliver_tolerance > 0:
+        result = heal_slivers(result, options.sliver_tolerance)
+
+    if result.IsNull() or not BRepCheck_Analyzer(result).IsValid():
+        report["reason"] = "Simplified shape is invalid"
+        return shape, report
+
+    report["after"] = topology_counts(result)
+    report["applied"] = True
+    return result, report
@@ -0,0 +1,241 @@
+"""
+Synthetic Test-Part Module
+
+Handles:
+1. Parametric open surfaces from OCC primitives (plane, cylinder, sphere) and
+   B-spline wave patches, with controllable size and curvature.
+2. Splitting the surface into a grid of 10 to 10,000 faces, sewn into one shell.
+3. Writing the part as STEP plus a matching placement set (<stem>.placements.json)
+   for the Phase 4 loop.
+
+The placement file holds {"groove_count", "locations"}; pass it to the pipeline with
+--placements so grooves land on the synthetic surface instead of REFERENCE_CENTROIDS.
+
+Command line:
+    python synthetic_parts.py --kind bspline --faces 10 100 1000 10000 --curvature 0.02
+"""
+
+import os
+import json
+import math
+import time
+import random
+import argparse
+from dataclasses import dataclass, asdict
+from typing import List, Tuple
+
+from OCC.Core.gp import gp_Ax3, gp_Dir, gp_Pnt, gp_Vec
+from OCC.Core.Geom import Geom_CylindricalSurface, Geom_Plane, Geom_SphericalSurface
+from OCC.Core.GeomAPI import GeomAPI_PointsToBSplineSurface
+from OCC.Core.GeomAbs import GeomAbs_C2
+from OCC.Core.TColgp import TColgp_Array2OfPnt
+from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_MakeFace, BRepBuilderAPI_Sewing
+from OCC.Core.STEPControl import STEPControl_Writer, STEPControl_AsIs
+from OCC.Core.IFSelect import IFSelect_RetDone
+from OCC.Core.TopoDS import TopoDS_Shape
+
+from shape_fingerprint import topology_counts
+
+KIND_PLANE = "plane"
+KIND_CYLINDER = "cylinder"
+KIND_SPHERE = "sphere"
+KIND_BSPLINE = "bspline"
+PART_KINDS = (KIND_PLANE, KIND_CYLINDER, KIND_SPHERE, KIND_BSPLINE)
+
+MIN_FACES = 10
+MAX_FACES = 10000
+
+SEW_TOLERANCE = 1e-4
+PLACEMENTS_SUFFIX = ".placements.json"
+
+# Fraction of the parameter range kept free of placements on every side
+PLACEMENT_MARGIN = 0.15
+
+
+@dataclass
+class SyntheticPartSpec:
+    """Shape, size and resolution of one synthetic part"""
+    kind: str = KIND_BSPLINE
+    faces: int = 100           # target face count (the grid may round up slightly)
+    size: float = 200.0        # mm, edge length of the patch (arc length on curved kinds)
+    curvature: float = 0.01    # 1/mm, peak principal curvature (0 = flat)
+    waves: int = 2             # B-spline only: wave periods along each direction
+    placements: int = 5
+    seed: int = 1234
+
+    def validate(self) -> Tuple[bool, str]:
+        if self.kind not in PART_KINDS:
+            return False, f"Unknown kind '{self.kind}' (expected one of {', '.join(PART_KINDS)})"
+        if not MIN_FACES <= self.faces <= MAX_FACES:
+            return False, f"Face count must be between {MIN_FACES} and {MAX_FACES}"
+        if self.size <= 0:
+            return False, "Size must be positive"
+        if self.curvature < 0:
+            return False, "Curvature must not be negative"
+        if self.kind in (KIND_CYLINDER, KIND_SPHERE) and self.curvature == 0:
+            return False, f"A {self.kind} needs a positive curvature (use kind '{KIND_PLANE}' for flat parts)"
+        if self.waves < 1:
+            return False, "At least one wave is required"
+        if self.placements < 1:
+            return False, "At least one placement is required"
+        return True, "Valid"
+
+    @property
+    def stem(self) -> str:
+        return f"synthetic_{self.kind}_{self.faces}f_c{self.curvature:g}_s{self.size:g}"
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def grid_dimensions(faces: int) -> Tuple[int, int]:
+    """Near-square (nu, nv) grid with nu * nv >= faces"""
+    nu = max(1, int(math.ceil(math.sqrt(faces))))
+    nv = max(1, int(math.ceil(faces / nu)))
+    return nu, nv
+
+
+def _bspline_wave_surface(spec: SyntheticPartSpec):
+    """
+    z = A sin(kx) sin(ky) over size x size, approximated by a C2 B-spline.
+    A = curvature / k^2 gives the requested peak curvature.
+    """
+    k = 2.0 * math.pi * spec.waves / spec.size
+    amplitude = spec.curvature / (k * k)
+    samples = 8 * spec.waves + 1
+    points = TColgp_Array2OfPnt(1, samples, 1, samples)
+    for i in range(samples):
+        x = spec.size * i / (samples - 1)
+        for j in range(samples):
+            y = spec.size * j / (samples - 1)
+            points.SetValue(i + 1, j + 1, gp_Pnt(x, y, amplitude * math.sin(k * x) * math.sin(k * y)))
+    surface = GeomAPI_PointsToBSplineSurface(points, 3, 8, GeomAbs_C2, 1e-3).Surface()
+    return surface, surface.Bounds()
+
+
+def make_surface(spec: SyntheticPartSpec):
+    """Returns (Geom surface, (u0, u1, v0, v1)) of the whole patch"""
+    axis = gp_Ax3(gp_Pnt(0, 0, 0), gp_Dir(0, 0, 1))
+    if spec.kind == KIND_PLANE:
+        return Geom_Plane(axis), (0.0, spec.size, 0.0, spec.size)
+    if spec.kind == KIND_BSPLINE:
+        return _bspline_wave_surface(spec)
+    radius = 1.0 / spec.curvature
+    # Angular spans are capped so the patch stays an open, non-degenerate surface.
+    span = min(spec.size / radius, 1.5 * math.pi)
+    if spec.kind == KIND_CYLINDER:
+        return Geom_CylindricalSurface(axis, radius), (0.0, span, 0.0, spec.size)
+    half_lat = min(spec.size / (2.0 * radius), 1.2)
+    return Geom_SphericalSurface(axis, radius), (0.0, span, -half_lat, half_lat)
+
+
+def build_part(spec: SyntheticPartSpec):
+    """
+    Splits the surface into a grid of faces and sews them into one shell.
+    Returns (shape, surface, bounds, (nu, nv)).
+    """
+    surface, (u0, u1, v0, v1) = make_surface(spec)
+    nu, nv = grid_dimensions(spec.faces)
+    sewing = BRepBuilderAPI_Sewing(SEW_TOLERANCE)
+    for i in range(nu):
+        ua, ub = u0 + (u1 - u0) * i / nu, u0 + (u1 - u0) * (i + 1) / nu
+        for j in range(nv):
+            va, vb = v0 + (v1 - v0) * j / nv, v0 + (v1 - v0) * (j + 1) / nv
+            sewing.Add(BRepBuilderAPI_MakeFace(surface, ua, ub, va, vb, 1e-6).Face())
+    sewing.Perform()
+    return sewing.SewedShape(), surface, (u0, u1, v0, v1), (nu, nv)
+
+
+def placement_locations(surface, bounds: Tuple[float, float, float, float], grid: Tuple[int, int],
+                        count: int, seed: int) -> List[Tuple[float, float, float]]:
+    """
+    Points on the surface at the centres of randomly chosen grid cells, away from
+    the patch border and from face edges (so each projects onto a single face).
+    """
+    u0, u1, v0, v1 = bounds
+    nu, nv = grid
+    cells = [(i, j) for i in range(nu) for j in range(nv)
+             if PLACEMENT_MARGIN <= (i + 0.5) / nu <= 1.0 - PLACEMENT_MARGIN
+             and PLACEMENT_MARGIN <= (j + 0.5) / nv <= 1.0 - PLACEMENT_MARGIN]
+    if not cells:
+        cells = [(nu // 2, nv // 2)]
+    rng = random.Random(seed)
+    chosen = rng.sample(cells, min(count, len(cells)))
+    while len(chosen) < count:
+        chosen.append(rng.choice(cells))
+
+    locations = []
+    for i, j in chosen:
+        u = u0 + (u1 - u0) * (i + 0.5) / nu
+        v = v0 + (v1 - v0) * (j + 0.5) / nv
+        p, du, dv = gp_Pnt(), gp_Vec(), gp_Vec()
+        surface.D1(u, v, p, du, dv)
+        locations.append((round(p.X(), 4), round(p.Y(), 4), round(p.Z(), 4)))
+    return locations
+
+
+def write_step(shape: TopoDS_Shape, path: str) -> bool:
+    writer = STEPControl_Writer()
+    writer.Transfer(shape, STEPControl_AsIs)
+    return writer.Write(path) == IFSelect_RetDone
+
+
+def generate_part(spec: SyntheticPartSpec, out_dir: str = ".") -> dict:
+    """Builds one part, writes <stem>.stp and <stem>.placements.json. Returns a report."""
+    is_valid, msg = spec.validate()
+    if not is_valid:
+        raise ValueError(msg)
+    start_time = time.perf_counter()
+    shape, surface, bounds, grid = build_part(spec)
+    build_seconds = time.perf_counter() - start_time
+    locations = placement_locations(surface, bounds, grid, spec.placements, spec.seed)
+
+    os.makedirs(out_dir, exist_ok=True)
+    step_path = os.path.join(out_dir, f"{spec.stem}.stp")
+    placements_path = os.path.join(out_dir, f"{spec.stem}{PLACEMENTS_SUFFIX}")
+    if not write_step(shape, step_path):
+        raise RuntimeError(f"Could not write {step_path}")
+    with open(placements_path, "w", encoding="utf-8") as f:
+        json.dump({"groove_count": len(locations), "locations": locations, "spec": spec.to_dict()}, f, indent=2)
+
+    return {
+        "step": step_path,
+        "placements": placements_path,
+        "grid": list(grid),
+        "topology": topology_counts(shape),
+        "build_seconds": build_seconds,
+    }
+
+
+def load_placements(path: str) -> dict:
+    """Reads a placement file into runtime_params overrides (groove_count, locations)"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    locations = [tuple(float(c) for c in loc) for loc in data["locations"]]
+    return {"groove_count": int(data.get("groove_count", len(locations))), "locations": locations}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gen-CAD Synthetic Test-Part Generator")
+    parser.add_argument("--kind", choices=PART_KINDS, default=KIND_BSPLINE)
+    parser.add_argument("--faces", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="Face counts to generate (one part each)")
+    parser.add_argument("--size", type=float, default=200.0, help="Patch edge length (mm)")
+    parser.add_argument("--curvature", type=float, default=0.01, help="Peak curvature (1/mm)")
+    parser.add_argument("--waves", type=int, default=2, help="Wave periods per direction (bspline)")
+    parser.add_argument("--placements", type=int, default=5, help="Placements per part")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--out-dir", default="synthetic_parts")
+    args = parser.parse_args()
+
+    for faces in args.faces:
+        spec = SyntheticPartSpec(kind=args.kind, faces=faces, size=args.size, curvature=args.curvature,
+                                 waves=args.waves, placements=args.placements, seed=args.seed)
+        report = generate_part(spec, args.out_dir)
+        print(f"[Synthetic] {report['step']}: {report['topology']['faces']} faces "
+              f"({report['grid'][0]}x{report['grid'][1]} grid) in {report['build_seconds']:.2f}s, "
+              f"placements in {report['placements']}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
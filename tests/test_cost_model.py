@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from cost_model import JobFeatures, RunRecord, RuntimeEstimator, load_run_records, record_run
+from groove_parameters import GrooveType
+
+
+def features(faces, groove_count, shape="rectangular", bsplines=0, thickness=2.5):
+    return JobFeatures(faces=faces, bspline_surfaces=bsplines, groove_count=groove_count,
+                       groove_shape=shape, thickness=thickness)
+
+
+def linear_runs(count=40, seed=3):
+    """Runs whose duration is an exact linear function of the features"""
+    rng = np.random.default_rng(seed)
+    shapes = [t.value for t in GrooveType]
+    records = []
+    for _ in range(count):
+        f = features(int(rng.integers(50, 2000)), int(rng.integers(1, 8)), shapes[rng.integers(0, 4)],
+                     int(rng.integers(0, 300)), float(rng.uniform(1.0, 4.0)))
+        duration = (1.0 + 0.01 * f.faces + 0.05 * f.bspline_surfaces + 0.8 * f.groove_count
+                    + (3.0 if f.groove_shape == "circular" else 0.0))
+        records.append(RunRecord(f, duration, True))
+    return records
+
+
+def test_design_matrix_is_full_rank():
+    X = np.vstack([r.features.vector() for r in linear_runs()])
+    assert np.linalg.matrix_rank(X) == X.shape[1]
+
+
+def test_fitted_model_beats_heuristic_and_predicts():
+    records = linear_runs()
+    estimator = RuntimeEstimator(ridge=1e-3).fit(records)
+    assert estimator.is_trained
+    assert estimator.loo_error < estimator.heuristic_error
+    for record in records[:5]:
+        assert estimator.predict(record.features) == pytest.approx(record.duration, rel=1e-2)
+
+
+def test_heuristic_kept_when_model_does_not_generalize():
+    rng = np.random.default_rng(5)
+    records = linear_runs(count=12)
+    # Durations unrelated to the features: the model cannot beat the heuristic out of sample
+    for record in records:
+        record.duration = RuntimeEstimator()._heuristic(record.features) * float(rng.uniform(0.95, 1.05))
+    estimator = RuntimeEstimator().fit(records)
+    assert not estimator.is_trained
+    assert estimator.loo_error is not None
+    assert estimator.predict(records[0].features) == pytest.approx(RuntimeEstimator()._heuristic(records[0].features))
+
+
+def test_too_few_or_failed_runs_use_the_heuristic():
+    records = linear_runs(count=4) + [RunRecord(features(100, 3), 50.0, False) for _ in range(20)]
+    estimator = RuntimeEstimator().fit(records)
+    assert estimator.sample_count == 4
+    assert not estimator.is_trained
+    assert estimator.loo_error is None
+
+
+def test_history_round_trip(tmp_path):
+    path = str(tmp_path / "history.jsonl")
+    record_run(features(120, 2, "triangle"), 4.5, True, path)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("not json\n")
+    records = load_run_records(path)
+    assert len(records) == 1
+    assert records[0].features.groove_shape == "triangle"
+    assert records[0].duration == 4.5
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from design_screening import (RULE_NAMES, V_BREAKTHROUGH, V_CLIP_WIDTH, W_CLIP_LONGER, expand_grid,
+                              screen_designs)
+from groove_parameters import GrooveParameters, GrooveType
+from volume_check import SHAPES, expected_cut_volume, groove_tool_volume
+
+
+def test_expand_grid_is_the_cartesian_product():
+    columns = expand_grid({"groove_width": [2, 3, 4], "groove_depth": [1.0, 1.5],
+                           "groove_shape": ["rectangular", "triangle"]})
+    assert all(len(column) == 12 for column in columns.values())
+    assert set(columns["groove_width"]) == {2.0, 3.0, 4.0}
+    assert len(np.unique(columns["groove_shape"])) == 2
+
+
+def test_volumes_match_the_per_tool_formulas():
+    columns = expand_grid({"groove_width": [2.0, 5.0], "groove_depth": [0.5, 1.2],
+                           "groove_shape": [shape.value for shape in GrooveType]})
+    result = screen_designs(columns)
+    for i in range(result.size):
+        length = columns["groove_height"][i]
+        p = GrooveParameters(width=columns["groove_width"][i], depth=columns["groove_depth"][i],
+                             height=length, length=length, type=SHAPES[columns["groove_shape"][i]])
+        assert result.groove_volume[i] == pytest.approx(groove_tool_volume(p))
+        assert result.cut_volume[i] == pytest.approx(expected_cut_volume(p))
+
+
+def test_rules_flag_infeasible_rows():
+    columns = expand_grid({"groove_width": [0.1, 5.0], "groove_depth": [1.0, 3.0], "thickness": [2.65],
+                           "assembly_clearance": [0.2], "groove_height": [10.0], "clip_height": [20.0],
+                           "groove_shape": ["rectangular"]})
+    result = screen_designs(columns)
+    width, depth = columns["groove_width"], columns["groove_depth"]
+    assert np.array_equal((result.flags & V_CLIP_WIDTH) != 0, width <= 0.2)
+    assert np.array_equal((result.flags & V_BREAKTHROUGH) != 0, depth >= 2.65)
+    # A clip longer than its groove is a warning only
+    assert np.all(result.flags & W_CLIP_LONGER)
+    assert np.array_equal(result.feasible, (width > 0.2) & (depth < 2.65))
+    assert set(result.rule_counts()) == set(RULE_NAMES.values())
+
+
+def test_feasible_params_round_trip():
+    columns = expand_grid({"groove_depth": [0.5, 1.0, 1.5], "thickness": [2.65]})
+    result = screen_designs(columns)
+    rows = result.feasible_params(order_by="floor_margin", limit=2)
+    assert [row["groove_depth"] for row in rows] == [0.5, 1.0]
+    assert isinstance(rows[0]["groove_shape"], GrooveType)
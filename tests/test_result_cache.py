@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from groove_parameters import GrooveType
+from input_hash import file_content_hash, payload_hash
+from result_cache import METRICS_NAME, ResultCache, make_cache_key, stl_path_for
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def test_content_hash_ignores_path_and_payload_order(tmp_path):
+    a = write(tmp_path / "a.stp", b"ISO-10303-21;" * 1000)
+    b = write(tmp_path / "b.stp", b"ISO-10303-21;" * 1000)
+    assert file_content_hash(a) == file_content_hash(b)
+    assert file_content_hash(a, chunk_size=7) == file_content_hash(a)
+    assert payload_hash({"x": 1, "y": [1, 2]}) == payload_hash({"y": [1, 2], "x": 1})
+
+
+def test_key_normalizes_runtime_params():
+    base = make_cache_key("abc", {"groove_shape": GrooveType.TRIANGLE, "thickness": 3})
+    # Shape by value, numbers coerced, defaults filled in
+    assert make_cache_key("abc", {"groove_shape": " Triangle", "thickness": "3.0"}) == base
+    assert make_cache_key("abc", {"groove_shape": "triangle", "thickness": 3.0, "groove_count": 5,
+                                  "wall_check": "skip", "unknown_key": 1}) == base
+    # Alias of the fail policy
+    assert (make_cache_key("abc", {"wall_check": "abort"}) == make_cache_key("abc", {"wall_check": "fail"}))
+
+
+def test_key_changes_with_input_params_and_settings():
+    base = make_cache_key("abc", {}, {"deflection": 0.1})
+    assert make_cache_key("abd", {}, {"deflection": 0.1}) != base
+    assert make_cache_key("abc", {"groove_depth": 2.4}, {"deflection": 0.1}) != base
+    assert make_cache_key("abc", {"wall_check": "warn"}, {"deflection": 0.1}) != base
+    assert make_cache_key("abc", {"simplify_input": True}, {"deflection": 0.1}) != base
+    assert make_cache_key("abc", {}, {"deflection": 0.2}) != base
+    assert make_cache_key("abc", {}, {"volume_tolerance": {"relative": 0.25}}) != make_cache_key("abc", {})
+
+
+def test_store_and_lookup_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    output = write(tmp_path / "part.stp", b"step")
+    write(stl_path_for(output), b"stl")
+    assert cache.store("k1", output, {"duration": 1.5})
+
+    restored = str(tmp_path / "out" / "copy.stp")
+    metrics = cache.lookup("k1", restored)
+    assert metrics == {"duration": 1.5}
+    assert open(restored, "rb").read() == b"step"
+    assert open(stl_path_for(restored), "rb").read() == b"stl"
+    assert cache.lookup("missing", restored) is None
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=10 ** 9)
+    output = write(tmp_path / "part.stp", b"x" * 1000)
+    for age, key in ((300, "old"), (200, "middle"), (100, "new")):
+        cache.store(key, output, {})
+        metrics_path = os.path.join(cache.cache_dir, key, METRICS_NAME)
+        os.utime(metrics_path, (1e9 - age, 1e9 - age))
+
+    # A hit refreshes the entry, so "middle" becomes the least recently used
+    assert cache.lookup("old", str(tmp_path / "restored.stp")) is not None
+    entry_size = cache.total_size() // 3
+    cache.max_bytes = 2 * entry_size + entry_size // 2
+    assert cache.evict() == pytest.approx(entry_size, abs=entry_size // 10)
+    assert sorted(os.listdir(cache.cache_dir)) == ["new", "old"]
@@ -0,0 +1,111 @@
+import math
+
+import numpy as np
+import pytest
+
+from shape_fingerprint import (DEFAULT_SAMPLE_COUNT, MAX_SAMPLE_COUNT, FingerprintTolerances, ShapeFingerprint,
+                               cloud_checks, cloud_sample_count, diff_fingerprints, nearest_distances,
+                               sample_surface_points)
+
+
+def plane(sx, sy):
+    vertices = np.array([(0, 0, 0), (sx, 0, 0), (sx, sy, 0), (0, sy, 0)], dtype=float)
+    return vertices, np.array([[0, 1, 2], [0, 2, 3]])
+
+
+def fingerprint(points, area=100.0, **overrides):
+    values = dict(volume=1000.0, area=area, centroid=[5.0, 5.0, 5.0], principal_inertia=[1.0, 2.0, 3.0],
+                  bbox=[0.0, 0.0, 0.0, 10.0, 10.0, 10.0],
+                  topology={"solids": 1, "shells": 1, "faces": 20, "edges": 40, "vertices": 22}, points=points)
+    values.update(overrides)
+    return ShapeFingerprint(**values)
+
+
+def checks_by_name(diff):
+    return {c.name: c for c in diff.checks}
+
+
+def test_sampling_is_on_the_surface_and_deterministic():
+    vertices, triangles = plane(10.0, 5.0)
+    points = sample_surface_points(vertices, triangles, 500)
+    assert points.shape == (500, 3)
+    assert np.all(points[:, 2] == 0.0)
+    assert points[:, 0].min() >= 0.0 and points[:, 0].max() <= 10.0
+    assert points[:, 1].min() >= 0.0 and points[:, 1].max() <= 5.0
+    assert np.array_equal(points, sample_surface_points(vertices, triangles, 500))
+    # Area weighting: the left half of the plane gets about half of the samples
+    assert abs(np.mean(points[:, 0] < 5.0) - 0.5) < 0.1
+
+
+def test_nearest_distances_match_brute_force():
+    rng = np.random.default_rng(0)
+    source, target = rng.random((300, 3)), rng.random((200, 3))
+    expected = np.linalg.norm(source[:, None, :] - target[None, :, :], axis=2).min(axis=1)
+    assert np.allclose(nearest_distances(source, target, chunk=7), expected)
+    assert len(nearest_distances(source, target[:0])) == 0
+
+
+def test_cloud_is_sized_by_spacing():
+    assert cloud_sample_count(10.0) == DEFAULT_SAMPLE_COUNT
+    assert cloud_sample_count(5000.0) == 5000
+    assert cloud_sample_count(5000.0, spacing=0.5) == MAX_SAMPLE_COUNT
+
+
+def test_identical_fingerprints_pass():
+    vertices, triangles = plane(10.0, 10.0)
+    points = sample_surface_points(vertices, triangles, DEFAULT_SAMPLE_COUNT)
+    diff = diff_fingerprints(fingerprint(points), fingerprint(points.copy()))
+    assert diff.passed
+    assert checks_by_name(diff)["cloud.max"].actual == 0.0
+
+
+def test_resampled_surface_passes_and_shifted_surface_fails():
+    vertices, triangles = plane(100.0, 50.0)
+    count = cloud_sample_count(5000.0)
+    a = sample_surface_points(vertices, triangles, count, seed=1)
+    b = sample_surface_points(vertices, triangles, count, seed=2)
+    assert all(c.passed for c in cloud_checks(a, b, 5000.0, FingerprintTolerances()))
+
+    shifted = {c.name: c for c in cloud_checks(a, b + np.float32([0.0, 0.0, 1.0]), 5000.0, FingerprintTolerances())}
+    assert not shifted["cloud.mean"].passed
+
+
+def test_coarse_cloud_fails_spacing_check():
+    vertices, triangles = plane(400.0, 300.0)
+    points = sample_surface_points(vertices, triangles, DEFAULT_SAMPLE_COUNT)
+    checks = {c.name: c for c in cloud_checks(points, points, 120000.0, FingerprintTolerances())}
+    assert checks["cloud.spacing"].actual == pytest.approx(math.sqrt(120000.0 / DEFAULT_SAMPLE_COUNT))
+    assert not checks["cloud.spacing"].passed
+    assert checks["cloud.mean"].passed  # identical points, only the resolution is insufficient
+
+
+def test_tolerance_boundaries():
+    empty = np.zeros((0, 3), dtype=np.float32)
+    tol = FingerprintTolerances(rel_volume=1e-3, abs_centroid=0.05)
+    base = fingerprint(empty)
+
+    at_limit = checks_by_name(diff_fingerprints(base, fingerprint(empty, volume=1000.0 * (1 + 1e-3) - 1e-9), tol))
+    assert at_limit["volume"].passed
+    over = checks_by_name(diff_fingerprints(base, fingerprint(empty, volume=1000.0 * (1 + 1e-3) + 1e-6), tol))
+    assert not over["volume"].passed
+
+    moved = checks_by_name(diff_fingerprints(base, fingerprint(empty, centroid=[5.04, 5.0, 4.9]), tol))
+    assert moved["centroid.x"].passed and not moved["centroid.z"].passed
+
+    # 5% of 20 faces is one face; exact topology allows none
+    topology = {"solids": 1, "shells": 1, "faces": 21, "edges": 40, "vertices": 22}
+    assert checks_by_name(diff_fingerprints(base, fingerprint(empty, topology=topology)))["topology.faces"].passed
+    exact = diff_fingerprints(base, fingerprint(empty, topology=topology), FingerprintTolerances(exact_topology=True))
+    assert not checks_by_name(exact)["topology.faces"].passed
+
+
+def test_digest_and_round_trip(tmp_path):
+    vertices, triangles = plane(10.0, 10.0)
+    original = fingerprint(sample_surface_points(vertices, triangles, 64))
+    path = str(tmp_path / "golden.json")
+    original.save(path)
+    loaded = ShapeFingerprint.load(path)
+    assert loaded.digest() == original.digest()
+    assert np.array_equal(loaded.points, original.points)
+    assert fingerprint(original.points, volume=1000.0004).digest() == original.digest()
+    assert fingerprint(original.points, volume=1000.01).digest() != original.digest()
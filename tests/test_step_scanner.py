@@ -0,0 +1,67 @@
+from step_scanner import scan_step_file, try_scan_step_file
+
+STEP_TEXT = """ISO-10303-21;
+HEADER;
+FILE_DESCRIPTION(('Door panel','rev ''B'''),'2;1');
+FILE_NAME('panel.stp','2024-05-01T10:00:00',('author'),('org'),'ST-DEVELOPER v19',
+  'CATIA V5 \\X2\\00E9\\X0\\',' ');
+FILE_SCHEMA(('AUTOMOTIVE_DESIGN { 1 0 10303 214 1 1 1 1 }'));
+ENDSEC;
+DATA;
+#1 = PRODUCT('Panel ''A''','Panel','',(#2));
+#10 = ADVANCED_FACE('',(#11),#12,.T.);
+#11 = ADVANCED_FACE('a;b(',(#11),#12,.T.);
+#12 = B_SPLINE_SURFACE_WITH_KNOTS('',3,3,((#1)),.UNSPECIFIED.,.F.,.F.,.F.,(4),(4),(0.),(1.),.UNSPECIFIED.);
+#13 = ( BOUNDED_SURFACE() B_SPLINE_SURFACE(3,3,((#1)),.UNSPECIFIED.,.F.,.F.,.F.)
+  B_SPLINE_SURFACE_WITH_KNOTS((4),(4),(0.),(1.),.UNSPECIFIED.) RATIONAL_B_SPLINE_SURFACE(((1.)))
+  GEOMETRIC_REPRESENTATION_ITEM() REPRESENTATION_ITEM('') SURFACE() );
+#14 = OPEN_SHELL('',(#10,#11));
+ENDSEC;
+END-ISO-10303-21;
+"""
+
+
+def write(tmp_path, text, name="part.stp"):
+    path = tmp_path / name
+    path.write_bytes(text.encode("latin-1"))
+    return str(path)
+
+
+def test_header_metadata(tmp_path):
+    summary = scan_step_file(write(tmp_path, STEP_TEXT))
+    assert summary.is_step
+    assert summary.description == ["Door panel", "rev 'B'"]
+    assert summary.file_name == "panel.stp"
+    assert summary.timestamp == "2024-05-01T10:00:00"
+    assert summary.preprocessor_version == "ST-DEVELOPER v19"
+    assert summary.originating_system == "CATIA V5 é"
+    assert summary.schemas == ["AUTOMOTIVE_DESIGN { 1 0 10303 214 1 1 1 1 }"]
+    assert summary.product_names == ["Panel 'A'"]
+
+
+def test_entity_and_category_counts(tmp_path):
+    summary = scan_step_file(write(tmp_path, STEP_TEXT))
+    assert summary.face_count == 2
+    assert summary.shell_count == 1
+    # One simple B-spline surface plus one complex instance counted once
+    assert summary.bspline_surface_count == 2
+    assert summary.entity_counts["B_SPLINE_SURFACE_WITH_KNOTS"] == 2
+    assert summary.entity_counts["RATIONAL_B_SPLINE_SURFACE"] == 1
+    assert summary.validate() == (True, "Valid")
+
+
+def test_rejects_non_step_and_faceless_files(tmp_path):
+    not_step = scan_step_file(write(tmp_path, "solid ascii stl\n", "part.stl"))
+    assert not not_step.is_step
+    assert not not_step.validate()[0]
+
+    faceless = STEP_TEXT.replace("ADVANCED_FACE", "EDGE_CURVE")
+    ok, message = scan_step_file(write(tmp_path, faceless)).validate()
+    assert not ok and "no faces" in message
+
+    empty = scan_step_file(write(tmp_path, "", "empty.stp"))
+    assert empty.file_size == 0 and not empty.is_step
+
+
+def test_missing_file(tmp_path):
+    assert try_scan_step_file(str(tmp_path / "missing.stp")) is None
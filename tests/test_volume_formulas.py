@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+import pytest
+
+from groove_parameters import GrooveParameters, GrooveType
+from volume_check import (VolumeDeltaCheck, VolumeTolerance, expected_cut_volume, groove_tool_volume,
+                          profile_volume_between, profile_volumes_between, shape_code)
+
+
+def params(shape, width=4.0, depth=1.5, length=10.0):
+    return GrooveParameters(width=width, depth=depth, height=length, length=length, type=shape)
+
+
+def test_full_tool_volumes_match_closed_forms():
+    assert groove_tool_volume(params(GrooveType.RECTANGULAR)) == pytest.approx(4.0 * 10.0 * 1.5)
+    assert groove_tool_volume(params(GrooveType.SQUARE)) == pytest.approx(4.0 * 4.0 * 1.5)
+    assert groove_tool_volume(params(GrooveType.CIRCULAR)) == pytest.approx(math.pi * 2.0 ** 2 * 1.5)
+    # Equilateral prism: depth plays no part in the profile
+    assert groove_tool_volume(params(GrooveType.TRIANGLE)) == pytest.approx(10.0 * math.sqrt(3) / 4.0 * 16.0)
+
+
+def test_triangle_slices_add_up_to_the_prism():
+    p = params(GrooveType.TRIANGLE, width=4.0)
+    apex = 4.0 * math.sqrt(3) / 2.0
+    lower = profile_volume_between(p, 0.0, 10.0, -math.inf, apex / 2.0)
+    upper = profile_volume_between(p, 0.0, 10.0, apex / 2.0, math.inf)
+    # The lower half of the height holds 3/4 of the area
+    assert lower == pytest.approx(0.75 * groove_tool_volume(p))
+    assert lower + upper == pytest.approx(groove_tool_volume(p))
+    assert profile_volume_between(p, 0.0, 10.0, apex, math.inf) == 0.0
+
+
+def test_scalar_and_batch_agree():
+    rng = np.random.default_rng(7)
+    count = 200
+    shapes = rng.integers(0, len(GrooveType), count)
+    width = rng.uniform(0.5, 8.0, count)
+    depth = rng.uniform(0.2, 4.0, count)
+    length = rng.uniform(1.0, 30.0, count)
+    base_z = -depth
+    z_lo = rng.uniform(-5.0, 0.0, count)
+    z_hi = z_lo + rng.uniform(0.0, 6.0, count)
+
+    batch = profile_volumes_between(shapes, width, depth, length, base_z, z_lo, z_hi)
+    for i in range(count):
+        p = params(list(GrooveType)[shapes[i]], width[i], depth[i], length[i])
+        assert profile_volume_between(p, base_z[i], length[i], z_lo[i], z_hi[i]) == pytest.approx(batch[i])
+
+
+def test_expected_cut_is_the_part_below_the_surface():
+    for shape in GrooveType:
+        p = params(shape)
+        cut = expected_cut_volume(p)
+        assert 0.0 < cut <= groove_tool_volume(p) + 1e-9
+    # Box-like tools lie entirely below the surface
+    assert expected_cut_volume(params(GrooveType.SQUARE)) == pytest.approx(groove_tool_volume(params(GrooveType.SQUARE)))
+
+
+def test_shape_code_accepts_values_and_members():
+    assert shape_code("Triangle ") == shape_code(GrooveType.TRIANGLE)
+    with pytest.raises(ValueError):
+        shape_code("hexagon")
+
+
+def test_volume_delta_bands():
+    tolerance = VolumeTolerance(relative=0.25, absolute=1.0, suspect_relative=0.5)
+
+    def check(expected, actual):
+        return VolumeDeltaCheck("cut", 1, expected, actual, tolerance.allowed(expected),
+                                tolerance.suspect_allowed(expected))
+
+    assert check(200.0, 180.0).passed
+    suspect = check(100.0, 140.0)
+    assert not suspect.passed and suspect.plausible
+    assert not check(100.0, 300.0).plausible
+    # Tiny features fall back to the absolute tolerance
+    assert check(0.5, 1.4).passed
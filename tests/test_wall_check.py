@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from wall_check import (POLICY_FAIL, POLICY_SKIP, POLICY_WARN, WALL_BREAKTHROUGH, WALL_OK, WALL_OUTSIDE,
+                        WALL_THIN, apply_wall_policy, check_wall_thickness, first_hits)
+
+
+def box_mesh(size=(10.0, 10.0, 1.0)):
+    """Closed box [0, sx] x [0, sy] x [0, sz], triangles wound outward"""
+    sx, sy, sz = size
+    vertices = np.array([(x, y, z) for x in (0, sx) for y in (0, sy) for z in (0, sz)], dtype=float)
+    quads = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+    triangles = []
+    center = vertices.mean(axis=0)
+    for a, b, c, d in quads:
+        for tri in ((a, b, c), (a, c, d)):
+            p0, p1, p2 = vertices[list(tri)]
+            if np.dot(np.cross(p1 - p0, p2 - p0), p0 - center) < 0:
+                tri = (tri[0], tri[2], tri[1])
+            triangles.append(tri)
+    return vertices, np.array(triangles, dtype=np.int64)
+
+
+class _Xyz:
+    def __init__(self, *coords):
+        self.coords = coords
+
+    def X(self):
+        return self.coords[0]
+
+    def Y(self):
+        return self.coords[1]
+
+    def Z(self):
+        return self.coords[2]
+
+
+def frame(point, normal):
+    return _Xyz(*point), _Xyz(*normal)
+
+
+def test_first_hits_distance_and_facing():
+    vertices, triangles = box_mesh()
+    origins = np.array([[2.0, 3.0, 5.0], [2.0, 3.0, 0.5]])
+    directions = np.array([[0.0, 0.0, -1.0], [0.0, 0.0, -1.0]])
+    distance, cosine = first_hits(origins, directions, vertices, triangles)
+    assert distance == pytest.approx([4.0, 0.5])
+    # Entering through the top face (against its normal), leaving through the bottom
+    assert cosine[0] < 0 < cosine[1]
+
+
+def test_first_hits_misses_and_min_distance():
+    vertices, triangles = box_mesh()
+    origins = np.array([[20.0, 3.0, 5.0], [2.0, 3.0, 5.0]])
+    directions = np.array([[0.0, 0.0, -1.0], [0.0, 0.0, -1.0]])
+    distance, _ = first_hits(origins, directions, vertices, triangles, min_distance=np.array([0.0, 4.5]))
+    assert np.isinf(distance[0])
+    assert distance[1] == pytest.approx(5.0)
+
+
+def test_first_hits_tiling_matches_single_block():
+    vertices, triangles = box_mesh()
+    rng = np.random.default_rng(0)
+    origins = np.column_stack([rng.uniform(-2, 12, 200), rng.uniform(-2, 12, 200), np.full(200, 3.0)])
+    directions = rng.normal(size=(200, 3))
+    directions[:, 2] = -np.abs(directions[:, 2]) - 0.5
+    directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+    full = first_hits(origins, directions, vertices, triangles, max_pairs=10 ** 6)
+    for max_pairs in (1, 7, 64, 500):
+        tiled = first_hits(origins, directions, vertices, triangles, max_pairs=max_pairs)
+        np.testing.assert_allclose(tiled[0], full[0])
+        np.testing.assert_allclose(tiled[1], full[1])
+
+
+def test_check_wall_thickness_statuses():
+    vertices, triangles = box_mesh(size=(10.0, 10.0, 2.0))
+    frames = [frame((5, 5, 2), (0, 0, 1)),   # top face, outward normal: 2mm wall
+              frame((5, 5, 2), (0, 0, -1))]  # normal pointing into the material
+    report = check_wall_thickness(frames, vertices, triangles, groove_depth=1.0, retention_offset=0.1)
+    assert report.checks[0].wall_thickness == pytest.approx(2.0)
+    assert report.checks[0].status == WALL_OK
+    assert report.checks[1].status == WALL_OUTSIDE
+
+    assert check_wall_thickness(frames[:1], vertices, triangles, 1.95, 0.1).checks[0].status == WALL_THIN
+    assert check_wall_thickness(frames[:1], vertices, triangles, 2.5, 0.1).checks[0].status == WALL_BREAKTHROUGH
+
+
+def test_wall_policies():
+    vertices, triangles = box_mesh(size=(10.0, 10.0, 2.0))
+    frames = [frame((3, 3, 2), (0, 0, 1)), frame((5, 5, 2), (0, 0, -1))]
+    report = check_wall_thickness(frames, vertices, triangles, groove_depth=1.0, retention_offset=0.1)
+
+    ok, _, kept = apply_wall_policy(frames, report, POLICY_SKIP)
+    assert ok and kept == frames[:1]
+    ok, _, kept = apply_wall_policy(frames, report, POLICY_WARN)
+    assert ok and kept == frames
+    ok, _, kept = apply_wall_policy(frames, report, POLICY_FAIL)
+    assert not ok and kept == []
+
+
+def test_ray_through_shared_edge_and_seam():
+    # Top face diagonal from (0, 0) to (10, 10): rays at (5, 5) and (0, 0) hit an edge
+    # and a vertex shared by both top triangles.
+    vertices, triangles = box_mesh(size=(10.0, 10.0, 2.0))
+    frames = [frame((5, 5, 2), (0, 0, 1)), frame((0, 0, 2), (0, 0, 1)), frame((2.5, 2.5, 2), (0, 0, 1))]
+    report = check_wall_thickness(frames, vertices, triangles, groove_depth=1.0, retention_offset=0.1)
+    assert [c.status for c in report.checks] == [WALL_OK] * 3
+    assert [c.wall_thickness for c in report.checks] == pytest.approx([2.0] * 3)
+
+    # Separately meshed faces: one top triangle uses its own copy of the shared edge,
+    # 1e-7 above the other's, so the ray meets the top surface twice.
+    top = [i for i, tri in enumerate(triangles) if np.all(vertices[tri, 2] == 2.0)]
+    copy = triangles[top[0]]
+    seam_vertices = np.vstack([vertices, vertices[copy] + [0.0, 0.0, 1e-7]])
+    seam_triangles = triangles.copy()
+    seam_triangles[top[0]] = np.arange(len(vertices), len(vertices) + 3)
+    report = check_wall_thickness(frames, seam_vertices, seam_triangles, groove_depth=1.0, retention_offset=0.1)
+    assert [c.status for c in report.checks] == [WALL_OK] * 3
+    assert report.checks[0].wall_thickness == pytest.approx(2.0)
@@ -0,0 +1,123 @@
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from watch_folder import (JOURNAL_DONE, WatchDaemon, WatchFolder, WatchJournal, has_step_trailer,
+                          is_candidate)
+
+SETTLE = 0.01
+
+STEP_BODY = """ISO-10303-21;
+HEADER;
+FILE_SCHEMA(('AUTOMOTIVE_DESIGN'));
+ENDSEC;
+DATA;
+#10 = ADVANCED_FACE('',(#11),#12,.T.);
+ENDSEC;
+"""
+STEP_TRAILER = "END-ISO-10303-21;\n"
+
+
+class _Pool:
+    """Runs nothing; each submission finishes at once with a successful report"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, input_path, output_path, *args):
+        self.submitted.append(input_path)
+        future = Future()
+        future.set_result({"success": True, "message": "Success", "duration": 0.1, "cache_hit": True,
+                           "output_path": output_path})
+        return future
+
+
+@pytest.fixture
+def watched(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # run history is written to the working directory
+    folder = tmp_path / "exports"
+    folder.mkdir()
+    return folder
+
+
+def make_daemon(folder, journal_path):
+    daemon = WatchDaemon([WatchFolder(path=str(folder))], settle_seconds=SETTLE, journal_path=str(journal_path))
+    daemon._pool = _Pool()
+    return daemon
+
+
+def poll_settled(daemon, polls=2):
+    """Polls often enough for an unchanged file to settle"""
+    for _ in range(polls):
+        daemon.poll_once()
+        time.sleep(SETTLE * 2)
+    daemon.poll_once()
+
+
+def test_candidates_and_trailer(tmp_path):
+    assert is_candidate("part.STP") and is_candidate("part.step")
+    assert not is_candidate("part_processed.stp")
+    assert not is_candidate(".part.stp") and not is_candidate("part.stl")
+    path = tmp_path / "part.stp"
+    path.write_text(STEP_BODY)
+    assert not has_step_trailer(str(path))
+    path.write_text(STEP_BODY + STEP_TRAILER)
+    assert has_step_trailer(str(path))
+
+
+def test_half_written_file_is_not_picked_up(watched, tmp_path):
+    path = watched / "part.stp"
+    path.write_text(STEP_BODY)
+    daemon = make_daemon(watched, tmp_path / "journal.jsonl")
+    poll_settled(daemon)
+    assert daemon._pool.submitted == []
+    assert daemon.journal.status(str(path), daemon._content_hash(str(path))) is None
+
+
+def test_growing_file_waits_until_it_settles(watched, tmp_path):
+    path = watched / "part.stp"
+    daemon = make_daemon(watched, tmp_path / "journal.jsonl")
+    path.write_text(STEP_BODY)
+    daemon.poll_once()
+    path.write_text(STEP_BODY + STEP_TRAILER)
+    daemon.poll_once()  # size changed: the settle timer starts again
+    assert daemon._pool.submitted == []
+    poll_settled(daemon)
+    assert daemon._pool.submitted == [str(path)]
+
+
+def test_completed_file_is_queued_once(watched, tmp_path):
+    path = watched / "part.stp"
+    path.write_text(STEP_BODY + STEP_TRAILER)
+    daemon = make_daemon(watched, tmp_path / "journal.jsonl")
+    poll_settled(daemon, polls=4)
+    assert daemon._pool.submitted == [str(path)]
+    assert daemon.journal.status(str(path), daemon._content_hash(str(path))) == JOURNAL_DONE
+
+
+def test_restart_skips_journaled_files_until_they_change(watched, tmp_path):
+    path = watched / "part.stp"
+    path.write_text(STEP_BODY + STEP_TRAILER)
+    journal_path = tmp_path / "journal.jsonl"
+    poll_settled(make_daemon(watched, journal_path), polls=3)
+
+    restarted = make_daemon(watched, journal_path)
+    poll_settled(restarted, polls=3)
+    assert restarted._pool.submitted == []
+
+    # New content is a new journal key
+    path.write_text(STEP_BODY.replace("#10", "#100") + STEP_TRAILER)
+    poll_settled(restarted)
+    assert restarted._pool.submitted == [str(path)]
+
+
+def test_journal_ignores_malformed_lines(tmp_path):
+    journal_path = tmp_path / "journal.jsonl"
+    journal = WatchJournal(str(journal_path))
+    journal.record("a.stp", "h1", JOURNAL_DONE)
+    with open(journal_path, "a", encoding="utf-8") as f:
+        f.write("{broken\n")
+    reloaded = WatchJournal(str(journal_path))
+    assert reloaded.is_settled("a.stp", "h1")
+    assert not reloaded.is_settled("a.stp", "h2")
@@ -0,0 +1,182 @@
+"""
+Volume Delta Check Module
+
+Handles:
+1. Closed-form volumes of groove and clip tools for every GrooveType.
+2. The expected volume change of the body per cut groove / fused clip.
+3. Comparing the actual volume change after a boolean against that expectation,
+   so a wrong fast-path result is caught without re-running every tool.
+
+The expectation assumes a locally flat wall at least groove_depth thick (see
+wall_check): a groove removes the part of its tool below the surface (local z <= 0),
+and a clip adds the part of itself that lies inside the groove pocket or above the
+surface. Curved surfaces and fuzzy booleans shift the result slightly, hence the
+relative tolerance.
+
+The profile formulas are vectorized over NumPy columns (shape codes index SHAPES) so
+design_screening evaluates whole grids with the same code; the per-tool functions
+below are scalar views of them. OCC is only imported to measure shapes.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Tuple
+
+import numpy as np
+
+from groove_parameters import GrooveParameters, GrooveType
+
+if TYPE_CHECKING:  # ClipGenerator needs OCC
+    from clip_generator import ClipGenerator
+
+# Integer codes of the groove shapes in vectorized formulas
+SHAPES = list(GrooveType)
+_CODES = {shape: code for code, shape in enumerate(SHAPES)}
+RECTANGULAR, CIRCULAR, SQUARE, TRIANGLE = (_CODES[t] for t in (GrooveType.RECTANGULAR, GrooveType.CIRCULAR,
+                                                               GrooveType.SQUARE, GrooveType.TRIANGLE))
+_SQRT3 = math.sqrt(3)
+
+
+@dataclass
+class VolumeTolerance:
+    """Allowed deviation of a volume change from its closed-form expectation"""
+    relative: float = 0.25
+    absolute: float = 1.0  # mm^3, for very small features
+    # A lone tool outside `relative` is still kept (as suspect) within this band,
+    # e.g. a groove on a strongly curved wall; anything further off is rejected.
+    suspect_relative: float = 0.5
+
+    def allowed(self, expected: float) -> float:
+        return max(self.absolute, self.relative * abs(expected))
+
+    def suspect_allowed(self, expected: float) -> float:
+        return max(self.absolute, self.suspect_relative * abs(expected))
+
+
+@dataclass
+class VolumeDeltaCheck:
+    """Expected vs actual volume change of one boolean step"""
+    operation: str
+    tool_count: int
+    expected: float
+    actual: float
+    tolerance: float
+    suspect_tolerance: float = 0.0
+
+    @property
+    def error(self) -> float:
+        return self.actual - self.expected
+
+    @property
+    def passed(self) -> bool:
+        return abs(self.error) <= self.tolerance
+
+    @property
+    def plausible(self) -> bool:
+        """Off the expectation, but by no more than VolumeTolerance.suspect_relative"""
+        return abs(self.error) <= max(self.tolerance, self.suspect_tolerance)
+
+    def validate(self) -> Tuple[bool, str]:
+        if self.passed:
+            return True, "Valid"
+        return False, (f"{self.operation} of {self.tool_count} tool(s) changed the volume by "
+                       f"{self.actual:.2f}mm^3, expected {self.expected:.2f} +/- {self.tolerance:.2f}mm^3")
+
+    def to_dict(self) -> dict:
+        return {
+            "operation": self.operation,
+            "tool_count": self.tool_count,
+            "expected": self.expected,
+            "actual": self.actual,
+            "tolerance": self.tolerance,
+            "passed": self.passed,
+            "plausible": self.plausible,
+        }
+
+
+def shape_volume(shape) -> float:
+    from OCC.Core.BRepGProp import brepgprop
+    from OCC.Core.GProp import GProp_GProps
+
+    props = GProp_GProps()
+    brepgprop.VolumeProperties(shape, props)
+    return abs(props.Mass())
+
+
+def shape_code(shape) -> int:
+    """Index of a GrooveType (or its value string) in SHAPES"""
+    return _CODES[shape if isinstance(shape, GrooveType) else GrooveType(str(shape).strip().lower())]
+
+
+def triangle_areas_between(width, base_z, z_lo, z_hi) -> np.ndarray:
+    """Area of the equilateral TRIANGLE profile (base at base_z, apex up) between two z levels"""
+    width = np.asarray(width, dtype=float)
+    apex = width * _SQRT3 / 2.0
+    z1 = np.maximum(z_lo, base_z)
+    z2 = np.minimum(z_hi, base_z + apex)
+    # Width shrinks linearly from `width` at the base to 0 at the apex.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        area = width * ((z2 - z1) - ((z2 - base_z) ** 2 - (z1 - base_z) ** 2) / (2.0 * apex))
+    return np.where(z2 > z1, area, 0.0)
+
+
+def profile_volumes_between(shape, width, depth, length, base_z, z_lo, z_hi) -> np.ndarray:
+    """
+    Volumes of GrooveGenerator shapes (shifted to start at base_z) between two local z levels,
+    element-wise over broadcastable columns; `shape` holds codes from shape_code.
+    `length` is the extent along local Y that is counted (RECTANGULAR/TRIANGLE only).
+    """
+    shape = np.asarray(shape)
+    width = np.asarray(width, dtype=float)
+    dz = np.maximum(0.0, np.minimum(base_z + depth, z_hi) - np.maximum(base_z, z_lo))
+    return np.select(
+        [shape == RECTANGULAR, shape == SQUARE, shape == CIRCULAR, shape == TRIANGLE],
+        [width * length * dz, width * width * dz, math.pi * (width / 2.0) ** 2 * dz,
+         length * triangle_areas_between(width, base_z, z_lo, z_hi)],
+        default=np.nan,
+    )
+
+
+def profile_volume_between(params: GrooveParameters, base_z: float, length: float,
+                           z_lo: float, z_hi: float) -> float:
+    """Scalar profile_volumes_between for one GrooveParameters"""
+    return float(profile_volumes_between(shape_code(params.type), params.width, params.depth, length,
+                                         base_z, z_lo, z_hi))
+
+
+def groove_tool_volume(params: GrooveParameters) -> float:
+    """Full closed-form volume of a groove tool"""
+    return profile_volume_between(params, -params.depth, params.length, -math.inf, math.inf)
+
+
+def expected_cut_volume(params: GrooveParameters) -> float:
+    """Material removed by one groove: its tool below the surface (z <= 0)"""
+    return profile_volume_between(params, -params.depth, params.length, -params.depth, 0.0)
+
+
+def expected_fuse_volume(clip_generator: "ClipGenerator") -> float:
+    """
+    Material added by one clip fused into its groove: the clip inside the pocket
+    (pocket length along Y for elongated profiles) plus any part above the surface.
+    """
+    groove = clip_generator.params.groove_params
+    clip = clip_generator.derive_from_groove()
+    base_z = -groove.depth  # create_shape anchors the clip to the groove floor
+    if clip.type in (GrooveType.RECTANGULAR, GrooveType.TRIANGLE):
+        pocket_length = min(clip.length, groove.length)
+    else:
+        pocket_length = clip.length
+    inside = profile_volume_between(clip, base_z, pocket_length, -groove.depth, 0.0)
+    above = profile_volume_between(clip, base_z, clip.length, 0.0, math.inf)
+    return inside + above
+
+
+def check_volume_delta(operation: str, tool_count: int, volume_before: float, volume_after: float,
+                       expected_per_tool: float, tolerance: VolumeTolerance) -> VolumeDeltaCheck:
+    """Compares a boolean's volume change against tool_count x the per-tool expectation"""
+    from op_capture import OP_CUT
+
+    actual = volume_before - volume_after if operation == OP_CUT else volume_after - volume_before
+    expected = expected_per_tool * tool_count
+    return VolumeDeltaCheck(operation, tool_count, expected, actual, tolerance.allowed(expected),
+                            tolerance.suspect_allowed(expected))
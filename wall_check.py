@@ -0,0 +1,244 @@
+"""
+Wall Thickness Pre-Check Module
+
+Handles:
+1. Batched ray casting (Moller-Trumbore, NumPy) from every placement point along
+   the inward normal against the thickened body's triangulation.
+2. Local wall thickness per placement, compared against groove depth and retention offset.
+3. Classification of placements (ok / thin floor / breakthrough / outside / no hit)
+   so bad ones are rejected or flagged before any boolean runs.
+
+A groove cuts `groove_depth` into the wall along -normal; when that reaches the
+opposite side of the wall the cut splits or empties the body (zero-volume results).
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+WALL_OK = "ok"
+WALL_THIN = "thin"                  # floor under the groove thinner than required
+WALL_BREAKTHROUGH = "breakthrough"  # groove reaches through the wall
+WALL_OUTSIDE = "outside"            # inward direction points into air, groove would cut nothing
+WALL_NO_HIT = "no_hit"              # ray leaves the mesh (open or missing triangulation)
+
+POLICY_WARN = "warn"  # log only
+POLICY_SKIP = "skip"  # drop breakthrough/outside placements, keep thin ones with a warning
+POLICY_FAIL = "fail"  # fail the run on any breakthrough/outside placement
+WALL_CHECK_POLICIES = (POLICY_WARN, POLICY_SKIP, POLICY_FAIL)
+# Earlier name of POLICY_FAIL, still accepted in runtime_params
+POLICY_ALIASES = {"abort": POLICY_FAIL}
+
+# Statuses that produce broken booleans
+BLOCKING_STATUSES = (WALL_BREAKTHROUGH, WALL_OUTSIDE)
+
+# Rays start this far (mm) outside the surface along the normal, so a placement point
+# lying slightly inside the (faceted) mesh still sees the near face as its first hit.
+RAY_SLACK = 0.5
+
+# The exit search starts this fraction of the mesh's bounding box diagonal behind the
+# entry hit. Closer hits are the entry surface again: a neighbouring triangle at a
+# shared edge or vertex, or the other copy of an edge between separately meshed faces.
+EXIT_EPSILON_FRACTION = 1e-6
+
+# Ray/triangle pairs tested at once by first_hits (about 100 bytes of temporaries each)
+MAX_RAY_TRIANGLE_PAIRS = 1 << 18
+
+
+@dataclass
+class PlacementCheck:
+    """Wall thickness found at one placement"""
+    index: int
+    point: Tuple[float, float, float]
+    wall_thickness: float  # inf when nothing was hit
+    floor_thickness: float  # wall left under the groove
+    status: str
+
+    @property
+    def blocking(self) -> bool:
+        return self.status in BLOCKING_STATUSES
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "point": list(self.point),
+            "wall_thickness": self.wall_thickness if np.isfinite(self.wall_thickness) else None,
+            "floor_thickness": self.floor_thickness if np.isfinite(self.floor_thickness) else None,
+            "status": self.status,
+        }
+
+
+@dataclass
+class WallCheckReport:
+    """Result of checking all placements of a run"""
+    groove_depth: float
+    required_floor: float
+    checks: List[PlacementCheck] = field(default_factory=list)
+
+    @property
+    def blocking(self) -> List[PlacementCheck]:
+        return [c for c in self.checks if c.blocking]
+
+    @property
+    def flagged(self) -> List[PlacementCheck]:
+        return [c for c in self.checks if c.status != WALL_OK]
+
+    @property
+    def min_wall(self) -> float:
+        walls = [c.wall_thickness for c in self.checks if np.isfinite(c.wall_thickness)]
+        return min(walls) if walls else float("inf")
+
+    def validate(self) -> Tuple[bool, str]:
+        """(True, "Valid") when no placement breaks through the wall"""
+        if not self.blocking:
+            return True, "Valid"
+        details = ", ".join(f"#{c.index + 1} {c.status} (wall {c.wall_thickness:.2f}mm)" for c in self.blocking)
+        return False, f"Groove depth {self.groove_depth}mm not supported at {details}"
+
+    def to_dict(self) -> dict:
+        return {
+            "groove_depth": self.groove_depth,
+            "required_floor": self.required_floor,
+            "min_wall": None if np.isinf(self.min_wall) else self.min_wall,
+            "placements": [c.to_dict() for c in self.checks],
+        }
+
+
+def check_depth_against_thickness(thickness: float, groove_depth: float) -> Tuple[bool, str]:
+    """Parameter-only check: a groove deeper than the nominal wall always breaks through"""
+    if groove_depth >= thickness:
+        return False, f"Groove depth ({groove_depth}mm) must be less than body thickness ({thickness}mm)"
+    return True, "Valid"
+
+
+def first_hits(origins: np.ndarray, directions: np.ndarray, vertices: np.ndarray,
+               triangles: np.ndarray, min_distance: Optional[np.ndarray] = None,
+               max_pairs: int = MAX_RAY_TRIANGLE_PAIRS,
+               exiting_only: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Nearest ray/triangle intersection of every ray beyond min_distance. With
+    exiting_only, triangles facing against the ray (entering the material) are ignored.
+    Rays and
+    triangles are tested in blocks of at most max_pairs (ray, triangle) pairs, so the
+    temporaries stay bounded whatever the number of placements or triangles.
+    Returns (distance (P,) with inf for misses, cosine (P,) between the hit triangle's
+    normal and the ray direction).
+    """
+    count = len(origins)
+    if min_distance is None:
+        min_distance = np.zeros(count)
+    best = np.full(count, np.inf)
+    cosine = np.zeros(count)
+    if count == 0 or len(triangles) == 0:
+        return best, cosine
+
+    ray_chunk = max(1, min(count, max_pairs))
+    chunk = max(1, max_pairs // ray_chunk)
+    for start in range(0, len(triangles), chunk):
+        tri = triangles[start:start + chunk]
+        v0 = vertices[tri[:, 0]]
+        e1 = vertices[tri[:, 1]] - v0
+        e2 = vertices[tri[:, 2]] - v0
+        normals = np.cross(e1, e2)
+        lengths = np.linalg.norm(normals, axis=1)
+
+        for ray_start in range(0, count, ray_chunk):
+            rays = slice(ray_start, ray_start + ray_chunk)
+            origin, direction = origins[rays], directions[rays]
+            # (R, T) Moller-Trumbore terms
+            pvec = np.cross(direction[:, None, :], e2[None, :, :])
+            det = np.einsum("ptk,tk->pt", pvec, e1)
+            valid = np.abs(det) > 1e-12
+            inv_det = np.divide(1.0, det, out=np.zeros_like(det), where=valid)
+            tvec = origin[:, None, :] - v0[None, :, :]
+            u = np.einsum("ptk,ptk->pt", tvec, pvec) * inv_det
+            del pvec
+            qvec = np.cross(tvec, e1[None, :, :])
+            del tvec
+            v = np.einsum("pk,ptk->pt", direction, qvec) * inv_det
+            t = np.einsum("tk,ptk->pt", e2, qvec) * inv_det
+            del qvec
+
+            hit = valid & (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (t > min_distance[rays, None])
+            if exiting_only:
+                hit &= (direction @ normals.T) > 0.0
+            t = np.where(hit, t, np.inf)
+            nearest = np.argmin(t, axis=1)
+            nearest_t = t[np.arange(len(t)), nearest]
+            closer = nearest_t < best[rays]
+            if np.any(closer):
+                index = np.flatnonzero(closer) + ray_start
+                best[index] = nearest_t[closer]
+                hit_normals = normals[nearest[closer]]
+                cosine[index] = (np.einsum("pk,pk->p", hit_normals, directions[index])
+                                 / np.maximum(lengths[nearest[closer]], 1e-300))
+    return best, cosine
+
+
+def check_wall_thickness(frames, vertices: np.ndarray, triangles: np.ndarray,
+                         groove_depth: float, retention_offset: float,
+                         min_floor: float = 0.0) -> WallCheckReport:
+    """
+    Measures the wall under each (point, outward normal) frame in one batch.
+
+    Triangles must be wound outward (as returned by triangulation_arrays). Rays start
+    RAY_SLACK above the point and run along -normal: the first hit must be the near
+    face entering the material (facing against the ray), otherwise the groove side of
+    the wall is air. The next hit is where the ray leaves the wall; the distance
+    between the two is the local wall thickness; it is searched beyond a model-scaled
+    epsilon and among exiting triangles only, so a ray through an edge or vertex of
+    the near face does not hit that face again.
+    The floor left under a groove must be at least max(retention_offset, min_floor).
+    """
+    required_floor = max(retention_offset, min_floor)
+    report = WallCheckReport(groove_depth=groove_depth, required_floor=required_floor)
+    if not frames:
+        return report
+
+    points = np.array([(p.X(), p.Y(), p.Z()) for p, _ in frames], dtype=float)
+    normals = np.array([(n.X(), n.Y(), n.Z()) for _, n in frames], dtype=float)
+    normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-300)
+    directions = -normals
+    origins = points + normals * RAY_SLACK
+    entry, entry_cosine = first_hits(origins, directions, vertices, triangles)
+    # Second batch: the next surface behind each entry hit (misses stay at inf)
+    extent = np.ptp(vertices, axis=0) if len(vertices) else np.zeros(3)
+    epsilon = EXIT_EPSILON_FRACTION * float(np.linalg.norm(extent))
+    exit_, _ = first_hits(origins, directions, vertices, triangles,
+                          min_distance=np.where(np.isfinite(entry), entry + epsilon, np.inf),
+                          exiting_only=True)
+    walls = np.where(np.isfinite(entry), exit_ - entry, np.inf)
+
+    for i, (point, wall, cos) in enumerate(zip(points, walls, entry_cosine)):
+        floor = wall - groove_depth
+        if not np.isfinite(entry[i]):
+            status = WALL_NO_HIT
+        elif cos > 0.0:
+            status = WALL_OUTSIDE
+        elif not np.isfinite(wall):
+            status = WALL_NO_HIT
+        elif floor <= 0.0:
+            status = WALL_BREAKTHROUGH
+        elif floor < required_floor:
+            status = WALL_THIN
+        else:
+            status = WALL_OK
+        report.checks.append(PlacementCheck(i, tuple(float(x) for x in point), float(wall), float(floor), status))
+    return report
+
+
+def apply_wall_policy(frames, report: WallCheckReport, policy: str) -> Tuple[bool, str, list]:
+    """
+    Applies a wall check policy to the placement frames.
+    Returns (may_continue, message, frames_to_use).
+    """
+    if policy not in WALL_CHECK_POLICIES:
+        raise ValueError(f"Unknown wall check policy '{policy}'")
+    is_valid, msg = report.validate()
+    if is_valid or policy == POLICY_WARN:
+        return True, msg, list(frames)
+    if policy == POLICY_FAIL:
+        return False, msg, []
+    blocked = {c.index for c in report.blocking}
+    return True, msg, [frame for i, frame in enumerate(frames) if i not in blocked]
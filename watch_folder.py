@@ -0,0 +1,368 @@
+"""
+Watch-Folder Ingestion Module
+
+Handles:
+1. Polling configured input directories for new STEP files.
+2. Debouncing files that are still being written (size/mtime must settle and the
+   ISO-10303-21 trailer must be present).
+3. Processing them with per-folder default runtime_params on a bounded worker pool,
+   writing <stem>_processed.stp and a metrics report next to each input.
+4. A persistent JSONL journal, so a restarted daemon does not reprocess files.
+
+Run as:
+    python watch_folder.py --config watch.json
+    python watch_folder.py --folder exports/ --params params.json --workers 2
+
+Config file format:
+    {"workers": 2, "poll_interval": 2.0, "settle_seconds": 5.0,
+     "folders": [{"path": "exports/", "params": {"thickness": 2.5}, "output_dir": null}]}
+
+A gencad_params.json inside a watched folder overrides that folder's params.
+"""
+
+import os
+import json
+import time
+import signal
+import argparse
+import multiprocessing
+from dataclasses import dataclass, field
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from runtime_input import normalize_runtime_params, runtime_params_to_json
+from input_hash import file_content_hash
+from cost_model import JobFeatures, record_run
+from job_scheduler import batch_output_path
+from execution_settings import ExecutionSettings, add_execution_arguments, execution_from_args, default_thread_count
+from memory_budget import MemoryBudget, add_memory_arguments, memory_from_args
+
+DEFAULT_JOURNAL_PATH = "watch_journal.jsonl"
+FOLDER_PARAMS_NAME = "gencad_params.json"
+OUTPUT_SUFFIX = "_processed"
+STEP_EXTENSIONS = (".stp", ".step")
+STEP_TRAILER = b"END-ISO-10303-21"
+
+JOURNAL_STARTED = "started"
+JOURNAL_DONE = "done"
+JOURNAL_FAILED = "failed"
+JOURNAL_INCOMPLETE = "incomplete"
+
+# Files that stay stable without a STEP trailer this many settle periods are given up.
+INCOMPLETE_SETTLE_FACTOR = 12
+
+
+@dataclass
+class WatchFolder:
+    """A watched input directory and the runtime_params applied to its files"""
+    path: str
+    params: dict = field(default_factory=dict)
+    output_dir: Optional[str] = None  # default: next to the input
+
+    def runtime_params(self) -> dict:
+        """Folder defaults, overridden by a gencad_params.json dropped into the folder"""
+        params = dict(self.params)
+        override_path = os.path.join(self.path, FOLDER_PARAMS_NAME)
+        if os.path.exists(override_path):
+            try:
+                with open(override_path, "r", encoding="utf-8") as f:
+                    params.update(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"[Watch] Ignoring unreadable {override_path}: {e}", flush=True)
+        return normalize_runtime_params(params)
+
+    def output_path_for(self, input_path: str) -> str:
+        return batch_output_path(input_path, self.output_dir or os.path.dirname(input_path))
+
+
+def report_path_for(output_path: str) -> str:
+    return os.path.splitext(output_path)[0] + ".metrics.json"
+
+
+def is_candidate(name: str) -> bool:
+    """STEP files that are not outputs of this pipeline"""
+    stem, ext = os.path.splitext(name)
+    return ext.lower() in STEP_EXTENSIONS and not stem.endswith(OUTPUT_SUFFIX) and not name.startswith(".")
+
+
+def has_step_trailer(path: str, tail_bytes: int = 1024) -> bool:
+    """True when the file ends with the ISO-10303-21 end marker (export finished)"""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - tail_bytes))
+            return STEP_TRAILER in f.read()
+    except OSError:
+        return False
+
+
+class WatchJournal:
+    """Append-only record of files seen by the daemon, keyed by path + content hash"""
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self._status: Dict[Tuple[str, str], str] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self._status[(entry["path"], entry["hash"])] = entry["status"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    def status(self, path: str, content_hash: str) -> Optional[str]:
+        return self._status.get((os.path.abspath(path), content_hash))
+
+    def is_settled(self, path: str, content_hash: str) -> bool:
+        """Finished in any way; a file left "started" by a crash is processed again"""
+        return self.status(path, content_hash) in (JOURNAL_DONE, JOURNAL_FAILED, JOURNAL_INCOMPLETE)
+
+    def record(self, path: str, content_hash: str, status: str, **details) -> None:
+        entry = {"path": os.path.abspath(path), "hash": content_hash, "status": status, "time": time.time()}
+        entry.update(details)
+        self._status[(entry["path"], content_hash)] = status
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+
+def _process_file(input_path: str, output_path: str, runtime_params: dict,
+                  execution: Optional[ExecutionSettings] = None, use_cache: bool = True,
+                  memory: Optional[MemoryBudget] = None, input_hash: Optional[str] = None) -> dict:
+    """
+    Worker entry point: runs the pipeline and writes the metrics report next to the output.
+    input_hash is the journal's content hash, reused so the input is not hashed again.
+    """
+    from gen_cad_pipeline import run_pipeline
+    from result_cache import cached_run_pipeline
+
+    start_time = time.perf_counter()
+    metrics: dict = {}
+    cache_hit = False
+    try:
+        if use_cache:
+            success, message, metrics = cached_run_pipeline(input_path, output_path, runtime_params,
+                                                            execution=execution, memory=memory,
+                                                            input_hash=input_hash)
+            cache_hit = metrics["cache_hit"]
+        else:
+            success, message = run_pipeline(input_path, output_path, runtime_params, metrics=metrics,
+                                            execution=execution, memory=memory, input_hash=input_hash,
+                                            use_cache=False)
+    except Exception as e:
+        success, message = False, f"Critical Error: {e}"
+
+    report = {
+        "input_path": os.path.abspath(input_path),
+        "output_path": os.path.abspath(output_path),
+        "success": success,
+        "message": message,
+        "duration": time.perf_counter() - start_time,
+        "cache_hit": cache_hit,
+        "runtime_params": runtime_params_to_json(runtime_params),
+        "metrics": metrics,
+    }
+    try:
+        with open(report_path_for(output_path), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+    except OSError:
+        pass
+    return report
+
+
+class WatchDaemon:
+    """
+    Polls the watched folders and feeds settled files to a process pool
+    (at most `workers` files in flight; the rest wait for the next poll).
+    """
+
+    def __init__(self, folders: List[WatchFolder], workers: int = 1, poll_interval: float = 2.0,
+                 settle_seconds: float = 5.0, journal_path: str = DEFAULT_JOURNAL_PATH,
+                 use_cache: bool = True, execution: Optional[ExecutionSettings] = None,
+                 memory: Optional[MemoryBudget] = None):
+        self.folders = folders
+        self.workers = max(1, int(workers))
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.use_cache = use_cache
+        self.execution = execution or ExecutionSettings(threads=default_thread_count(self.workers))
+        self.memory = memory
+        self.journal = WatchJournal(journal_path)
+        self._seen: Dict[str, Tuple[int, float, float]] = {}  # path -> (size, mtime, unchanged since)
+        self._hashes: Dict[Tuple[str, int, float], str] = {}  # (path, size, mtime) -> content hash
+        self._in_flight: Dict[Future, Tuple[str, str, JobFeatures]] = {}
+        self._stopping = False
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def stop(self, *_) -> None:
+        self._stopping = True
+
+    def _settled_files(self) -> List[Tuple[WatchFolder, str]]:
+        """Files whose size and mtime have not changed for settle_seconds"""
+        now = time.time()
+        ready = []
+        for folder in self.folders:
+            try:
+                names = sorted(os.listdir(folder.path))
+            except OSError as e:
+                print(f"[Watch] Cannot list {folder.path}: {e}", flush=True)
+                continue
+            for name in names:
+                if not is_candidate(name):
+                    continue
+                path = os.path.abspath(os.path.join(folder.path, name))
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                previous = self._seen.get(path)
+                if previous is None or previous[:2] != (stat.st_size, stat.st_mtime):
+                    self._seen[path] = (stat.st_size, stat.st_mtime, now)
+                    continue
+                if now - previous[2] >= self.settle_seconds:
+                    ready.append((folder, path))
+        return ready
+
+    def _content_hash(self, path: str) -> Optional[str]:
+        """Content hash, recomputed only when the file's size or mtime changed"""
+        size, mtime, _ = self._seen[path]
+        key = (path, size, mtime)
+        if key not in self._hashes:
+            try:
+                self._hashes[key] = file_content_hash(path)
+            except OSError:
+                return None
+        return self._hashes[key]
+
+    def _collect_finished(self) -> None:
+        for future in [f for f in self._in_flight if f.done()]:
+            path, content_hash, features = self._in_flight.pop(future)
+            try:
+                report = future.result()
+            except Exception as e:
+                report = {"success": False, "message": f"Worker Error: {e}", "duration": 0.0, "cache_hit": False}
+            status = JOURNAL_DONE if report["success"] else JOURNAL_FAILED
+            self.journal.record(path, content_hash, status, message=report["message"],
+                                duration=report["duration"], output=report.get("output_path"))
+            if not report["cache_hit"]:
+                record_run(features, report["duration"], report["success"])
+            print(f"[Watch] {os.path.basename(path)}: {'OK' if report['success'] else 'FAILED'} "
+                  f"({report['message']}) in {report['duration']:.1f}s", flush=True)
+
+    def poll_once(self) -> int:
+        """One scan/dispatch cycle. Returns the number of files submitted."""
+        self._collect_finished()
+        in_flight_paths = {p for p, _, _ in self._in_flight.values()}
+        submitted = 0
+        for folder, path in self._settled_files():
+            if len(self._in_flight) >= self.workers:
+                break
+            if path in in_flight_paths:
+                continue
+            content_hash = self._content_hash(path)
+            if content_hash is None:
+                continue
+            if self.journal.is_settled(path, content_hash):
+                continue
+            if not has_step_trailer(path):
+                stable_for = time.time() - self._seen[path][2]
+                if stable_for >= self.settle_seconds * INCOMPLETE_SETTLE_FACTOR:
+                    self.journal.record(path, content_hash, JOURNAL_INCOMPLETE, message="No END-ISO-10303-21 trailer")
+                    print(f"[Watch] {os.path.basename(path)}: giving up, file never completed", flush=True)
+                continue
+
+            try:
+                runtime_params = folder.runtime_params()
+            except (ValueError, KeyError) as e:
+                self.journal.record(path, content_hash, JOURNAL_FAILED, message=f"Invalid folder params: {e}")
+                continue
+            output_path = folder.output_path_for(path)
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            features = JobFeatures.from_path(path, runtime_params)
+            self.journal.record(path, content_hash, JOURNAL_STARTED, output=output_path)
+            future = self._pool.submit(_process_file, path, output_path, runtime_params,
+                                       self.execution, self.use_cache, self.memory, content_hash)
+            self._in_flight[future] = (path, content_hash, features)
+            in_flight_paths.add(path)
+            submitted += 1
+            print(f"[Watch] Processing {path} -> {output_path}", flush=True)
+        return submitted
+
+    def run_forever(self, once: bool = False) -> None:
+        """Polls until SIGINT/SIGTERM (or, with once=True, until the current backlog is done)"""
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        print(f"[Watch] Watching {', '.join(f.path for f in self.folders)} with {self.workers} worker(s)", flush=True)
+        # spawn: OCC state must not be inherited through fork
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            self._pool = pool
+            idle_polls = 0
+            while not self._stopping:
+                submitted = self.poll_once()
+                idle_polls = 0 if (submitted or self._in_flight) else idle_polls + 1
+                # A backlog run ends once every file had time to settle and nothing is left.
+                if once and idle_polls * self.poll_interval > self.settle_seconds:
+                    break
+                time.sleep(self.poll_interval)
+            print("[Watch] Waiting for running jobs...", flush=True)
+            while self._in_flight:
+                time.sleep(0.2)
+                self._collect_finished()
+        self._pool = None
+        print("[Watch] Stopped.", flush=True)
+
+
+def load_watch_config(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config["folders"] = [WatchFolder(path=entry["path"], params=entry.get("params", {}),
+                                     output_dir=entry.get("output_dir"))
+                         for entry in config.get("folders", [])]
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gen-CAD Watch-Folder Daemon")
+    parser.add_argument("--config", help="JSON config with folders, params and pool settings")
+    parser.add_argument("--folder", action="append", default=[], help="Folder to watch (repeatable)")
+    parser.add_argument("--params", help="JSON runtime parameters for --folder entries")
+    parser.add_argument("--output-dir", default=None, help="Output directory for --folder entries (default: next to input)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--interval", type=float, default=None, help="Polling interval (s)")
+    parser.add_argument("--settle", type=float, default=None, help="Seconds a file must stay unchanged before processing")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH, help="Journal file (JSONL)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the result, body and placement caches")
+    parser.add_argument("--once", action="store_true", help="Process the current backlog, then exit")
+    add_execution_arguments(parser)
+    add_memory_arguments(parser)
+    args = parser.parse_args()
+
+    config = load_watch_config(args.config) if args.config else {"folders": []}
+    params = {}
+    if args.params:
+        with open(args.params, "r", encoding="utf-8") as f:
+            params = json.load(f)
+    folders = config["folders"] + [WatchFolder(path=p, params=params, output_dir=args.output_dir) for p in args.folder]
+    if not folders:
+        parser.error("No folders to watch (use --config or --folder)")
+
+    workers = args.workers or config.get("workers", 1)
+    daemon = WatchDaemon(
+        folders,
+        workers=workers,
+        poll_interval=args.interval or config.get("poll_interval", 2.0),
+        settle_seconds=args.settle if args.settle is not None else config.get("settle_seconds", 5.0),
+        journal_path=args.journal,
+        use_cache=not args.no_cache,
+        execution=execution_from_args(args, default_threads=default_thread_count(workers)),
+        memory=memory_from_args(args),
+    )
+    daemon.run_forever(once=args.once)
+
+
+if __name__ == "__main__":
+    main()